@@ -0,0 +1,206 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+from benchmarks.nmsBench import make_detections
+
+# ==============================
+# 단계별 마이크로벤치마크 입력 데이터
+# ==============================
+# - 합성(synthetic): 시드 고정 난수로 매번 같은 입력 생성 (저장소에 파일 없이 재현 가능)
+# - 녹화(recorded): 실제 얼굴 프레임 1장 + YOLO 라벨을 --record로 저장한 파일
+#   (얼굴 이미지가 들어 있으므로 저장소에는 올리지 않음, 없으면 해당 단계는 생략)
+
+RECORDED_PATH = os.path.join("benchmarks", "fixtures", "recorded_frame.npz")
+ANALYSIS_SIZE = (640, 853)  # 분석 프레임 (가로, 세로)
+SEED = 0
+JPEG_QUALITY = 90
+
+
+# ==============================
+# 앱 규격 합성 프레임 (benchmarks/loadTest.py와 공유)
+# ==============================
+def upright_frame(face, width, height, rng, steady=False):
+    """
+    정방향(세로가 긴) 흑백 프레임: 얼굴 이미지로 프레임을 꽉 채우고(넘치는 부분은 잘라냄) 노이즈 추가
+    운전 중 전면 카메라처럼 얼굴이 화면 대부분을 차지하도록 하고, 프레임마다 위치를 조금씩 이동
+    steady=True: 위치/크기를 고정하고 센서 노이즈만 다르게 (가만히 운전 중인 연속 프레임)
+    """
+    if face is None:
+        frame = rng.integers(60, 200, (height, width), dtype=np.uint8)
+        return cv2.GaussianBlur(frame, (0, 0), 3)
+    scale = max(width / face.shape[1], height / face.shape[0]) * (1.05 if steady else rng.uniform(1.0, 1.1))
+    fw, fh = int(np.ceil(face.shape[1] * scale)), int(np.ceil(face.shape[0] * scale))
+    resized = cv2.resize(face, (fw, fh), interpolation=cv2.INTER_AREA)
+    if steady:
+        x, y = (fw - width) // 2, (fh - height) // 2
+    else:
+        x = int(rng.integers(0, fw - width + 1))
+        y = int(rng.integers(0, fh - height + 1))
+    frame = resized[y:y + height, x:x + width].astype(np.int16)
+    frame += rng.integers(-4, 5, frame.shape, dtype=np.int16)  # 센서 노이즈
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def make_nv21_y(face, width, height, row_stride, rng, steady=False):
+    """
+    센서 방향 Y 평면 바이트 (서버가 시계 방향 90도 회전해 정방향으로 만드는 입력)
+    행마다 row_stride - width 바이트 패딩, 마지막 행 패딩은 안드로이드처럼 생략
+    """
+    sensor = sensor_plane(face, width, height, rng, steady)  # 정방향 가로 = 센서 세로
+    plane = rng.integers(0, 256, (height, row_stride), dtype=np.uint8)  # 패딩 영역은 쓰레기 값
+    plane[:, :width] = sensor
+    return plane.tobytes()[:row_stride * (height - 1) + width]
+
+
+def sensor_plane(face, width, height, rng, steady=False):
+    """센서 방향 (height, width) 흑백 평면 (make_nv21_y의 패딩 전 내용)"""
+    upright = upright_frame(face, height, width, rng, steady)
+    return cv2.rotate(upright, cv2.ROTATE_90_COUNTERCLOCKWISE)
+
+
+def encode_upload(plane, mode, roi=None, quality=JPEG_QUALITY):
+    """
+    /analyze_raw 축소 업로드 (payload bytes, form 필드) 생성
+    mode: 쉼표로 구분한 조합 - scale<N> (1/N 축소), roi (roi 영역만 잘라냄), jpeg | webp | zstd (압축)
+    roi: 센서 좌표 (x1, y1, x2, y2), 없으면 전체 프레임
+    """
+    tokens = {t.strip() for t in mode.split(",") if t.strip()}
+    full_h, full_w = plane.shape
+    x1, y1, x2, y2 = roi if roi is not None and "roi" in tokens else (0, 0, full_w, full_h)
+    region = plane[y1:y2, x1:x2]
+    scale = next((int(t[5:]) for t in tokens if t.startswith("scale")), 1)
+    if scale > 1:
+        size = (max(1, region.shape[1] // scale), max(1, region.shape[0] // scale))
+        region = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+    region = np.ascontiguousarray(region)
+    h, w = region.shape
+    fields = {"width": str(w), "height": str(h), "row_stride": str(w),
+              "full_width": str(full_w), "full_height": str(full_h),
+              "roi_x": str(x1), "roi_y": str(y1), "roi_width": str(x2 - x1), "roi_height": str(y2 - y1)}
+    if "jpeg" in tokens:
+        ok, buf = cv2.imencode(".jpg", region, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buf.tobytes(), {**fields, "format": "jpeg"}
+    if "webp" in tokens:
+        ok, buf = cv2.imencode(".webp", region, [cv2.IMWRITE_WEBP_QUALITY, quality])
+        return buf.tobytes(), {**fields, "format": "webp"}
+    if "zstd" in tokens:
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(region.tobytes()), {**fields, "format": "zstd"}
+    return region.tobytes(), {**fields, "format": "y8"}
+
+
+def make_jpeg(face, width, height, rng, steady=False):
+    frame = upright_frame(face, width, height, rng, steady)
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    return buf.tobytes()
+
+
+def synthetic_frame(seed=SEED):
+    """얼굴이 없는 분석 프레임 크기의 BGR 이미지 (흐린 노이즈)"""
+    rng = np.random.default_rng(seed)
+    gray = cv2.GaussianBlur(rng.integers(40, 220, ANALYSIS_SIZE[::-1], dtype=np.uint8), (0, 0), 2)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def synthetic_upload(kind, seed=SEED):
+    """앱 규격 업로드 버퍼: nv21 -> (Y 평면 bytes, 720, 480, 768), jpeg -> 480x640 JPEG bytes"""
+    rng = np.random.default_rng(seed)
+    if kind == "nv21":
+        return make_nv21_y(None, 720, 480, 768, rng), 720, 480, 768
+    return make_jpeg(None, 480, 640, rng)
+
+
+def synthetic_detections(num_boxes, seed=SEED):
+    """NMS 이전 YOLO 출력과 비슷한 (N, 6) float32 (benchmarks/nmsBench.py와 같은 생성기)"""
+    return make_detections(num_boxes, np.random.default_rng(seed))
+
+
+class FakeBoxes:
+    """ultralytics Results.boxes 대용 (filter_overlapping_parts가 쓰는 data.cpu().numpy()만 제공)"""
+    def __init__(self, data):
+        self.data = self
+        self._data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._data
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.boxes = FakeBoxes(data)
+
+
+def synthetic_label(num_boxes=5, seed=SEED):
+    """YOLO 정규화 라벨 텍스트 (cls cx cy w h)"""
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(num_boxes):
+        cx, cy = rng.uniform(0.3, 0.7, 2)
+        w, h = rng.uniform(0.05, 0.2, 2)
+        lines.append(f"{i % 5} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}")
+    return "\n".join(lines)
+
+
+def write_annotation_json(path, seed=SEED):
+    """jsonNormalizeYolo 입력 형식(AI Hub 주석 JSON)의 합성 파일"""
+    rng = np.random.default_rng(seed)
+    width, height = 1920, 1080
+
+    def box():
+        x1, y1 = rng.uniform(300, 1400), rng.uniform(200, 800)
+        return [f"{x1:.1f}", f"{y1:.1f}", f"{x1 + rng.uniform(40, 300):.1f}", f"{y1 + rng.uniform(30, 200):.1f}"]
+
+    data = {
+        "FileInfo": {"FileName": os.path.basename(path), "Width": str(width), "Height": str(height)},
+        "ObjectInfo": {"BoundingBox": {
+            "Face": {"isVisible": True, "Position": box()},
+            "Leye": {"isVisible": True, "Opened": bool(rng.integers(2)), "Position": box()},
+            "Reye": {"isVisible": True, "Opened": bool(rng.integers(2)), "Position": box()},
+            "Mouth": {"isVisible": True, "Opened": bool(rng.integers(2)), "Position": box()},
+            "Cigar": {"isVisible": False, "Position": [0, 0, 0, 0]},
+        }},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def write_image_label(img_dir, lbl_dir, stem, seed=SEED):
+    """dataBalancePro.augment_worker 입력 (원본 해상도 JPEG + YOLO 라벨)"""
+    rng = np.random.default_rng(seed)
+    img = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+    cv2.imwrite(os.path.join(img_dir, f"{stem}.jpg"), img)
+    with open(os.path.join(lbl_dir, f"{stem}.txt"), "w") as f:
+        f.write(synthetic_label(seed=seed))
+
+
+# ==============================
+# 녹화 데이터
+# ==============================
+def record_frame(image_path, label_path=None, path=RECORDED_PATH):
+    """실제 얼굴 이미지를 분석 프레임 크기(가로 640px)로 저장 (+ 원본 기준 YOLO 라벨)"""
+    img = cv2.imread(image_path)
+    if img is None:
+        raise ValueError(f"cannot read image: {image_path}")
+    h, w = img.shape[:2]
+    frame = cv2.resize(img, (ANALYSIS_SIZE[0], int(ANALYSIS_SIZE[0] * h / w)), interpolation=cv2.INTER_AREA)
+    label = ""
+    if label_path:
+        with open(label_path, encoding="utf-8") as f:
+            label = f.read()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, frame=frame, label=np.array(label))
+    return path
+
+
+def load_recorded(path=RECORDED_PATH):
+    """녹화 프레임 (BGR 프레임, 라벨 텍스트), 없으면 None"""
+    if not os.path.isfile(path):
+        return None
+    data = np.load(path)
+    return data["frame"], str(data["label"])
@@ -0,0 +1,173 @@
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+# ==============================
+# 마이크로벤치마크 공통 측정 도구
+# ==============================
+# - 워밍업 후 라운드별로 여러 번 호출해 호출당 시간(us) 통계 (min/median/mean/p95/stdev)
+# - 시간 측정과 분리된 1회 호출로 tracemalloc 메모리 측정 (최대 사용량, 호출 후 남은 블록 수)
+# - 결과를 기준선(baseline) JSON으로 저장하고, 기준선 대비 느려진 단계를 회귀로 판정
+
+TARGET_ROUND_SEC = 0.02  # 라운드 1회 목표 시간 (이 시간을 채우도록 라운드당 호출 수 자동 결정)
+
+
+class Case:
+    """
+    벤치마크 단계 1개
+    fn: 측정 대상 호출 (인자 없음)
+    setup: 호출마다 먼저 실행할 준비 작업 (측정 제외, 예: 이전 출력 파일 삭제)
+    """
+    def __init__(self, name, fn, setup=None, group=""):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+        self.group = group
+
+
+def _calibrate(fn):
+    """라운드 1회가 TARGET_ROUND_SEC 이상이 되는 호출 수"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= TARGET_ROUND_SEC or number >= 1 << 16:
+            return number
+        number *= 2
+
+
+def measure_time(case, rounds=7, warmup=3):
+    """호출당 시간 통계(us), setup이 있으면 호출마다 개별 측정"""
+    fn, setup = case.fn, case.setup
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # 라운드 중간의 GC 정지가 측정값에 섞이지 않도록
+    try:
+        if setup is None:
+            number = _calibrate(fn)
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(number):
+                    fn()
+                samples.append((time.perf_counter() - start) / number)
+        else:
+            number = 1
+            for _ in range(rounds * 5):
+                setup()
+                start = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    us = sorted(s * 1e6 for s in samples)
+    return {
+        "calls": number * len(samples),
+        "min_us": round(us[0], 3),
+        "median_us": round(statistics.median(us), 3),
+        "mean_us": round(statistics.fmean(us), 3),
+        "p95_us": round(us[min(len(us) - 1, int(len(us) * 0.95))], 3),
+        "stdev_us": round(statistics.stdev(us), 3) if len(us) > 1 else 0.0,
+    }
+
+
+def measure_memory(case):
+    """
+    1회 호출 동안의 파이썬 메모리 할당 (tracemalloc)
+    peak_kb: 호출 중 최대 추가 사용량, alloc_blocks: 호출 중 새로 할당되어 남아 있는 블록 수
+    """
+    if case.setup is not None:
+        case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        case.fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # 측정 도구 자체의 할당은 제외
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return {"peak_kb": round((peak - base) / 1024, 2), "alloc_blocks": blocks}
+
+
+def run_cases(cases, rounds=7, warmup=3, memory=True):
+    results = {}
+    for case in cases:
+        try:
+            entry = measure_time(case, rounds, warmup)
+            if memory:
+                entry.update(measure_memory(case))
+        except Exception as e:
+            print(f"[bench] {case.name}: 실패 ({type(e).__name__}: {e})")
+            continue
+        entry["group"] = case.group
+        results[case.name] = entry
+        mem = f", peak {entry['peak_kb']}KB, blocks {entry['alloc_blocks']}" if memory else ""
+        print(f"[bench] {case.name:<36} median {entry['median_us']:>10.2f}us "
+              f"(min {entry['min_us']:.2f}, p95 {entry['p95_us']:.2f}){mem}")
+    return results
+
+
+# ==============================
+# 기준선 저장 / 회귀 판정
+# ==============================
+def environment() -> dict:
+    import numpy as np
+    import cv2
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def save_results(path, results, meta=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": {**environment(), **(meta or {})}, "cases": results}, f, indent=2, ensure_ascii=False)
+
+
+def compare_baseline(baseline_path, results, threshold=0.2, min_delta_us=1.0, memory_threshold=0.5):
+    """
+    기준선 대비 회귀 단계 목록 반환
+    - 시간: median이 (1 + threshold)배를 넘고 차이가 min_delta_us 이상 (1us 미만 흔들림 무시)
+    - 메모리: peak_kb가 (1 + memory_threshold)배를 넘고 차이가 1KB 이상
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["cases"]
+
+    regressions = []
+    print(f"{'case':<36} {'base(us)':>10} {'now(us)':>10} {'change':>8}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        change = now["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        slow = change > threshold and now["median_us"] - base["median_us"] >= min_delta_us
+        mark = "  <- REGRESSION" if slow else ""
+        print(f"{name:<36} {base['median_us']:>10.2f} {now['median_us']:>10.2f} {change * 100:>+7.1f}%{mark}")
+        if slow:
+            regressions.append(f"{name}: median {base['median_us']}us -> {now['median_us']}us ({change * 100:+.1f}%)")
+
+        if "peak_kb" in base and "peak_kb" in now:
+            grown = now["peak_kb"] - base["peak_kb"]
+            if grown >= 1.0 and now["peak_kb"] > base["peak_kb"] * (1 + memory_threshold):
+                regressions.append(f"{name}: peak {base['peak_kb']}KB -> {now['peak_kb']}KB")
+    return regressions
@@ -0,0 +1,98 @@
+import math
+import time
+import random
+import numpy as np
+from mediapipe.tasks.python.components.containers.landmark import NormalizedLandmark
+from utils.mediapipeUtils import *
+
+# 랜드마크 기하 계산 마이크로벤치마크
+# 기존 파이썬 리스트 방식 vs (N, 2) 배열 변환 + 벡터화 헬퍼 비교
+# 실행: python -m benchmarks.landmarkGeometryBench
+
+NUM_LANDMARKS = 478
+FRAME_W, FRAME_H = 640, 853
+PAD_RATIO = 0.3
+ITERATIONS = 2000
+REPEATS = 5
+
+def make_landmarks(seed=0):
+    # FaceLandmarker 결과와 같은 NormalizedLandmark 객체 (좌표만 난수)
+    rnd = random.Random(seed)
+    return [NormalizedLandmark(x=rnd.uniform(0.3, 0.7), y=rnd.uniform(0.2, 0.8), z=rnd.uniform(-0.1, 0.1))
+            for _ in range(NUM_LANDMARKS)]
+
+def geometry_list(face_landmarks, w, h):
+    """기존 process_frame 방식 (리스트 컴프리헨션 + 파이썬 min/max) + 같은 방식의 EAR/MAR"""
+    forehead = face_landmarks[10].y
+    nose = face_landmarks[1].y
+    chin = face_landmarks[152].y
+    face_height = chin - forehead
+    nose_pos_ratio = (nose - forehead) / face_height if face_height != 0 else 0
+
+    x_coords = [lm.x * w for lm in face_landmarks]
+    y_coords = [lm.y * h for lm in face_landmarks]
+    min_x, max_x = min(x_coords), max(x_coords)
+    min_y, max_y = min(y_coords), max(y_coords)
+
+    pw = (max_x - min_x) * PAD_RATIO
+    ph = (max_y - min_y) * PAD_RATIO
+    crop_coords = (int(max(0, min_x - pw)), int(max(0, min_y - ph)),
+                   int(min(w, max_x + pw)), int(min(h, max_y + ph)))
+
+    delta_x = face_landmarks[263].x * w - face_landmarks[33].x * w
+    delta_y = face_landmarks[263].y * h - face_landmarks[33].y * h
+    angle = np.degrees(np.arctan2(delta_y, delta_x))
+
+    # EAR/MAR도 리스트 방식으로 계산 (같은 값을 구할 때의 비교 기준)
+    def dist(i, j):
+        return math.hypot(x_coords[i] - x_coords[j], y_coords[i] - y_coords[j])
+    def eye(idx):
+        p1, p2, p3, p4, p5, p6 = idx
+        return (dist(p2, p6) + dist(p3, p5)) / (2 * dist(p1, p4))
+    ear = (eye(LEFT_EYE_IDX) + eye(RIGHT_EYE_IDX)) / 2
+    m = MOUTH_IDX
+    mar = (dist(m[1], m[7]) + dist(m[2], m[6]) + dist(m[3], m[5])) / (3 * dist(m[0], m[4]))
+    return nose_pos_ratio, (min_x, min_y, max_x, max_y), crop_coords, angle, ear, mar
+
+def geometry_vectorized(face_landmarks, w, h):
+    """벡터화 헬퍼 방식 (배열 변환 1회 + EAR/MAR까지 계산)"""
+    pts = landmarks_to_array(face_landmarks, w, h)
+    bbox = landmark_bbox(pts)
+    return (head_drop_ratio(pts), bbox, padded_crop_coords(bbox, PAD_RATIO, w, h), roll_angle(pts),
+            eye_aspect_ratio(pts), mouth_aspect_ratio(pts))
+
+def bench(fn, face_landmarks, iterations=ITERATIONS, repeats=REPEATS):
+    for _ in range(50):  # 워밍업
+        fn(face_landmarks, FRAME_W, FRAME_H)
+    # repeats회 측정 중 최솟값 (다른 프로세스 간섭이 가장 적은 측정)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(face_landmarks, FRAME_W, FRAME_H)
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6  # us/frame
+
+if __name__ == "__main__":
+    face_landmarks = make_landmarks()
+
+    # 결과 일치 확인 (float32 변환 오차 범위 내)
+    ref = geometry_list(face_landmarks, FRAME_W, FRAME_H)
+    new = geometry_vectorized(face_landmarks, FRAME_W, FRAME_H)
+    assert abs(ref[0] - new[0]) < 1e-4, (ref[0], new[0])
+    assert np.allclose(ref[1], new[1], atol=1e-3), (ref[1], new[1])
+    assert all(abs(a - b) <= 1 for a, b in zip(ref[2], new[2])), (ref[2], new[2])
+    assert abs(ref[3] - new[3]) < 1e-3, (ref[3], new[3])
+    assert abs(ref[4] - new[4]) < 1e-4 and abs(ref[5] - new[5]) < 1e-4, (ref[4:], new[4:])
+
+    t_list = bench(geometry_list, face_landmarks)
+    t_vec = bench(geometry_vectorized, face_landmarks)
+    # 배열이 이미 있을 때(process_frame 이후 EAR/MAR 등 추가 계산) 비용
+    pts = landmarks_to_array(face_landmarks, FRAME_W, FRAME_H)
+    t_derived = bench(lambda _, w, h: (landmark_bbox(pts), head_drop_ratio(pts), roll_angle(pts),
+                                       eye_aspect_ratio(pts), mouth_aspect_ratio(pts)), face_landmarks)
+
+    print(f"랜드마크 {NUM_LANDMARKS}개, {ITERATIONS}회 반복 x {REPEATS} (최솟값)")
+    print(f"- 리스트 방식           : {t_list:8.1f} us/frame")
+    print(f"- 벡터화 (변환 포함)    : {t_vec:8.1f} us/frame  (x{t_list / t_vec:.2f})")
+    print(f"- 벡터화 파생 값만      : {t_derived:8.1f} us/frame  (변환 1회 이후 추가 소비자 비용)")
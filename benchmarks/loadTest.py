@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import httpx
+import numpy as np
+
+from benchmarks.benchFixtures import encode_upload, make_jpeg, make_nv21_y, sensor_plane
+from utils.supabaseStub import start_stub
+
+# FastAPI 엔드포인트 부하 테스트 (/analyze_raw, /analyze_jpeg, /analyze_batch)
+# - 앱과 같은 규격의 합성 프레임 생성: NV21 Y 평면(행 stride 패딩, 마지막 행 패딩 생략) / 흑백 JPEG
+# - 동시 요청 수(concurrency)별로 고정 요청 수를 보내고 처리량, p50/p95/p99 지연 시간 측정
+# - 서버 /metrics의 단계별 처리 시간(stages)을 실행 전후 차이로 계산해 단계별 평균 출력
+# - 결과는 커밋 해시와 함께 JSON으로 저장 (--compare로 이전 결과와 비교)
+# - --paced: 앱처럼 응답의 next_interval_ms(503이면 Retry-After)만큼 기다렸다가 다음 프레임 전송
+#   (기본은 응답 즉시 다음 요청을 보내는 최대 부하)
+# - --inflight K: 세션마다 응답을 기다리지 않고 K개 요청을 겹쳐 보냄 (스트리밍 클라이언트 모사)
+#   서버가 버린 프레임(dropped 응답)은 status_codes에 dropped:<사유>로 집계, 지연 시간은 분석된 프레임만
+# - --hog K: 일반 세션 외에 요청을 K개씩 겹쳐 보내는 세션 1개 추가 (전송 간격 설정이 잘못된 차량 모사)
+#   세션별 p95를 따로 집계해 다른 세션이 밀리는지 확인 (SCHEDULER_POLICY=fifo 서버와 비교)
+#   --hog-anonymous: hog 세션이 session_id 없이 전송 (최신 프레임 대체가 적용되지 않아 대기열을 채움)
+# - --upload MODE: /analyze_raw 축소 업로드 (예: scale2 / roi,scale2,jpeg, benchFixtures.encode_upload 참고)
+#   roi 모드는 세션별 직전 응답의 face_box에 여백을 더한 영역만 전송 (첫 프레임은 전체 프레임)
+# - --endpoints batch: 게이트웨이처럼 서로 다른 세션 --batch-size개의 NV21 프레임을 /analyze_batch 1건으로 전송
+#   지연 시간/상태 코드/처리량(frames_per_s)은 프레임 단위로 집계 (raw c8과 batch c1 --batch-size 8을 비교)
+#
+# 실행 (Supabase 대체 서버 + uvicorn 서버를 직접 띄움):
+#   python -m benchmarks.loadTest --spawn --face face.jpg --concurrency 1 4 8 --requests 200
+# 이미 떠 있는 서버 대상 (SUPABASE_URL은 utils/supabaseStub.py 주소로 지정해 둘 것):
+#   python -m benchmarks.loadTest --url http://127.0.0.1:8000 --face face.jpg
+# --face가 없으면 얼굴이 없는 합성 프레임이라 MediaPipe 이후 단계는 측정되지 않음
+
+# 앱 카메라(ResolutionPreset) 기준 NV21 규격: 가로x세로:row_stride (센서 방향, 가로가 김)
+RAW_GEOMETRIES = ["720x480:768", "640x480:640", "1280x720:1280"]
+# 웹 업로드 JPEG 규격 (정방향, 가로x세로)
+JPEG_SIZES = ["480x640"]
+FRAME_VARIANTS = 8  # 규격별로 미리 만들어 번갈아 보낼 프레임 수
+ROI_MARGIN = 0.2    # --upload roi: face_box 주변 여백 비율
+
+def parse_size(text):
+    size, _, stride = text.partition(":")
+    w, h = (int(v) for v in size.lower().split("x"))
+    return w, h, int(stride) if stride else w
+
+def roi_from_box(box, width, height, margin=ROI_MARGIN):
+    """센서 좌표 face_box에 여백을 더한 ROI (x1, y1, x2, y2)"""
+    x1, y1, x2, y2 = box
+    mx, my = (x2 - x1) * margin, (y2 - y1) * margin
+    return (max(0, int(x1 - mx)), max(0, int(y1 - my)), min(width, int(x2 + mx)), min(height, int(y2 + my)))
+
+def build_payloads(endpoint, spec, face, rng, steady=False, upload=None, batch_size=1):
+    """
+    요청별 multipart 인자 (files, data) 리스트
+    upload(축소 업로드 모드)나 batch면 (face_box, session_id) -> (files, data)를 만드는 함수 리스트
+    """
+    w, h, stride = parse_size(spec)
+    payloads = []
+    for _ in range(FRAME_VARIANTS):
+        if endpoint == "raw" and upload:
+            plane = sensor_plane(face, w, h, rng, steady)
+
+            def make(box, session_id=None, plane=plane):
+                roi = roi_from_box(box, w, h) if box else None
+                payload, fields = encode_upload(plane, upload, roi)
+                return {"y_plane": ("y.bin", payload, "application/octet-stream")}, fields
+            # roi 모드가 아니면 요청마다 같은 업로드이므로 미리 인코딩
+            payloads.append(make if "roi" in upload else make(None))
+        elif endpoint == "batch":
+            ys = [make_nv21_y(face, w, h, stride, rng, steady) for _ in range(batch_size)]
+
+            def make(box, session_id, ys=ys):
+                # 게이트웨이 1개가 세션 batch_size개의 프레임을 묶어 보냄 (세션 = 게이트웨이 세션/번호)
+                ts = int(time.time() * 1000)
+                manifest = [{"length": len(y), "session_id": f"{session_id}/{j}", "width": w, "height": h,
+                             "row_stride": stride, "format": "nv21", "capture_ts_ms": ts}
+                            for j, y in enumerate(ys)]
+                return ({"frames": ("frames.bin", b"".join(ys), "application/octet-stream")},
+                        {"manifest": json.dumps(manifest)})
+            payloads.append(make)
+        elif endpoint == "raw":
+            y = make_nv21_y(face, w, h, stride, rng, steady)
+            payloads.append(({"y_plane": ("y.bin", y, "application/octet-stream")},
+                             {"width": str(w), "height": str(h), "row_stride": str(stride), "format": "nv21"}))
+        else:
+            payloads.append(({"file": ("frame.jpg", make_jpeg(face, w, h, rng, steady), "image/jpeg")}, {}))
+    return payloads
+
+# ==============================
+# 부하 생성
+# ==============================
+async def run_level(client, url, payloads, concurrency, requests, warmup, label, paced=False, inflight=1, hog=0,
+                    hog_anonymous=False):
+    """
+    동시 요청 concurrency개로 requests건 전송 (세션은 동시 요청마다 1개, 운전자 1명 = 연결 1개 가정)
+    paced: 이전 전송 시각 + 서버 권장 간격까지 기다린 뒤 전송 (앱의 전송 타이머와 동일)
+    inflight: 세션마다 겹쳐 보내는 요청 수 (1보다 크면 같은 session_id로 inflight개 전송 루프 실행)
+    hog: 0보다 크면 페이싱 없이 hog개 요청을 겹쳐 보내는 세션 1개 추가 (hog 세션 요청도 requests에 포함)
+    """
+    latencies, codes, intervals = [], {}, []
+    per_session = {}
+    face_boxes = {}
+    counter = {"sent": 0, "bytes": 0}
+
+    async def driver(i, session_id, paced, send_session=True):
+        k = i
+        while counter["sent"] < warmup + requests:
+            n = counter["sent"]
+            counter["sent"] += 1
+            entry = payloads[k % len(payloads)]
+            files, data = entry(face_boxes.get(session_id), session_id) if callable(entry) else entry
+            k += 1
+            if n >= warmup:
+                counter["bytes"] += len(next(iter(files.values()))[1])
+            start = time.perf_counter()
+            interval_ms = None
+            frame_codes = None  # 배치 응답의 프레임별 결과
+            capture_ts_ms = str(int(time.time() * 1000))
+            try:
+                fields = {**data, "capture_ts_ms": capture_ts_ms}
+                if send_session:
+                    fields["session_id"] = session_id
+                resp = await client.post(url, files=files, data=fields)
+                code = resp.status_code
+                if code == 200:
+                    body = resp.json()
+                    interval_ms = body.get("next_interval_ms")
+                    if "results" in body:
+                        frame_codes = [f"dropped:{r['dropped']}" if r.get("dropped")
+                                       else "error" if r.get("status") is None else 200 for r in body["results"]]
+                    elif body.get("dropped"):
+                        code = f"dropped:{body['dropped']}"
+                    elif send_session and "face_box" in body:
+                        face_boxes[session_id] = body["face_box"]
+                elif code == 503:
+                    interval_ms = float(resp.headers.get("retry-after", 1)) * 1000
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            if paced and interval_ms:
+                await asyncio.sleep(max(0.0, start + interval_ms / 1000 - time.perf_counter()))
+            if n < warmup:
+                continue
+            for code in frame_codes or [code]:
+                codes[code] = codes.get(code, 0) + 1
+                if code == 200:
+                    latencies.append(elapsed)
+                    per_session.setdefault(session_id, []).append(elapsed)
+                    if interval_ms is not None:
+                        intervals.append(interval_ms)
+
+    drivers = [driver(i, f"load-{label}-{i // inflight}", paced) for i in range(concurrency * inflight)]
+    drivers += [driver(i, f"load-{label}-hog", False, not hog_anonymous) for i in range(hog)]
+    started = time.perf_counter()
+    await asyncio.gather(*drivers)
+    return latencies, codes, intervals, per_session, counter["bytes"], time.perf_counter() - started
+
+def latency_summary(latencies):
+    if not latencies:
+        return {}
+    arr = np.asarray(latencies)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        "mean_ms": round(float(arr.mean()), 2),
+        "max_ms": round(float(arr.max()), 2),
+    }
+
+def session_summary(per_session):
+    """세션별 p95 분포 (hog 세션은 따로) -> 특정 세션이 밀리는지 확인"""
+    normal = {sid: latency_summary(v) for sid, v in per_session.items() if not sid.endswith("-hog")}
+    hog = [v for sid, v in per_session.items() if sid.endswith("-hog")]
+    p95 = sorted(s["p95_ms"] for s in normal.values())
+    return {
+        "sessions": len(normal),
+        "ok_per_session": sorted(len(v) for sid, v in per_session.items() if not sid.endswith("-hog")),
+        "p95_min_ms": p95[0] if p95 else None,
+        "p95_max_ms": p95[-1] if p95 else None,
+        "hog": {"ok": len(hog[0]), **latency_summary(hog[0])} if hog else None,
+    }
+
+def stage_delta(before, after):
+    """/metrics stages 실행 전후 차이 -> 이번 실행 구간의 단계별 평균(ms)"""
+    out = {}
+    for name, stat in after.items():
+        prev = before.get(name, {"count": 0, "total_ms": 0.0})
+        count = stat["count"] - prev["count"]
+        if count > 0:
+            out[name] = {"count": count, "avg_ms": round((stat["total_ms"] - prev["total_ms"]) / count, 2)}
+    return out
+
+def cadence_delta(before, after):
+    """/metrics cadence 실행 전후 차이 -> 이번 실행 구간의 재사용/YOLO 생략 비율"""
+    if not before or not after:
+        return None
+    frames = after["frames"] - before["frames"]
+    reused = after["reused"] - before["reused"]
+    skipped = after["detect_skipped"] - before["detect_skipped"]
+    return {
+        "frames": frames,
+        "reuse_ratio": round(reused / frames, 3) if frames else 0.0,
+        "detect_skip_ratio": round((reused + skipped) / frames, 3) if frames else 0.0,
+    }
+
+async def get_metrics(client, base_url):
+    resp = await client.get(f"{base_url}/metrics")
+    resp.raise_for_status()
+    return resp.json()
+
+async def run_all(args, face):
+    rng = np.random.default_rng(args.seed)
+    runs = []
+    timeout = httpx.Timeout(args.timeout)
+    connections = max(args.concurrency) * args.inflight + args.hog
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        for endpoint in args.endpoints:
+            specs = args.jpeg_size if endpoint == "jpeg" else args.raw_geometry
+            batch_size = args.batch_size if endpoint == "batch" else 1
+            url = f"{args.url}/analyze_{endpoint}"
+            for spec in specs:
+                payloads = build_payloads(endpoint, spec, face, rng, args.scene == "steady",
+                                          args.upload if endpoint == "raw" else None, batch_size)
+                for concurrency in args.concurrency:
+                    label = f"{endpoint}-{spec}-c{concurrency}"
+                    before = await get_metrics(client, args.url)
+                    latencies, codes, intervals, per_session, sent_bytes, elapsed = await run_level(
+                        client, url, payloads, concurrency, args.requests, args.warmup, label, args.paced,
+                        args.inflight, args.hog, args.hog_anonymous)
+                    after = await get_metrics(client, args.url)
+
+                    run = {
+                        "endpoint": endpoint,
+                        "geometry": spec,
+                        "upload": args.upload if endpoint == "raw" else None,
+                        # 측정 구간 요청의 평균 업로드 크기 (roi 모드는 요청마다 달라짐)
+                        "payload_kb": round(sent_bytes / max(1, args.requests) / 1024, 1),
+                        "concurrency": concurrency,
+                        "batch_size": batch_size,
+                        "inflight": args.inflight,
+                        "hog": args.hog,
+                        "hog_anonymous": args.hog_anonymous,
+                        "requests": args.requests,
+                        "ok": len(latencies),
+                        "status_codes": {str(k): v for k, v in codes.items()},
+                        "elapsed_s": round(elapsed, 2),
+                        # 워밍업 요청 시간이 elapsed에 포함되므로 처리량은 전체 전송 수 기준
+                        "throughput_rps": round((args.requests + args.warmup) / elapsed, 2),
+                        "frames_per_s": round((args.requests + args.warmup) * batch_size / elapsed, 2),
+                        "latency": latency_summary(latencies),
+                        "sessions": session_summary(per_session),
+                        "stages": stage_delta(before.get("stages") or {}, after.get("stages") or {}),
+                        "inference": {k: after["inference"].get(k) for k in
+                                      ("avg_wait_ms", "avg_service_ms", "rejected", "superseded", "expired")},
+                        "cadence": cadence_delta(before.get("cadence"), after.get("cadence")),
+                        "next_interval_ms": latency_summary(intervals),
+                    }
+                    runs.append(run)
+                    lat = run["latency"]
+                    print(f"[load] {label}: {run['payload_kb']}KB/req, {run['throughput_rps']} req/s "
+                          f"({run['frames_per_s']} frames/s), "
+                          f"p50={lat.get('p50_ms')} p95={lat.get('p95_ms')} p99={lat.get('p99_ms')}ms, codes={run['status_codes']}")
+                    print(f"       stages: { {k: v['avg_ms'] for k, v in run['stages'].items()} }, "
+                          f"cadence: {run['cadence']}")
+                    sessions = run["sessions"]
+                    print(f"       sessions: p95 {sessions['p95_min_ms']}~{sessions['p95_max_ms']}ms, "
+                          f"ok/session {sessions['ok_per_session']}, hog {sessions['hog']}")
+                    if intervals:
+                        print(f"       next_interval_ms: p50={run['next_interval_ms']['p50_ms']} "
+                              f"max={run['next_interval_ms']['max_ms']}")
+        final = await get_metrics(client, args.url)
+    return runs, final
+
+# ==============================
+# 서버 실행 / 결과 저장
+# ==============================
+def spawn_server(args):
+    """Supabase 대체 서버 + uvicorn main:app 서브 프로세스 실행 후 /readyz 대기"""
+    stub, _, stub_url = start_stub()
+    work_dir = tempfile.mkdtemp(prefix="loadtest_")
+    env = dict(os.environ,
+               SUPABASE_URL=stub_url,
+               SAVE_DIR=os.path.join(work_dir, "drowsy_data"),
+               HISTORY_JOURNAL_PATH=os.path.join(work_dir, "history_journal.db"))
+    port = args.url.rsplit(":", 1)[-1]
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", port, "--log-level", "warning"],
+                            env=env)
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{args.url}/readyz", timeout=1.0).status_code == 200:
+                return proc, stub
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("server did not become ready")
+
+def git_revision():
+    try:
+        rev = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"]) != 0
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(baseline_path, runs):
+    """같은 엔드포인트/규격/동시성 실행끼리 처리량과 p50/p95/p99 비교 출력"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = {(r["endpoint"], r["geometry"], r["concurrency"]): r for r in baseline["runs"]}
+    print(f"[compare] baseline {baseline['meta']['revision']}")
+    for run in runs:
+        prev = base.get((run["endpoint"], run["geometry"], run["concurrency"]))
+        if prev is None or not prev["latency"] or not run["latency"]:
+            continue
+        cells = [f"rps {prev['throughput_rps']} -> {run['throughput_rps']}"]
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (run["latency"][key] / prev["latency"][key] - 1) * 100
+            cells.append(f"{key[:3]} {prev['latency'][key]} -> {run['latency'][key]} ({change:+.1f}%)")
+        print(f"  {run['endpoint']} {run['geometry']} c{run['concurrency']}: " + ", ".join(cells))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="Supabase 대체 서버와 uvicorn 서버를 직접 실행")
+    parser.add_argument("--endpoints", nargs="+", default=["raw", "jpeg"], choices=["raw", "jpeg", "batch"])
+    parser.add_argument("--raw-geometry", nargs="+", default=RAW_GEOMETRIES, help="가로x세로:row_stride")
+    parser.add_argument("--jpeg-size", nargs="+", default=JPEG_SIZES, help="가로x세로")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=200, help="동시성 단계별 측정 요청 수")
+    parser.add_argument("--warmup", type=int, default=10, help="단계별로 측정에서 제외할 앞쪽 요청 수")
+    parser.add_argument("--face", default=None, help="합성 프레임에 넣을 얼굴 이미지 경로")
+    parser.add_argument("--scene", default="moving", choices=["moving", "steady"],
+                        help="moving: 프레임마다 얼굴 위치 이동, steady: 위치 고정 + 센서 노이즈만 변화")
+    parser.add_argument("--paced", action="store_true", help="응답의 next_interval_ms 간격으로 전송 (앱 동작)")
+    parser.add_argument("--inflight", type=int, default=1, help="세션마다 겹쳐 보내는 요청 수 (스트리밍 모사)")
+    parser.add_argument("--batch-size", type=int, default=8, help="batch 엔드포인트 요청 1건의 프레임 수")
+    parser.add_argument("--upload", default=None,
+                        help="/analyze_raw 축소 업로드 모드 (예: scale2, roi,scale2,jpeg)")
+    parser.add_argument("--hog", type=int, default=0, help="요청을 이 수만큼 겹쳐 보내는 세션 1개 추가")
+    parser.add_argument("--hog-anonymous", action="store_true", help="hog 세션이 session_id 없이 전송")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: benchmarks/results/load_<커밋>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    face = None
+    if args.face:
+        face = cv2.imread(args.face, cv2.IMREAD_GRAYSCALE)
+        if face is None:
+            sys.exit(f"cannot read face image: {args.face}")
+    else:
+        print("[load] --face 미지정: 얼굴 없는 프레임이라 landmarks 이후 단계는 측정되지 않음")
+
+    proc = stub = None
+    if args.spawn:
+        proc, stub = spawn_server(args)
+    try:
+        runs, final_metrics = asyncio.run(run_all(args, face))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+            stub.shutdown()
+
+    revision = git_revision()
+    result = {
+        "meta": {
+            "revision": revision,
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "url": args.url,
+            "face": args.face,
+            "scene": args.scene,
+            "paced": args.paced,
+            "inflight": args.inflight,
+            "hog": args.hog,
+            "cpu_count": os.cpu_count(),
+            "server_startup": final_metrics.get("startup"),
+            "server_process": final_metrics.get("process"),
+            "server_inference": final_metrics.get("inference"),
+        },
+        "runs": runs,
+    }
+    out = args.out or os.path.join("benchmarks", "results", f"load_{revision}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"[load] saved {out}")
+    if args.compare:
+        compare(args.compare, runs)
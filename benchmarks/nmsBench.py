@@ -0,0 +1,88 @@
+import time
+import numpy as np
+from utils.camPredictUtils import calculate_iou, filter_overlapping_boxes, filter_overlapping_batch
+
+# 클래스 그룹 NMS 마이크로벤치마크
+# 기존 filter_overlapping_parts(파이썬 이중 루프) vs 벡터화 NMS 비교
+# 실행: python -m benchmarks.nmsBench (결과 일치 검증: tests/test_camPredictUtils.py)
+
+BOX_COUNTS = [5, 10, 16, 30, 100, 300]  # 16 이하는 작은 N 경로 (SMALL_NMS_MAX)
+BATCH_SIZE = 8
+CROP_SIZE = 320
+REPEAT = 20
+
+def legacy_filter(data, iou_threshold=0.3):
+    """기존 filter_overlapping_parts 구현 (results 대신 data 배열을 받도록만 변경)"""
+    eye_indices = [i for i, x in enumerate(data) if x[5] in [0, 1]]
+    mouth_indices = [i for i, x in enumerate(data) if x[5] in [2, 3]]
+
+    keep_indices = []
+
+    def get_best_idx(indices, weight_map={1: 1.05, 2: 1.2}):
+        if not indices: return []
+
+        def get_weighted_conf(i):
+            cls = int(data[i][5])
+            conf = data[i][4]
+            return conf * weight_map.get(cls, 1.0)
+
+        sorted_indices = sorted(indices, key=get_weighted_conf, reverse=True)
+
+        valid = []
+        used = set()
+
+        for i in sorted_indices:
+            if i in used: continue
+            valid.append(i)
+            for j in sorted_indices:
+                if i == j or j in used: continue
+                if calculate_iou(data[i][:4], data[j][:4]) > iou_threshold:
+                    used.add(j)
+        return valid
+
+    keep_indices.extend(get_best_idx(eye_indices))
+    keep_indices.extend(get_best_idx(mouth_indices))
+    return data[keep_indices]
+
+def make_detections(num_boxes, rng):
+    """
+    NMS 이전 YOLO 원시 출력과 비슷한 가짜 검출 결과 (N, 6) float32
+    눈 2곳, 입 1곳, 얼굴 1곳 주변에 흔들린 박스들이 몰려 있고
+    동점 신뢰도, 맞닿은 박스, 넓이 0 박스도 섞음
+    """
+    centers = np.array([[110, 130, 40, 24], [210, 130, 40, 24], [160, 240, 70, 40], [160, 170, 260, 300]])
+    part = rng.integers(0, 4, num_boxes)
+    cx, cy, bw, bh = (centers[part] * rng.normal(1.0, [0.06, 0.06, 0.2, 0.2], (num_boxes, 4))).T
+    cls = np.where(part < 2, rng.integers(0, 2, num_boxes), np.where(part == 2, rng.integers(2, 4, num_boxes), 4))
+    conf = np.round(rng.uniform(0.25, 0.95, num_boxes), 2)  # 소수 둘째 자리 -> 동점 발생
+
+    data = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2, conf, cls], axis=1)
+    data[:, :4] = np.clip(data[:, :4], 0, CROP_SIZE)
+    data = data.astype(np.float32)
+    if num_boxes >= 4:
+        data[1, :4] = data[0, :4]                        # 완전히 같은 박스
+        data[2, :4] = data[0, [2, 1, 2, 3]]              # 넓이 0 박스
+        data[3, 0], data[3, 2] = data[0, 2], data[0, 2] + 10  # 맞닿은 박스
+        data[3, 5] = data[0, 5]
+    return data
+
+def bench(fn, batch, repeat=REPEAT):
+    fn(batch)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(batch)
+    return (time.perf_counter() - start) / repeat / len(batch) * 1e3  # ms/image
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    # 결과 일치 확인은 tests/test_camPredictUtils.py (pytest)에서 수행
+    print(f"이미지당 원시 박스 수별 처리 시간 (배치 {BATCH_SIZE}장, {REPEAT}회 평균, ms/image)")
+    print(f"{'boxes':>6} {'legacy':>10} {'single':>10} {'batch':>10} {'single x':>9} {'batch x':>8}")
+    for n in BOX_COUNTS:
+        batch = [make_detections(n, rng) for _ in range(BATCH_SIZE)]
+        t_legacy = bench(lambda b: [legacy_filter(d) for d in b], batch, repeat=max(1, REPEAT // (n // 10 or 1)))
+        t_single = bench(lambda b: [filter_overlapping_boxes(d) for d in b], batch)
+        t_batch = bench(filter_overlapping_batch, batch)
+        print(f"{n:>6} {t_legacy:>10.3f} {t_single:>10.3f} {t_batch:>10.3f} "
+              f"{t_legacy / t_single:>8.1f}x {t_legacy / t_batch:>7.1f}x")
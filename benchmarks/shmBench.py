@@ -0,0 +1,182 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import httpx
+import numpy as np
+
+from benchmarks.benchFixtures import make_nv21_y
+from benchmarks.loadTest import FRAME_VARIANTS, git_revision, latency_summary, parse_size, spawn_server
+from utils.shmTransport import ShmFrameClient
+
+# 공유 메모리 로컬 채널(utils/shmTransport.py)과 HTTP /analyze_raw 비교 (같은 장치의 카메라 프로세스 시나리오)
+# - 같은 NV21 프레임을 세션 concurrency개가 응답을 받을 때마다 다음 프레임을 보내는 방식으로 전송
+# - 전송 방식별 처리량, 지연 시간 p50/p95/p99, 프레임당 서버/클라이언트 CPU 시간(ms)
+#   (서버 CPU는 /proc/<pid>/stat 기준이라 --spawn으로 띄운 서버만 측정)
+#
+# 실행 (Supabase 대체 서버 + uvicorn 서버를 SHM_SOCKET_PATH와 함께 직접 띄움):
+#   python -m benchmarks.shmBench --spawn --face face.jpg --concurrency 1 4 --requests 200
+# 이미 떠 있는 서버 대상: python -m benchmarks.shmBench --url http://127.0.0.1:8000 --socket /run/xident.sock
+
+def cpu_seconds(pid):
+    """프로세스 누적 CPU 시간(user + system, 초), 읽을 수 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def run_http(args, frames, w, h, stride, concurrency, total, label):
+    def session(i, next_index, record):
+        with httpx.Client(timeout=args.timeout) as client:
+            while (n := next_index()) is not None:
+                y = frames[n % len(frames)]
+                start = time.perf_counter()
+                resp = client.post(f"{args.url}/analyze_raw", files={"y_plane": ("y.bin", y, "application/octet-stream")},
+                                   data={"width": str(w), "height": str(h), "row_stride": str(stride),
+                                         "session_id": f"{label}-{i}", "capture_ts_ms": str(int(time.time() * 1000))})
+                body = resp.json() if resp.status_code == 200 else {}
+                record(n, resp.status_code if not body.get("dropped") else f"dropped:{body['dropped']}",
+                       time.perf_counter() - start)
+    return drive(session, concurrency, total)
+
+def run_shm(args, frames, w, h, stride, concurrency, total, label):
+    def session(i, next_index, record):
+        with ShmFrameClient(args.socket, slots=2, slot_size=stride * h, session_id=f"{label}-{i}",
+                            timeout=args.timeout) as client:
+            while (n := next_index()) is not None:
+                start = time.perf_counter()
+                msg = client.analyze(frames[n % len(frames)], w, h, stride)
+                code = 200 if msg["type"] == "result" else f"{msg['type']}:{msg.get('reason', msg.get('error'))}"
+                record(n, code, time.perf_counter() - start)
+    return drive(session, concurrency, total)
+
+def drive(session, concurrency, total):
+    """세션 스레드 concurrency개로 total건 전송 -> (요청 번호별 (상태, 지연 초) 목록, 경과 초)"""
+    lock = threading.Lock()
+    counter = {"next": 0}
+    results = []
+
+    def next_index():
+        with lock:
+            if counter["next"] >= total:
+                return None
+            counter["next"] += 1
+            return counter["next"] - 1
+
+    def record(n, code, elapsed):
+        with lock:
+            results.append((n, code, elapsed))
+
+    threads = [threading.Thread(target=session, args=(i, next_index, record)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - started
+
+def measure(args, transport, frames, spec, concurrency, server_pid):
+    w, h, stride = parse_size(spec)
+    label = f"{transport}-{spec}-c{concurrency}"
+    run = run_http if transport == "http" else run_shm
+    run(args, frames, w, h, stride, concurrency, args.warmup, label + "-warmup")
+
+    server_before, client_before = cpu_seconds(server_pid) if server_pid else None, time.process_time()
+    results, elapsed = run(args, frames, w, h, stride, concurrency, args.requests, label)
+    server_after, client_after = cpu_seconds(server_pid) if server_pid else None, time.process_time()
+
+    codes = {}
+    for _, code, _ in results:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+    latencies = [elapsed_s * 1000 for _, code, elapsed_s in results if code == 200]
+    server_cpu = None
+    if server_before is not None and server_after is not None:
+        server_cpu = round((server_after - server_before) / len(results) * 1000, 2)
+    return {
+        "transport": transport,
+        "geometry": spec,
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "status_codes": codes,
+        "throughput_fps": round(len(results) / elapsed, 2),
+        "latency": latency_summary(latencies),
+        # 프레임당 CPU 시간 (서버: 분석 포함 전체, 클라이언트: 이 벤치마크 프로세스의 전송 비용)
+        "server_cpu_ms_per_frame": server_cpu,
+        "client_cpu_ms_per_frame": round((client_after - client_before) / len(results) * 1000, 2),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--socket", default=None, help="공유 메모리 채널 소켓 경로 (--spawn이면 임시 경로)")
+    parser.add_argument("--spawn", action="store_true", help="Supabase 대체 서버와 uvicorn 서버를 직접 실행")
+    parser.add_argument("--transports", nargs="+", default=["http", "shm"], choices=["http", "shm"])
+    parser.add_argument("--raw-geometry", nargs="+", default=["720x480:768"], help="가로x세로:row_stride")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--face", default=None, help="합성 프레임에 넣을 얼굴 이미지 경로")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: benchmarks/results/shm_<커밋>.json)")
+    args = parser.parse_args()
+
+    face = None
+    if args.face:
+        face = cv2.imread(args.face, cv2.IMREAD_GRAYSCALE)
+        if face is None:
+            sys.exit(f"cannot read face image: {args.face}")
+    if args.spawn:
+        args.socket = args.socket or os.path.join(tempfile.mkdtemp(prefix="shmbench_"), "xident.sock")
+        os.environ["SHM_SOCKET_PATH"] = args.socket
+    elif "shm" in args.transports and not args.socket:
+        sys.exit("--socket 필요 (서버의 SHM_SOCKET_PATH)")
+
+    rng = np.random.default_rng(args.seed)
+    proc = stub = None
+    if args.spawn:
+        proc, stub = spawn_server(args)
+    runs = []
+    try:
+        for spec in args.raw_geometry:
+            w, h, stride = parse_size(spec)
+            frames = [make_nv21_y(face, w, h, stride, rng) for _ in range(FRAME_VARIANTS)]
+            for concurrency in args.concurrency:
+                for transport in args.transports:
+                    run = measure(args, transport, frames, spec, concurrency, proc.pid if proc else None)
+                    runs.append(run)
+                    lat = run["latency"]
+                    print(f"[shm] {transport} {spec} c{concurrency}: {run['throughput_fps']} frames/s, "
+                          f"p50={lat.get('p50_ms')} p95={lat.get('p95_ms')} p99={lat.get('p99_ms')}ms, "
+                          f"cpu/frame server={run['server_cpu_ms_per_frame']} client={run['client_cpu_ms_per_frame']}ms, "
+                          f"codes={run['status_codes']}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+            stub.shutdown()
+
+    revision = git_revision()
+    result = {
+        "meta": {
+            "revision": revision,
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "face": args.face,
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    out = args.out or os.path.join("benchmarks", "results", f"shm_{revision}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"[shm] saved {out}")
@@ -0,0 +1,203 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import cv2
+
+from benchmarks import benchFixtures as fx
+from benchmarks.benchHarness import Case, compare_baseline, run_cases, save_results
+from utils.camPredictUtils import (calculate_iou, filter_overlapping_boxes, filter_overlapping_parts,
+                                   isYawning, unletterbox_boxes)
+from utils.frameIngest import FrameIngestor, RawUpload, decode_gray
+
+# 단계별 마이크로벤치마크 (전처리, MediaPipe, 후처리, 데이터셋 변환 작업)
+# 실행: python -m benchmarks.stageBench [--filter nms] [--save-baseline base.json]
+# 회귀 검사: python -m benchmarks.stageBench --baseline base.json --threshold 0.2
+#   (기준선보다 median이 20% 이상 느려진 단계가 있으면 종료 코드 1)
+# 실제 얼굴 프레임 단계: python -m benchmarks.stageBench --record face.jpg [--record-label face.txt]
+#   로 한 번 녹화해 두면 process_frame/preprocess_image의 얼굴 검출 경로까지 측정
+
+LANDMARKER_MODEL_PATH = os.environ.get("LANDMARKER_MODEL_PATH", "face_landmarker.task")
+
+
+def ingest_cases():
+    """
+    업로드 전처리 (기존 main.preprocess_image의 PIL 흑백/리사이즈는 FrameIngestor로 대체됨)
+    """
+    y_plane, width, height, stride = fx.synthetic_upload("nv21")
+    jpeg = fx.synthetic_upload("jpeg")
+    gray = decode_gray(jpeg)
+    ingestor = FrameIngestor()
+    cases = [
+        Case("ingest.decode_gray[jpeg 480x640]", lambda: decode_gray(jpeg), group="ingest"),
+        Case("ingest.ingest_nv21[720x480:768]", lambda: ingestor.ingest_nv21(y_plane, width, height, stride),
+             group="ingest"),
+        Case("ingest.ingest_gray[480x640]", lambda: ingestor.ingest_gray(gray), group="ingest"),
+    ]
+
+    # 축소/ROI/압축 업로드 (/analyze_raw 확장 형식, 디코딩 포함)
+    plane = fx.sensor_plane(None, width, height, fx.np.random.default_rng(fx.SEED))
+    roi = (180, 60, 540, 420)  # 얼굴 주변 360x360
+    modes = ["scale2", "roi", "roi,scale2", "scale2,jpeg", "scale2,webp", "roi,scale2,jpeg"]
+    try:
+        import zstandard  # noqa: F401
+        modes.append("scale2,zstd")
+    except ImportError:
+        pass
+    for mode in modes:
+        payload, fields = fx.encode_upload(plane, mode, roi)
+        upload = RawUpload(fields["format"], int(fields["width"]), int(fields["height"]), None, width, height,
+                           (int(fields["roi_x"]), int(fields["roi_y"]),
+                            int(fields["roi_width"]), int(fields["roi_height"])))
+        cases.append(Case(f"ingest.ingest_upload[{mode} {len(payload) // 1024}KB]",
+                          lambda payload=payload, upload=upload: ingestor.ingest_upload(payload, upload),
+                          group="ingest"))
+    return cases
+
+
+def vision_cases(work_dir):
+    """FaceProcessor.process_frame / preprocess_image (IMAGE 모드 랜드마커)"""
+    try:
+        from utils.mediapipeUtils import FaceProcessor
+    except ImportError as e:
+        print(f"[bench] vision 단계 생략: {e}")
+        return []
+
+    processor = FaceProcessor(LANDMARKER_MODEL_PATH)
+    out_img = os.path.join(work_dir, "mp_images") + os.sep
+    out_lbl = os.path.join(work_dir, "mp_labels") + os.sep
+    os.makedirs(out_img, exist_ok=True)
+    os.makedirs(out_lbl, exist_ok=True)
+
+    no_face = fx.synthetic_frame()
+    no_face_gray = cv2.cvtColor(no_face, cv2.COLOR_BGR2GRAY)
+    cases = [
+        Case("vision.process_frame[no_face]", lambda: processor.process_frame(no_face), group="vision"),
+        Case("vision.process_frame[no_face,gray_input]", lambda: processor.process_frame(no_face_gray),
+             group="vision"),
+        Case("vision.preprocess_image[no_face]",
+             lambda: processor.preprocess_image(no_face, "", out_img, out_lbl), group="vision"),
+    ]
+
+    recorded = fx.load_recorded()
+    if recorded is None:
+        print(f"[bench] 녹화 프레임 없음({fx.RECORDED_PATH}): 얼굴 검출 경로 단계 생략 (--record로 생성)")
+        return cases
+    frame, label = recorded
+    frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    label = label or fx.synthetic_label()
+    if processor.process_frame(frame) is None:
+        print("[bench] 녹화 프레임에서 얼굴을 찾지 못해 얼굴 검출 경로 단계 생략")
+        return cases
+    cases += [
+        Case("vision.process_frame[recorded]", lambda: processor.process_frame(frame), group="vision"),
+        Case("vision.process_frame[recorded,320,gray]",
+             lambda: processor.process_frame(frame, out_size=320, gray=True), group="vision"),
+        # 서빙 경로와 같은 흑백 입력 (MediaPipe 입력 RGB 변환 1회, 정렬/크롭은 1채널)
+        Case("vision.process_frame[recorded,320,gray_input]",
+             lambda: processor.process_frame(frame_gray, out_size=320, gray=True), group="vision"),
+        Case("vision.preprocess_image[recorded]",
+             lambda: processor.preprocess_image(frame, label, out_img, out_lbl), group="vision"),
+    ]
+    return cases
+
+
+def postprocess_cases():
+    """YOLO 결과 후처리"""
+    boxes30 = fx.synthetic_detections(30)
+    boxes300 = fx.synthetic_detections(300)
+    results30 = [fx.FakeResult(boxes30)]
+    box_a, box_b = boxes30[0, :4].tolist(), boxes30[5, :4].tolist()
+    mouth = boxes30[0].copy()
+    bbox_coords = (100, 80, 300, 330)
+    letterbox = (1.6, 0, 24)
+    kept = filter_overlapping_boxes(boxes30)
+    return [
+        Case("post.calculate_iou", lambda: calculate_iou(box_a, box_b), group="postprocess"),
+        Case("post.filter_overlapping_parts[30]", lambda: filter_overlapping_parts(results30), group="postprocess"),
+        Case("post.filter_overlapping_boxes[300]", lambda: filter_overlapping_boxes(boxes300), group="postprocess"),
+        Case("post.unletterbox_boxes", lambda: unletterbox_boxes(kept, letterbox), group="postprocess"),
+        Case("post.isYawning", lambda: isYawning(mouth, bbox_coords), group="postprocess"),
+    ]
+
+
+def dataset_cases(work_dir):
+    """학습 데이터 변환 작업 단위 (ProcessPoolExecutor 워커 함수 1회 호출)"""
+    from pathlib import Path
+
+    cases = []
+    try:
+        from jsonNormalizeYolo import process_single_file
+    except ImportError as e:
+        print(f"[bench] jsonNormalizeYolo 단계 생략: {e}")
+    else:
+        src = Path(work_dir) / "annotations"
+        dst = Path(work_dir) / "labels"
+        src.mkdir(exist_ok=True)
+        dst.mkdir(exist_ok=True)
+        json_path = src / "sample.json"
+        fx.write_annotation_json(json_path)
+        txt_path = dst / "sample.txt"
+
+        def remove_output():
+            # 출력 파일이 있으면 EXISTS로 바로 끝나므로 매 호출 전에 삭제
+            if txt_path.exists():
+                txt_path.unlink()
+        cases.append(Case("dataset.process_single_file", lambda: process_single_file((json_path, dst)),
+                          setup=remove_output, group="dataset"))
+
+    try:
+        from dataBalancePro import augment_worker
+    except ImportError as e:
+        print(f"[bench] dataBalancePro 단계 생략: {e}")
+    else:
+        dirs = [os.path.join(work_dir, d) for d in ("images", "labels_yolo", "aug_images", "aug_labels")]
+        for d in dirs:
+            os.makedirs(d, exist_ok=True)
+        fx.write_image_label(dirs[0], dirs[1], "sample")
+        task = (os.path.join(dirs[1], "sample.txt"), dirs[0], dirs[2], dirs[3])
+        cases.append(Case("dataset.augment_worker[1920x1080]", lambda: augment_worker(task), group="dataset"))
+    return cases
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filter", default=None, help="이름에 이 문자열이 들어간 단계만 실행")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 측정 생략")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--save-baseline", default=None, help="결과를 기준선 JSON으로 저장")
+    parser.add_argument("--baseline", default=None, help="비교할 기준선 JSON (회귀 시 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 median 증가율")
+    parser.add_argument("--min-delta-us", type=float, default=1.0, help="이보다 작은 차이는 회귀로 보지 않음")
+    parser.add_argument("--record", default=None, help="녹화할 실제 얼굴 이미지 경로")
+    parser.add_argument("--record-label", default=None, help="녹화 이미지의 YOLO 라벨 경로")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"[bench] recorded -> {fx.record_frame(args.record, args.record_label)}")
+
+    work_dir = tempfile.mkdtemp(prefix="stagebench_")
+    try:
+        cases = ingest_cases() + vision_cases(work_dir) + postprocess_cases() + dataset_cases(work_dir)
+        if args.filter:
+            cases = [c for c in cases if args.filter in c.name]
+        results = run_cases(cases, rounds=args.rounds, warmup=args.warmup, memory=not args.no_memory)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            save_results(path, results, {"rounds": args.rounds, "recorded": os.path.isfile(fx.RECORDED_PATH)})
+            print(f"[bench] saved {path}")
+
+    if args.baseline:
+        regressions = compare_baseline(args.baseline, results, args.threshold, args.min_delta_us)
+        if regressions:
+            print("[bench] 회귀 발생:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("[bench] 회귀 없음")
@@ -35,7 +35,18 @@ class _DrivingScreenState extends State<DrivingScreen> {
   int _elapsedSeconds = 0;
   DateTime _lastServerSend = DateTime.now();
 
+  // 서버가 응답마다 next_interval_ms로 다음 전송 간격을 알려주며, 아래 범위 안에서만 따름
   static const int SEND_INTERVAL_MS = 300;
+  static const int MIN_SEND_INTERVAL_MS = 100;
+  static const int MAX_SEND_INTERVAL_MS = 2000;
+  int _sendIntervalMs = SEND_INTERVAL_MS;
+  final String _sessionId = DateTime.now().microsecondsSinceEpoch.toString();
+
+  // 업로드 축소: Y 평면을 UPLOAD_SCALE배 축소하고, 직전 응답의 face_box(센서 좌표) 주변만 잘라 전송
+  // 얼굴을 놓치면(face_box 없음) 다음 프레임은 전체 화면 전송
+  static const int UPLOAD_SCALE = 2;
+  static const double ROI_MARGIN = 0.2;
+  List<int>? _faceBox;
 
   final MathQuizEngine _quizEngine = MathQuizEngine();
   final SpeechService _speechService = SpeechService();
@@ -255,7 +266,7 @@ class _DrivingScreenState extends State<DrivingScreen> {
     if (_isProcessing || !mounted || _controller == null) return;
 
     final now = DateTime.now();
-    if (now.difference(_lastServerSend).inMilliseconds < SEND_INTERVAL_MS) return;
+    if (now.difference(_lastServerSend).inMilliseconds < _sendIntervalMs) return;
 
     _isProcessing = true;
     _lastServerSend = now;
@@ -270,40 +281,45 @@ class _DrivingScreenState extends State<DrivingScreen> {
   }
 
   Future<void> _sendRawImageToServer(CameraImage image) async {
+    final int captureTsMs = DateTime.now().millisecondsSinceEpoch;
     try {
       const String serverUrl = "http://172.30.1.81:8000/analyze_raw";
       var request = http.MultipartRequest('POST', Uri.parse(serverUrl));
 
+      // 서버는 Y 평면만 사용하므로 uv_plane은 보내지 않음
+      final roi = _uploadRoi(image.width, image.height);
+      final int outW = roi[2] ~/ UPLOAD_SCALE;
+      final int outH = roi[3] ~/ UPLOAD_SCALE;
       request.files.add(http.MultipartFile.fromBytes(
         'y_plane',
-        image.planes[0].bytes,
+        _cropScaleY(image.planes[0], roi, outW, outH),
         filename: 'y_plane.bin',
       ));
 
-      if (image.planes.length > 1) {
-        request.files.add(http.MultipartFile.fromBytes(
-          'uv_plane',
-          image.planes[1].bytes,
-          filename: 'uv_plane.bin',
-        ));
-      } else {
-        request.files.add(http.MultipartFile.fromBytes(
-          'uv_plane',
-          Uint8List(0),
-          filename: 'empty_uv.bin',
-        ));
-      }
-
-      request.fields['width'] = image.width.toString();
-      request.fields['height'] = image.height.toString();
-      request.fields['format'] = 'nv21';
-      request.fields['row_stride'] = image.planes[0].bytesPerRow.toString();
+      request.fields['width'] = outW.toString();
+      request.fields['height'] = outH.toString();
+      request.fields['format'] = 'y8';
+      request.fields['row_stride'] = outW.toString();
+      request.fields['full_width'] = image.width.toString();
+      request.fields['full_height'] = image.height.toString();
+      request.fields['roi_x'] = roi[0].toString();
+      request.fields['roi_y'] = roi[1].toString();
+      request.fields['roi_width'] = roi[2].toString();
+      request.fields['roi_height'] = roi[3].toString();
+      request.fields['session_id'] = _sessionId;
+      request.fields['capture_ts_ms'] = captureTsMs.toString();
 
       var response = await request.send();
+      _applyRetryAfter(response);
 
       if (response.statusCode == 200) {
         final respStr = await response.stream.bytesToString();
         final data = json.decode(respStr);
+        _applyServerInterval(data);
+        // 서버가 더 새 프레임 또는 마감 초과로 버린 프레임 (상태 유지)
+        if (data['dropped'] != null) return;
+        final faceBox = data['face_box'];
+        _faceBox = faceBox == null ? null : List<int>.from(faceBox);
         final int receivedStatus = data['status'];
 
         if (mounted) {
@@ -329,14 +345,59 @@ class _DrivingScreenState extends State<DrivingScreen> {
     }
   }
 
+  // 업로드할 센서 영역 [x, y, w, h]: 직전 face_box + 여백, 없으면 전체 프레임
+  List<int> _uploadRoi(int width, int height) {
+    final box = _faceBox;
+    if (box == null) return [0, 0, width, height];
+    final int mx = ((box[2] - box[0]) * ROI_MARGIN).round();
+    final int my = ((box[3] - box[1]) * ROI_MARGIN).round();
+    final int x1 = (box[0] - mx).clamp(0, width);
+    final int y1 = (box[1] - my).clamp(0, height);
+    final int x2 = (box[2] + mx).clamp(0, width);
+    final int y2 = (box[3] + my).clamp(0, height);
+    if (x2 - x1 < UPLOAD_SCALE || y2 - y1 < UPLOAD_SCALE) return [0, 0, width, height];
+    return [x1, y1, x2 - x1, y2 - y1];
+  }
+
+  // Y 평면의 roi 영역을 UPLOAD_SCALE 간격으로 샘플링해 (outW x outH) 연속 버퍼로 복사
+  Uint8List _cropScaleY(Plane plane, List<int> roi, int outW, int outH) {
+    final src = plane.bytes;
+    final int stride = plane.bytesPerRow;
+    final out = Uint8List(outW * outH);
+    for (int y = 0; y < outH; y++) {
+      final int srcRow = (roi[1] + y * UPLOAD_SCALE) * stride + roi[0];
+      final int dstRow = y * outW;
+      for (int x = 0; x < outW; x++) {
+        out[dstRow + x] = src[srcRow + x * UPLOAD_SCALE];
+      }
+    }
+    return out;
+  }
+
+  // 서버 권장 간격 반영 (범위 밖 값은 잘라냄)
+  void _applyServerInterval(dynamic data) {
+    final interval = data['next_interval_ms'];
+    if (interval is num) {
+      _sendIntervalMs = interval.toInt().clamp(MIN_SEND_INTERVAL_MS, MAX_SEND_INTERVAL_MS);
+    }
+  }
+
+  // 서버 포화(503) 시 Retry-After 동안 전송 중단
+  void _applyRetryAfter(http.StreamedResponse response) {
+    if (response.statusCode != 503) return;
+    final retryAfter = int.tryParse(response.headers['retry-after'] ?? '') ?? 1;
+    _sendIntervalMs = (retryAfter * 1000).clamp(MIN_SEND_INTERVAL_MS, MAX_SEND_INTERVAL_MS);
+  }
+
   DateTime _lastCaptureTime = DateTime.now();
 
   void _startWebCaptureTimer() {
-    _timer = Timer.periodic(const Duration(milliseconds: SEND_INTERVAL_MS), (timer) async {
+    // 타이머는 최소 간격으로 돌리고 실제 전송은 서버 권장 간격(_sendIntervalMs)마다
+    _timer = Timer.periodic(const Duration(milliseconds: MIN_SEND_INTERVAL_MS), (timer) async {
       if (_isProcessing || !mounted || _controller == null || !_controller!.value.isInitialized) return;
 
       final now = DateTime.now();
-      if (now.difference(_lastCaptureTime).inMilliseconds < SEND_INTERVAL_MS) return;
+      if (now.difference(_lastCaptureTime).inMilliseconds < _sendIntervalMs) return;
 
       _isProcessing = true;
       _lastCaptureTime = now;
@@ -354,6 +415,7 @@ class _DrivingScreenState extends State<DrivingScreen> {
   }
 
   Future<void> _sendJpegToServer(Uint8List jpegBytes) async {
+    final int captureTsMs = DateTime.now().millisecondsSinceEpoch;
     try {
       const String serverUrl = "http://localhost:8000/analyze_jpeg";
       var request = http.MultipartRequest('POST', Uri.parse(serverUrl));
@@ -362,12 +424,17 @@ class _DrivingScreenState extends State<DrivingScreen> {
         jpegBytes,
         filename: 'frame.jpg',
       ));
+      request.fields['session_id'] = _sessionId;
+      request.fields['capture_ts_ms'] = captureTsMs.toString();
 
       var response = await request.send();
+      _applyRetryAfter(response);
 
       if (response.statusCode == 200) {
         final respStr = await response.stream.bytesToString();
         final data = json.decode(respStr);
+        _applyServerInterval(data);
+        if (data['dropped'] != null) return;
         final int receivedStatus = data['status']; // 서버에서 받은 Level (0, 1, 2, 3)
 
         if (mounted) {
@@ -1,31 +1,361 @@
+import time
+_IMPORT_STARTED = time.perf_counter()  # 기동 시간 측정용 (가벼운 모듈 import 포함)
+
 import os
-import io
+import json
+import asyncio
 import datetime
+import threading
+from contextlib import asynccontextmanager
 import numpy as np
-from fastapi import FastAPI, File, UploadFile, Form
+from fastapi import FastAPI, File, UploadFile, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from ultralytics import YOLO
-from PIL import Image
-from supabase import create_client, Client
+from fastapi.responses import JSONResponse
 import cv2
 from typing import Optional
 from utils.camPredictUtils import *
-from utils.mediapipeUtils import *
+from utils.inferenceWorker import InferencePool, QueueFullError, FrameDropped
+from utils.microBatcher import MicroBatcher
+from utils.streamProtocol import *
+from utils.historyWriter import HistoryWriter, make_postgrest_insert
+from utils.captureStore import CaptureStore
+from utils.frameIngest import FrameIngestor, RawUpload, check_plane, decode_gray, sensor_box, ANALYSIS_WIDTH
+from utils.batchManifest import BatchFrame, parse_batch
+from utils.shmTransport import ShmRing, decode_message, encode_message, parse_frame
+from utils.detectorBackends import create_detector
+from utils.serverStartup import StartupTracker, BACKEND_MODULES
+from utils.serveRuntime import apply_thread_budget, available_cpus, process_stats
+from utils.stageTimer import StageTimer, summarize_stages
+from utils.sessionCadence import CadenceScheduler
+from utils.sendInterval import IntervalAdvisor
+from utils.landmarkCascade import LandmarkCascade
+from utils.frameDeadline import DeadlineClock
 
 # ==============================
 # 기본 설정
 # ==============================
-MODEL_PATH = "best.onnx"
-SAVE_DIR = "drowsy_data"
+MODEL_PATH = os.environ.get("MODEL_PATH", "best.onnx")
+DETECT_IMGSZ = 320  # YOLO 입력 크기 (얼굴 크롭을 이 크기로 바로 정렬/레터박스)
+DETECT_CONF = 0.25               # 탐지 임계값
+DETECT_CLASSES = [0, 1, 2, 3]    # 분석 대상 클래스 (얼굴(4) 제외)
+
+# YOLO 실행 백엔드 (onnxruntime / openvino / ultralytics)
+# onnxruntime, openvino는 ultralytics/torch 없이 모델을 직접 실행
+DETECTOR_BACKEND = os.environ.get("DETECTOR_BACKEND", "onnxruntime")
+# openvino: CPU / GPU, ultralytics: 기존 설정(intel:gpu) 유지
+DETECTOR_DEVICE = os.environ.get("DETECTOR_DEVICE", "intel:gpu" if DETECTOR_BACKEND == "ultralytics" else "CPU")
+SAVE_DIR = os.environ.get("SAVE_DIR", "drowsy_data")  # serve.py는 워커 프로세스별 하위 폴더 지정
+LANDMARKER_MODEL_PATH = os.environ.get("LANDMARKER_MODEL_PATH", "face_landmarker.task")
 
 # 보안을 위해 실제 서비스 시에는 환경변수 사용을 권장합니다.
-SUPABASE_URL = "https://fplqfuggropbbibvzmtl.supabase.co"
-SUPABASE_KEY = "sb_publishable_QXps8MSGAZJbaMMdfjICiQ_CVMBcV1c"
+# 로컬 검증 시 SUPABASE_URL을 utils/supabaseStub.py 주소로 지정
+SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://fplqfuggropbbibvzmtl.supabase.co")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "sb_publishable_QXps8MSGAZJbaMMdfjICiQ_CVMBcV1c")
+SUPABASE_TABLE = "drowsy_history"
+
+# DB 기록 write-behind 설정 (묶음 크기, 최대 대기 시간, 장애 시 보관 저널 경로)
+HISTORY_BATCH_SIZE = int(os.environ.get("HISTORY_BATCH_SIZE", 50))
+HISTORY_FLUSH_INTERVAL = float(os.environ.get("HISTORY_FLUSH_INTERVAL", 1.0))
+HISTORY_JOURNAL_PATH = os.environ.get("HISTORY_JOURNAL_PATH", os.path.join(SAVE_DIR, "history_journal.db"))
+
+# 프레임 이미지 저장 정책 (all / event / sample / none) 및 디스크 사용 한도
+CAPTURE_POLICY = os.environ.get("CAPTURE_POLICY", "event")
+CAPTURE_SAMPLE_EVERY = int(os.environ.get("CAPTURE_SAMPLE_EVERY", 30))
+CAPTURE_PRE_EVENT = int(os.environ.get("CAPTURE_PRE_EVENT", 10))
+CAPTURE_POST_EVENT = int(os.environ.get("CAPTURE_POST_EVENT", 10))
+CAPTURE_QUOTA_MB = float(os.environ.get("CAPTURE_QUOTA_MB", 2048))
+
+# 세션별 VIDEO 모드 랜드마커 풀 설정 (세션당 랜드마커 1개, 유휴 세션은 해제)
+LANDMARKER_MAX_SESSIONS = int(os.environ.get("LANDMARKER_MAX_SESSIONS", 32))
+LANDMARKER_IDLE_SEC = float(os.environ.get("LANDMARKER_IDLE_SEC", 60))
+
+# 세션별 검출 주기 설정 (session_id가 있는 연속 프레임에만 적용, CADENCE_DETECT_EVERY=1이면 매 프레임 전체 분석)
+# 얼굴 영역 변화가 작으면 이전 결과 재사용, 랜드마크 변화가 작으면 YOLO는 k 프레임에 한 번만 실행
+# CADENCE_MODE: off (매 프레임 전체 분석) / audit (전체 분석으로 응답하고 생략했을 프레임의 일치율, 놓친 경보만 기록) / on (생략)
+# 기본 임계값은 YOLO 결과로 검증하기 전 값이라 기본 모드는 audit (/metrics cadence.audit_agreement, missed_alarms 확인 후 on)
+CADENCE_MODE = os.environ.get("CADENCE_MODE", "audit")
+CADENCE_DETECT_EVERY = int(os.environ.get("CADENCE_DETECT_EVERY", 3))
+CADENCE_MAX_STALE_MS = float(os.environ.get("CADENCE_MAX_STALE_MS", 1000))  # 이보다 오래된 결과는 항상 갱신
+CADENCE_REUSE_DIFF = float(os.environ.get("CADENCE_REUSE_DIFF", 6.0))       # 축소본 블록별 최대 밝기 차이 (0~255)
+CADENCE_MOTION = float(os.environ.get("CADENCE_MOTION", 0.02))              # 얼굴 대각선 대비 랜드마크 이동량
+
+# 랜드마크 기하 판정 임계값 (EAR/MAR이 이 범위 밖이면 YOLO 생략, 안쪽이면 YOLO 실행)
+# CASCADE_MODE: off (매 프레임 YOLO) / audit (YOLO로 응답하고 기하 판정과의 일치율, 놓친 경보만 기록) / on (YOLO 생략)
+# 기본 임계값은 보정 전 값이라 기본 모드는 audit (판정이 응답에 쓰이지 않아 경보를 놓치지 않음)
+# model/cascadeEval.py에서 해당 임계값이 일치율 --min-agreement(0.99) 이상, 놓친 경보 비율 --max-missed-rate(0.001) 이하일 때만 on
+# on에서는 CASCADE_AUDIT_EVERY=N번째 기하 판정마다 YOLO도 실행해 일치율 계속 기록
+CASCADE_MODE = os.environ.get("CASCADE_MODE", "audit")
+CASCADE_EAR_CLOSED = float(os.environ.get("CASCADE_EAR_CLOSED", 0.12))
+CASCADE_EAR_OPEN = float(os.environ.get("CASCADE_EAR_OPEN", 0.22))
+CASCADE_MAR_YAWN = float(os.environ.get("CASCADE_MAR_YAWN", 0.75))
+CASCADE_MAR_CLOSED = float(os.environ.get("CASCADE_MAR_CLOSED", 0.35))
+CASCADE_AUDIT_EVERY = int(os.environ.get("CASCADE_AUDIT_EVERY", 50))
+
+# 프레임 처리 마감 시간 (촬영 후 이 시간 안에 분석을 시작하지 못한 프레임은 버림, 0이면 마감 없음)
+# 같은 세션의 대기 중 프레임은 항상 최신 1장만 유지 (밀려난 프레임은 dropped 응답)
+FRAME_DEADLINE_MS = float(os.environ.get("FRAME_DEADLINE_MS", 1000))
+
+# 같은 장치의 카메라 프로세스용 공유 메모리 수신 채널 (Unix 도메인 소켓 경로, 비우면 사용 안 함)
+# 프로토콜과 클라이언트는 utils/shmTransport.py 참고
+SHM_SOCKET_PATH = os.environ.get("SHM_SOCKET_PATH", "")
+
+# 클라이언트 전송 간격 권장값 (응답의 next_interval_ms, 위험 중 촘촘하게 / 안정 시 느슨하게 / 부하 시 늘림)
+SEND_INTERVAL_RISK_MS = int(os.environ.get("SEND_INTERVAL_RISK_MS", 150))
+SEND_INTERVAL_BASE_MS = int(os.environ.get("SEND_INTERVAL_BASE_MS", 300))   # 앱 기본값(SEND_INTERVAL_MS)과 동일
+SEND_INTERVAL_CALM_MS = int(os.environ.get("SEND_INTERVAL_CALM_MS", 600))
+SEND_INTERVAL_MAX_MS = int(os.environ.get("SEND_INTERVAL_MAX_MS", 1500))
+SEND_INTERVAL_RISK_CAP_MS = int(os.environ.get("SEND_INTERVAL_RISK_CAP_MS", 300))  # 위험 상태는 부하와 무관하게 이 이하
+SEND_INTERVAL_CALM_SEC = float(os.environ.get("SEND_INTERVAL_CALM_SEC", 10))      # 위험 없이 이만큼 지나면 안정 상태
+SEND_INTERVAL_TARGET_UTIL = float(os.environ.get("SEND_INTERVAL_TARGET_UTIL", 0.8))  # 목표 워커 사용률
+
+# 기동 시 워밍업 설정 (서빙 크기 합성 프레임으로 워커별 WARMUP_RUNS회 실행)
+# 기본 프레임 크기는 앱 카메라 설정(ResolutionPreset.medium, 720x480 NV21) 기준
+WARMUP_RUNS = int(os.environ.get("WARMUP_RUNS", 3))
+WARMUP_WIDTH = int(os.environ.get("WARMUP_WIDTH", 720))
+WARMUP_HEIGHT = int(os.environ.get("WARMUP_HEIGHT", 480))
+WARMUP_ROW_STRIDE = int(os.environ.get("WARMUP_ROW_STRIDE", WARMUP_WIDTH))
+# 새 세션에 바로 배정할 예비 VIDEO 모드 랜드마커 수
+LANDMARKER_PREWARM = int(os.environ.get("LANDMARKER_PREWARM", 2))
+
+# CPU 스레드 예산 (이 프로세스가 쓸 스레드 수, 기본값은 CPU affinity로 허용된 코어 수)
+# serve.py 멀티 프로세스 모드에서는 프로세스마다 고정된 코어 묶음 크기로 지정됨
+CPU_THREADS = int(os.environ.get("CPU_THREADS", 0)) or len(available_cpus())
+
+# 다중 프레임 배치 분석 (/analyze_batch) 요청 1건의 최대 프레임 수
+# 배치 프레임도 대기열 자리를 1개씩 차지하므로 대기열은 최소 이 크기, YOLO는 배치 크롭을 한 번의 forward로 처리
+BATCH_MAX_FRAMES = int(os.environ.get("BATCH_MAX_FRAMES", 8))
+
+# 추론 워커 설정 (워커마다 모델/랜드마커를 따로 로드하므로 메모리와 코어 수에 맞춰 조절)
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", max(1, CPU_THREADS // 2)))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", max(INFERENCE_WORKERS * 4, BATCH_MAX_FRAMES)))
+
+# 세션별 공정 스케줄링 (fair: 세션별 공정 큐, fifo: 도착 순서)
+# 세션마다 동시에 처리할 수 있는 프레임 수 제한 (0이면 제한 없음), 위험 상태 세션의 가중치
+SCHEDULER_POLICY = os.environ.get("SCHEDULER_POLICY", "fair").lower()
+SESSION_MAX_INFLIGHT = int(os.environ.get("SESSION_MAX_INFLIGHT", 1))
+RISK_SESSION_WEIGHT = float(os.environ.get("RISK_SESSION_WEIGHT", 4))
+
+# YOLO 마이크로 배치 설정 (최대 배치 크기가 1이면 워커별 개별 추론)
+# YOLO_BATCH_MAX: 단일 프레임 요청의 크롭을 모을 최대 개수 (워커마다 한 번에 1장씩이라 워커 수보다 크면 매번 대기 시간만 채움)
+# /analyze_batch의 크롭 묶음(최대 BATCH_MAX_FRAMES장)은 이 값과 관계없이 나누지 않고 한 번에 추론
+YOLO_BATCH_MAX = min(int(os.environ.get("YOLO_BATCH_MAX", INFERENCE_WORKERS)), INFERENCE_WORKERS)
+YOLO_BATCH_WAIT_MS = float(os.environ.get("YOLO_BATCH_WAIT_MS", 5))
+
+# 워커들이 동시에 추론하므로 세션/OpenCV 스레드는 예산을 워커 수로 나눠 과다 구독 방지
+DETECTOR_THREADS = max(1, CPU_THREADS // INFERENCE_WORKERS)
+apply_thread_budget(DETECTOR_THREADS, set_env=False)
+
+# ==============================
+# 기동 단계 (무거운 모듈은 기동 스레드에서 import)
+# ==============================
+startup = StartupTracker()
+startup.record("import:main", round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1))
+
+# MediaPipe는 import만 1초 가까이 걸리므로 기동 단계에서 불러옴
+mediapipe_utils = None
+landmarker_pool = None
+
+# ==============================
+# YOLO 추론 및 추론 워커 컨텍스트
+# ==============================
+def load_yolo():
+    with startup.phase(f"load:detector:{threading.current_thread().name}"):
+        detector = create_detector(
+            DETECTOR_BACKEND,
+            MODEL_PATH,
+            imgsz=DETECT_IMGSZ,
+            conf=DETECT_CONF,
+            classes=DETECT_CLASSES,
+            max_batch=max(YOLO_BATCH_MAX, BATCH_MAX_FRAMES),
+            device=DETECTOR_DEVICE,
+            num_threads=DETECTOR_THREADS,
+        )
+    print(f"[모델 클래스 목록] {detector.names} ({DETECTOR_BACKEND})")
+    return detector
+
+def predict_crops(detector, crops: list) -> list:
+    """
+    흑백 얼굴 크롭 여러 장을 한 번의 forward로 추론
+    크롭별 [x1, y1, x2, y2, conf, cls] (N, 6) 배열 리스트로 반환
+    """
+    return detector.predict_batch(crops)
+
+yolo_batcher = None
+if YOLO_BATCH_MAX > 1:
+    yolo_batcher = MicroBatcher(
+        load_yolo,
+        predict_crops,
+        max_batch=YOLO_BATCH_MAX,
+        max_wait_ms=YOLO_BATCH_WAIT_MS,
+        name="yolo-batcher",
+    )
+
+class InferenceContext:
+    """
+    워커 스레드 1개가 독점하는 모델 및 랜드마커 묶음
+    (YOLO, MediaPipe 객체는 스레드 간 공유하지 않음)
+    배치 모드에서는 YOLO를 배치 스레드가 소유하고 워커는 크롭만 넘김
+    """
+    def __init__(self):
+        self.model = load_yolo() if yolo_batcher is None else None
+        self.timer = StageTimer()
+        self.face_processor = mediapipe_utils.FaceProcessor(
+            LANDMARKER_MODEL_PATH, landmarker_pool=landmarker_pool, timer=self.timer
+        )
+        self.ingestor = FrameIngestor()
+        self.face_box = None  # 마지막 analyze_image 결과의 얼굴 크롭 영역 (분석 프레임 좌표, 미감지면 None)
+
+    def detect(self, crop) -> np.ndarray:
+        if yolo_batcher is not None:
+            return yolo_batcher.predict(crop)
+        return self.model.predict(crop)
+
+    def detect_batch(self, crops: list) -> list:
+        """크롭 여러 장을 한 번에 추론 (배치 모드면 배치 스레드에 한 묶음으로 넘겨 같은 forward에 실음)"""
+        if yolo_batcher is not None:
+            return [future.result() for future in yolo_batcher.submit_many(crops)]
+        return self.model.predict_batch(crops)
+
+    def warmup(self, runs: int):
+        """
+        서빙 크기의 합성 프레임으로 단계별 추론을 미리 실행
+        (첫 요청이 그래프 컴파일, 버퍼 할당 비용을 떠안지 않도록 함)
+        """
+        name = threading.current_thread().name
+        y_plane = bytes(WARMUP_ROW_STRIDE * WARMUP_HEIGHT)
+        frame, _ = self.ingestor.ingest_nv21(y_plane, WARMUP_WIDTH, WARMUP_HEIGHT, WARMUP_ROW_STRIDE)
+        crop = np.full((DETECT_IMGSZ, DETECT_IMGSZ), 114, dtype=np.uint8)
+
+        startup.warmup(f"{name}:ingest", lambda: self.ingestor.ingest_nv21(
+            y_plane, WARMUP_WIDTH, WARMUP_HEIGHT, WARMUP_ROW_STRIDE), runs)
+        startup.warmup(f"{name}:landmarks", lambda: analyze_image(frame, self), runs)
+        startup.warmup(f"{name}:detector", lambda: self.detect(crop), runs)
+        if BATCH_MAX_FRAMES > 1:
+            startup.warmup(f"{name}:detector_batch", lambda: self.detect_batch([crop] * BATCH_MAX_FRAMES), runs)
+        # 워밍업 실행은 단계별 처리 시간 통계에서 제외
+        self.timer.reset()
+
+def init_worker() -> InferenceContext:
+    """워커 스레드 시작 시 모델 로드 + 워밍업 (모든 워커가 끝나야 준비 완료)"""
+    with startup.phase(f"load:{threading.current_thread().name}"):
+        ctx = InferenceContext()
+    ctx.warmup(WARMUP_RUNS)
+    return ctx
+
+inference_pool = InferencePool(
+    init_worker,
+    num_workers=INFERENCE_WORKERS,
+    queue_size=INFERENCE_QUEUE_SIZE,
+    max_inflight_per_key=SESSION_MAX_INFLIGHT,
+    fair=SCHEDULER_POLICY != "fifo",
+    idle_timeout=LANDMARKER_IDLE_SEC,
+)
+
+history_writer = HistoryWriter(
+    make_postgrest_insert(SUPABASE_URL, SUPABASE_KEY, SUPABASE_TABLE),
+    journal_path=HISTORY_JOURNAL_PATH,
+    max_batch=HISTORY_BATCH_SIZE,
+    flush_interval=HISTORY_FLUSH_INTERVAL,
+)
+
+cadence = CadenceScheduler(
+    mode=CADENCE_MODE,
+    detect_every=CADENCE_DETECT_EVERY,
+    max_stale_ms=CADENCE_MAX_STALE_MS,
+    reuse_diff=CADENCE_REUSE_DIFF,
+    motion=CADENCE_MOTION,
+    idle_timeout=LANDMARKER_IDLE_SEC,
+)
+
+deadline_clock = DeadlineClock(FRAME_DEADLINE_MS, idle_timeout=LANDMARKER_IDLE_SEC)
+
+cascade = LandmarkCascade(
+    ear_closed=CASCADE_EAR_CLOSED,
+    ear_open=CASCADE_EAR_OPEN,
+    mar_yawn=CASCADE_MAR_YAWN,
+    mar_closed=CASCADE_MAR_CLOSED,
+    audit_every=CASCADE_AUDIT_EVERY,
+    mode=CASCADE_MODE,
+)
+
+interval_advisor = IntervalAdvisor(
+    INFERENCE_WORKERS,
+    INFERENCE_QUEUE_SIZE,
+    risk_ms=SEND_INTERVAL_RISK_MS,
+    base_ms=SEND_INTERVAL_BASE_MS,
+    calm_ms=SEND_INTERVAL_CALM_MS,
+    max_ms=SEND_INTERVAL_MAX_MS,
+    risk_cap_ms=SEND_INTERVAL_RISK_CAP_MS,
+    calm_sec=SEND_INTERVAL_CALM_SEC,
+    target_util=SEND_INTERVAL_TARGET_UTIL,
+)
+
+capture_store = CaptureStore(
+    SAVE_DIR,
+    policy=CAPTURE_POLICY,
+    sample_every=CAPTURE_SAMPLE_EVERY,
+    pre_event_frames=CAPTURE_PRE_EVENT,
+    post_event_frames=CAPTURE_POST_EVENT,
+    quota_mb=CAPTURE_QUOTA_MB,
+)
+
+def start_inference():
+    """
+    무거운 모듈 import -> 모델 로드 -> 워밍업 순으로 추론 준비 (기동 스레드에서 실행)
+    이 동안에도 이벤트 루프는 돌아가므로 /livez는 응답하고 /readyz는 503
+    """
+    global mediapipe_utils, landmarker_pool
+    try:
+        mediapipe_utils = startup.import_module("utils.mediapipeUtils")
+        if DETECTOR_BACKEND in BACKEND_MODULES:
+            startup.import_module(BACKEND_MODULES[DETECTOR_BACKEND])
+
+        landmarker_pool = mediapipe_utils.LandmarkerPool(
+            LANDMARKER_MODEL_PATH,
+            max_sessions=LANDMARKER_MAX_SESSIONS,
+            idle_timeout=LANDMARKER_IDLE_SEC,
+        )
+        if yolo_batcher is not None:
+            yolo_batcher.start()
+            # 배치 스레드가 모델을 못 올리면 워커 워밍업이 검출 결과를 기다리지 않도록 먼저 실패 처리
+            if not yolo_batcher.wait_ready():
+                raise RuntimeError(f"yolo batcher: {yolo_batcher.init_error}")
+        inference_pool.start()
+        if not inference_pool.wait_ready():
+            raise RuntimeError("; ".join(inference_pool.init_errors))
+
+        # 분석 프레임 크기 = 워밍업 NV21 프레임을 정방향/640px로 변환한 크기
+        frame_shape = (int(ANALYSIS_WIDTH * (WARMUP_WIDTH / WARMUP_HEIGHT)), ANALYSIS_WIDTH)
+        with startup.phase("prewarm:landmarkers"):
+            landmarker_pool.prewarm(LANDMARKER_PREWARM, frame_shape)
+        startup.mark_ready()
+    except Exception as e:
+        startup.mark_failed(e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    history_writer.start()
+    capture_store.start()
+    startup_task = asyncio.create_task(asyncio.to_thread(start_inference))
+    shm_server = await start_shm_server() if SHM_SOCKET_PATH else None
+    yield
+    if shm_server is not None:
+        shm_server.close()
+        await shm_server.wait_closed()
+        os.unlink(SHM_SOCKET_PATH)
+    await startup_task
+    inference_pool.shutdown()
+    if yolo_batcher is not None:
+        yolo_batcher.shutdown()
+    if landmarker_pool is not None:
+        landmarker_pool.close()
+    capture_store.close()
+    history_writer.close()
 
 # ==============================
 # FastAPI 및 미들웨어 설정
 # ==============================
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,13 +365,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ==============================
-# 외부 서비스 연결 및 모델 로드
-# ==============================
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-model = YOLO(MODEL_PATH)
-print(f"[모델 클래스 목록] {model.names}")
-
 if not os.path.exists(SAVE_DIR):
     os.makedirs(SAVE_DIR)
 
@@ -49,95 +372,264 @@ if not os.path.exists(SAVE_DIR):
 # 핵심 유틸리티 함수
 # ==============================
 
-def preprocess_image(img: Image.Image) -> Image.Image:
+def save_to_supabase(status: int, img_path: str):
     """
-    YOLO 모델 입력 규격에 맞게 전처리
+    분석 결과를 Supabase DB 기록 대기열에 추가 (전송은 HistoryWriter가 묶어서 처리)
     """
-    # 1. 흑백 변환 (학습 모델이 그레이스케일 기반인 경우)
-    if img.mode != 'L':
-        img = img.convert('L')
-    
-    # 2. 리사이징 (640px 너비 기준 비율 유지)
-    target_width = 640
-    aspect_ratio = img.height / img.width
-    target_height = int(target_width * aspect_ratio)
-    
-    img_resized = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-    return img_resized
+    data = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "status": status,
+        "image_path": img_path,
+    }
+    history_writer.add(data)
 
-def save_to_supabase(status: int, img_path: str):
+class FrameAnalysis:
     """
-    분석 결과를 Supabase DB에 기록
+    분석 1단계(MediaPipe + 기하 판정) 결과
+    status가 있으면 판정 완료, None이면 crop을 YOLO로 검출한 뒤 finish_analysis로 마무리
+    (배치 분석은 여러 프레임의 크롭을 모아 YOLO를 한 번에 실행하므로 단계를 나눔)
     """
-    try:
-        data = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "status": status,
-            "image_path": img_path,
-        }
-        supabase.table("drowsy_history").insert(data).execute()
-    except Exception as e:
-        print(f"Supabase Save Error: {e}")
+    def __init__(self, status=None, face_box=None):
+        self.status = status
+        self.face_box = face_box  # 얼굴 크롭 영역 (분석 프레임 좌표, 미감지면 None)
+        self.plan = None
+        self.crop = None
+        self.letterbox = None
+        self.bbox_coords = None
+        self.crop_coords = None
+        self.landmarks = None
+        self.ear = None
+        self.mar = None
+        self.head_drop = False
+        self.parts = None
+        self.audit = False
 
-def analyze_image(img_processed: Image.Image) -> list[bool]:
-    # PIL Image를 OpenCV에서 처리 가능한 NumPy 배열(BGR)로 변환
-    frame = np.array(img_processed)
+def analyze_landmarks(frame: np.ndarray, ctx: InferenceContext, session_id: Optional[str] = None,
+                      timestamp_ms: Optional[int] = None) -> FrameAnalysis:
+    """
+    frame: FrameIngestor가 만든 분석 프레임 (흑백, 정방향, 좌우 반전, 가로 640px)
+    session_id: 있으면 세션 전용 랜드마커로 이전 프레임 기반 얼굴 추적
+    YOLO가 필요 없는 프레임(재사용, 얼굴 미감지, 기하 판정)은 여기서 판정까지 끝냄
+    """
+    # 0. 세션 연속 프레임: 이전 프레임과 얼굴 영역이 거의 같으면 이전 결과 재사용
+    # audit 모드는 재사용 여부만 기록하고 그대로 전체 분석 (결과 비교는 cadence.finish에서)
+    plan = None
+    if session_id is not None and cadence.enabled:
+        started_at = time.perf_counter()
+        plan = cadence.begin(session_id, frame)
+        ctx.timer.since("cadence", started_at)
+        if plan.reuse is not None and not cadence.audit_only:
+            return FrameAnalysis(plan.reuse, plan.crop)
 
-    # 감지 결과 변수 초기화 (기본값 False)
-    isEyeClosed = False
-    isYawn = False
-    isHeadDrop = False
-    
-    # 1. 전처리: 사용자 시점 최적화를 위한 좌우 반전
-    frame = cv2.flip(frame, 1)
+    # 1. 전처리: 좌우 반전은 수신 단계(FrameIngestor)에서 이미 적용됨
+    # 흑백 프레임을 그대로 넘김 (MediaPipe 입력용 RGB 변환은 FaceProcessor에서 1회만 수행)
 
     # 2. MediaPipe 처리: 고개 떨굼, 좌표 데이터, 크롭 이미지 추출
-    mpProcessed = mediapipeProcess.process_frame(frame)
+    # 얼굴 영역만 YOLO 입력 크기(흑백, 레터박스)로 바로 정렬해 별도 리사이즈/변환 생략
+    mpProcessed = ctx.face_processor.process_frame(
+        frame, out_size=DETECT_IMGSZ, gray=True, session_id=session_id, timestamp_ms=timestamp_ms
+    )
     
     # 얼굴 미감지 시 즉시 종료 및 False 리스트 반환
     if mpProcessed == None :
-        return [False, False, False]
+        if plan is not None:
+            cadence.finish(plan, None)
+        return FrameAnalysis([False, False, False])
         
     # 결과 데이터 분할 할당
-    isHeadDrop, bbox_coords, crop_coords, cropped_frame = mpProcessed
-    
-    # 3. YOLO 추론 준비: 모델 학습 환경에 맞춰 흑백 변환
-    frame_gray = cv2.cvtColor(cropped_frame, cv2.COLOR_RGB2GRAY)
-
-    # 4. YOLO 모델 추론: 눈 및 입 상태 분석
-    results = model.predict(
-        source=frame_gray,       # 크롭된 흑백 얼굴 이미지
-        verbose=False,           # 로그 출력 억제
-        save=False,              # 이미지 저장 비활성
-        imgsz=320,               # 입력 사이즈 최적화
-        conf=0.25,               # 탐지 임계값
-        classes=[0, 1, 2, 3],    # 분석 대상 클래스 정의
-        device="intel:gpu"       # 하드웨어 가속 사용
-        )
-    
-    # 5. 후처리: 중복 탐지 박스 제거
-    filtered_data = filter_overlapping_parts(results)
+    isHeadDrop, bbox_coords, crop_coords, cropped_frame, letterbox, landmarks = mpProcessed
+    analysis = FrameAnalysis(face_box=crop_coords)
+    analysis.plan = plan
+    analysis.head_drop = isHeadDrop
+    analysis.bbox_coords, analysis.crop_coords = bbox_coords, crop_coords
+    analysis.crop, analysis.letterbox, analysis.landmarks = cropped_frame, letterbox, landmarks
+
+    ear = analysis.ear = mediapipe_utils.eye_aspect_ratio(landmarks)
+    mar = analysis.mar = mediapipe_utils.mouth_aspect_ratio(landmarks)
+
+    # EAR/MAR이 임계값에서 충분히 멀면 YOLO 없이 바로 판정 (감사 대상 프레임은 YOLO도 실행)
+    # audit 모드는 판정을 기록만 하므로 아래 경로는 off와 같음 (기하 판정 프레임은 항상 감사 대상)
+    parts, audit = cascade.decide(ear, mar) if cascade.enabled else (None, False)
+    analysis.parts, analysis.audit = parts, audit
+    if parts is not None and not audit:
+        isYawn, isEyeClosed = parts
+        analysis.status = [isYawn, isEyeClosed, isHeadDrop]
+        if plan is not None:
+            cadence.finish(plan, analysis.status, crop_coords, landmarks, ear, mar, detected=True)
+        return analysis
+
+    # 애매한 프레임: 랜드마크 변화가 작으면 YOLO 생략 (눈/입 판정은 직전 판정 재사용, 고개 떨굼은 새로 계산)
+    # cadence audit 모드는 생략 여부만 기록하고 YOLO 실행 (1단계 재사용 대상 프레임은 2단계 판단 생략)
+    if plan is not None and plan.reuse is None and (parts is None or cascade.audit_only):
+        if not cadence.needs_detection(plan, landmarks, bbox_coords, ear, mar) and not cadence.audit_only:
+            isYawn, isEyeClosed = plan.parts
+            analysis.status = [isYawn, isEyeClosed, isHeadDrop]
+            cadence.finish(plan, analysis.status, crop_coords, landmarks, ear, mar, detected=False)
+            return analysis
+
+    # 3. YOLO 추론 준비: 크롭은 이미 흑백 + 입력 크기로 정렬됨
+    return analysis
+
+def finish_analysis(analysis: FrameAnalysis, detections: np.ndarray, filtered: bool = False) -> list[bool]:
+    """
+    YOLO 검출 결과로 눈/입 판정 후 최종 상태 반환 (analyze_landmarks에서 status가 None인 프레임)
+    filtered=True: 배치 후처리에서 중복 박스 제거를 이미 마친 검출 결과
+    """
+    # 5~6. 후처리 및 상태 판별: 중복 박스 제거, 좌표 복원 후 닫힌 눈 개수와 하품 여부 확인
+    isYawn, isEyeClosed = judge_parts(detections, analysis.letterbox, analysis.bbox_coords, filtered)
+    if analysis.audit:
+        cascade.record_audit(analysis.parts, (isYawn, isEyeClosed), analysis.ear, analysis.mar)
 
-    # 6. 상태 판별: 탐지된 클래스별 카운트 및 조건 확인
-    closed_eye_count = 0 
-    
-    for detected in filtered_data :
-        class_id = detected[5] # 클래스 ID 추출
-        
-        # 눈 감김(1) 카운트
-        if class_id == 1 :
-            closed_eye_count += 1
-            
-        # 입 벌림(2) 탐지 시 하품 여부 최종 검증
-        elif class_id == 2 and isYawning(detected, bbox_coords):
-            isYawn = True 
-
-    # 양쪽 눈 감김 판정 (2개 이상)
-    if closed_eye_count >= 2 :
-        isEyeClosed = True
-    
     # 7. 최종 리스트 반환: [하품, 눈감김, 고개떨굼]
-    return [isYawn, isEyeClosed, isHeadDrop]
+    status = [isYawn, isEyeClosed, analysis.head_drop]
+    if analysis.plan is not None:
+        cadence.finish(analysis.plan, status, analysis.crop_coords, analysis.landmarks,
+                       analysis.ear, analysis.mar, detected=True)
+    analysis.status = status
+    return status
+
+def analyze_image(frame: np.ndarray, ctx: InferenceContext, session_id: Optional[str] = None, timestamp_ms: Optional[int] = None) -> list[bool]:
+    """
+    frame: FrameIngestor가 만든 분석 프레임 (흑백, 정방향, 좌우 반전, 가로 640px)
+    session_id: 있으면 세션 전용 랜드마커로 이전 프레임 기반 얼굴 추적
+    얼굴 크롭 영역은 ctx.face_box에 남김 (업로드 ROI 힌트용)
+    """
+    analysis = analyze_landmarks(frame, ctx, session_id, timestamp_ms)
+    ctx.face_box = analysis.face_box
+    if analysis.status is not None:
+        return analysis.status
+
+    # 4. YOLO 모델 추론: 눈 및 입 상태 분석 (배치 모드면 다른 요청의 크롭과 함께 추론)
+    started_at = time.perf_counter()
+    detections = ctx.detect(analysis.crop)
+    started_at = ctx.timer.since("detect", started_at)
+    status = finish_analysis(analysis, detections)
+    ctx.timer.since("postprocess", started_at)
+    return status
+
+def record_result(status: list[bool], img_original: np.ndarray, session_id: Optional[str] = None, rotate: Optional[int] = None):
+    """
+    원본 이미지 저장 및 DB 기록 요청 (실제 디스크/네트워크 I/O는 백그라운드에서 처리)
+    저장 정책상 남기지 않는 프레임은 image_path가 None으로 기록됨
+    rotate: 저장 직전에 적용할 cv2.rotate 코드 (Y 평면 원본은 시계 방향 90도)
+    """
+    img_path = capture_store.submit(session_id, img_original, status, rotate=rotate)
+    save_to_supabase(status, img_path)
+
+def next_interval(status: list[bool], session_id: Optional[str] = None) -> int:
+    """클라이언트가 다음 프레임을 보내기까지 기다릴 시간(ms) 권장값"""
+    backlog, service_s = inference_pool.load()
+    return interval_advisor.recommend(session_id, status, backlog, service_s)
+
+def session_weight(session_id: Optional[str]) -> float:
+    """위험 상태(또는 직후) 세션의 프레임을 추론 대기열에서 먼저 꺼내도록 가중치 부여"""
+    return RISK_SESSION_WEIGHT if interval_advisor.at_risk(session_id) else 1.0
+
+# ==============================
+# 워커 작업 함수 (추론 워커 스레드에서 실행)
+# ==============================
+
+def analyze_raw_job(ctx: InferenceContext, y_bytes: bytes, width: int, height: int, row_stride: int,
+                    session_id: Optional[str] = None, timestamp_ms: Optional[int] = None,
+                    upload: Optional[RawUpload] = None):
+    """
+    upload: 축소/ROI/압축 업로드 규격 (None이면 전체 해상도 Y 평면)
+    반환: (상태, 저장용 원본, 센서 좌표 얼굴 영역 또는 None)
+    """
+    # 1~2. Y 평면을 복사 없이 참조해 회전/반전/리사이즈를 한 번에 수행
+    # [중요] 안드로이드 전면 카메라는 보통 90도 회전되어 전송되므로 수신 단계에서 정방향으로 변환
+    started_at = time.perf_counter()
+    if upload is None:
+        frame, y_view = ctx.ingestor.ingest_nv21(y_bytes, width, height, row_stride)
+        full_width, full_height = width, height
+    else:
+        frame, y_view = ctx.ingestor.ingest_upload(y_bytes, upload)
+        full_width, full_height = upload.full_width, upload.full_height
+    ctx.timer.since("ingest", started_at)
+
+    # 3. 분석 수행
+    status = analyze_image(frame, ctx, session_id, timestamp_ms)
+
+    # 얼굴 영역은 센서 전체 프레임 좌표로 되돌려 반환 (클라이언트가 다음 프레임 ROI로 사용)
+    face_box = sensor_box(ctx.face_box, full_width, full_height) if ctx.face_box is not None else None
+
+    # 저장용 원본은 회전 전 Y 평면 view를 그대로 넘기고 회전은 저장 스레드에서 처리
+    # (ROI/축소 업로드는 업로드된 평면만 저장)
+    return status, y_view, face_box
+
+def analyze_jpeg_job(ctx: InferenceContext, image_bytes: bytes, session_id: Optional[str] = None):
+    started_at = time.perf_counter()
+    img_original = decode_gray(image_bytes)
+    started_at = ctx.timer.since("decode", started_at)
+
+    frame = ctx.ingestor.ingest_gray(img_original)
+    ctx.timer.since("ingest", started_at)
+    status = analyze_image(frame, ctx, session_id)
+    return status, img_original
+
+def batch_landmarks_job(ctx: InferenceContext, frame_spec: BatchFrame):
+    """
+    배치 프레임 1장의 수신 + 랜드마크 단계 (YOLO는 batch_detect_job에서 배치 전체를 한 번에)
+    반환: (FrameAnalysis, 저장용 원본)
+    """
+    started_at = time.perf_counter()
+    if frame_spec.upload is not None:
+        frame, img_original = ctx.ingestor.ingest_upload(frame_spec.payload, frame_spec.upload)
+    else:
+        img_original = decode_gray(frame_spec.payload)
+        started_at = ctx.timer.since("decode", started_at)
+        frame = ctx.ingestor.ingest_gray(img_original)
+    ctx.timer.since("ingest", started_at)
+    # 분석 프레임(frame)은 다음 작업에서 덮어써지지만 크롭/랜드마크는 새 배열이라 다른 워커로 넘겨도 안전
+    return analyze_landmarks(frame, ctx, frame_spec.session_id, frame_spec.capture_ts_ms), img_original
+
+def batch_detect_job(ctx: InferenceContext, analyses: list) -> list:
+    """랜드마크 단계에서 YOLO가 필요하다고 남은 프레임들의 크롭을 한 번의 forward로 판정"""
+    started_at = time.perf_counter()
+    detections = ctx.detect_batch([analysis.crop for analysis in analyses])
+    started_at = ctx.timer.since("detect", started_at)
+    # 중복 박스 제거는 배치 전체를 한 번에 (박스가 많은 프레임끼리 정렬/IoU 계산을 묶음)
+    detections = filter_overlapping_batch(detections)
+    statuses = [finish_analysis(analysis, det, filtered=True) for analysis, det in zip(analyses, detections)]
+    ctx.timer.since("postprocess", started_at)
+    return statuses
+
+def analyze_shm_job(ctx: InferenceContext, ring: ShmRing, slot: int, length: int, upload: RawUpload,
+                    session_id: Optional[str] = None, timestamp_ms: Optional[int] = None):
+    """공유 메모리 슬롯의 프레임을 복사 없이 분석 (analyze_raw_job과 같은 처리)"""
+    status, img_original, face_box = analyze_raw_job(
+        ctx, ring.view(slot, length), upload.width, upload.height, upload.row_stride,
+        session_id, timestamp_ms, upload,
+    )
+    # 응답 후 클라이언트가 슬롯을 다시 쓰므로 슬롯을 그대로 참조하는 Y 평면은 저장용으로 복사
+    # (압축 업로드는 디코딩 결과가 이미 새 배열)
+    if upload.format in ("nv21", "y8"):
+        img_original = img_original.copy()
+    return status, img_original, face_box
+
+def not_ready_response() -> JSONResponse:
+    """모델 로드/워밍업이 끝나기 전 요청은 바로 503"""
+    return JSONResponse(
+        status_code=503,
+        content={"error": "server starting", "state": startup.state, "retry_after": 1},
+        headers={"Retry-After": "1"},
+    )
+
+def dropped_response(e: FrameDropped, session_id: Optional[str] = None) -> dict:
+    """
+    분석하지 않고 버린 프레임 응답 (status 없음)
+    superseded: 같은 세션의 더 새 프레임이 도착해 대체됨, deadline: 마감 시간 안에 시작하지 못함
+    busy: 배치 요청에서 대기열이 가득 차 처리하지 못한 프레임
+    """
+    return {"status": None, "dropped": e.reason, "next_interval_ms": next_interval([False, False, False], session_id)}
+
+def busy_response(e: QueueFullError) -> JSONResponse:
+    """대기열 포화 시 즉시 503 + 재시도 안내"""
+    return JSONResponse(
+        status_code=503,
+        content={"error": "server busy", "retry_after": e.retry_after},
+        headers={"Retry-After": str(e.retry_after)},
+    )
 
 # ==============================
 # API 엔드포인트
@@ -149,59 +641,456 @@ async def analyze_raw(
     uv_plane: UploadFile = File(None),
     width: int = Form(...),
     height: int = Form(...),
-    row_stride: int = Form(...), 
-    format: str = Form("nv21")
+    row_stride: Optional[int] = Form(None),
+    format: str = Form("nv21"),
+    session_id: Optional[str] = Form(None),
+    capture_ts_ms: Optional[int] = Form(None),
+    full_width: Optional[int] = Form(None),
+    full_height: Optional[int] = Form(None),
+    roi_x: Optional[int] = Form(None),
+    roi_y: Optional[int] = Form(None),
+    roi_width: Optional[int] = Form(None),
+    roi_height: Optional[int] = Form(None),
 ):
+    """
+    센서 방향 흑백 평면 업로드 처리 (uv_plane은 사용하지 않으므로 생략 가능)
+    대역폭 절감용 확장 (모두 선택, 좌표는 회전 전 센서 기준):
+      format: nv21/y8 (Y 평면 그대로), zstd (zstd 압축 Y 평면), jpeg/webp (흑백 압축 이미지)
+      full_width/full_height: 축소해 보낸 경우 원래 센서 프레임 크기 (width/height는 업로드 평면 크기)
+      roi_x/roi_y/roi_width/roi_height: 얼굴 주변만 잘라 보낸 경우 업로드 평면이 덮는 센서 영역
+    응답의 face_box는 센서 전체 프레임 좌표 얼굴 영역 (다음 프레임 ROI 힌트)
+    """
+    if not startup.ready:
+        return not_ready_response()
     y_bytes = await y_plane.read()
-    y_flat = np.frombuffer(y_bytes, dtype=np.uint8)
-
-    required_size = row_stride * height
-    if len(y_flat) < required_size:
-        y_flat = np.pad(y_flat, (0, required_size - len(y_flat)), 'constant')
 
-    y_array = y_flat[:required_size].reshape((height, row_stride))[:, :width]
-
-    # 2. 이미지화 및 회전 수정
-    # NV21의 Y평면은 그레이스케일과 같으므로 바로 변환
-    img_original = Image.fromarray(y_array, mode='L')
-        
-    # [중요] 안드로이드 전면 카메라는 보통 90도 회전되어 전송됨
-    # 이미지가 옆으로 누워있으면 YOLO가 인식하지 못하므로 90도 회전
-    img_original = img_original.rotate(-90, expand=True)
+    upload = None
+    extended = (full_width, full_height, roi_x, roi_y, roi_width, roi_height)
+    if format.lower() not in ("nv21", "y8") or any(v is not None for v in extended):
+        full_width, full_height = full_width or width, full_height or height
+        roi = None
+        if any(v is not None for v in (roi_x, roi_y, roi_width, roi_height)):
+            # ROI 크기를 생략하면 업로드 평면과 같은 크기 (축소 없이 잘라낸 경우)
+            roi = (roi_x or 0, roi_y or 0, roi_width or width, roi_height or height)
+        try:
+            upload = RawUpload(format, width, height, row_stride, full_width, full_height, roi)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+    else:
+        # 규격이 버퍼와 맞지 않으면 워커에서 500이 나기 전에 거부
+        try:
+            check_plane(width, height, row_stride or width, len(y_bytes))
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
 
-    # 3. 분석 수행
-    img_processed = preprocess_image(img_original)
-    status = analyze_image(img_processed)
+    # 1~3. 디코딩 및 분석은 추론 워커에서 수행 (이벤트 루프 비차단)
+    # 같은 세션의 대기 중 프레임은 최신 1장만 유지, 마감 시각까지 시작하지 못하면 버림
+    try:
+        status, img_original, face_box = await inference_pool.run(
+            analyze_raw_job, y_bytes, width, height, row_stride or width, session_id, capture_ts_ms, upload,
+            key=session_id, deadline=deadline_clock.deadline(session_id, capture_ts_ms),
+            weight=session_weight(session_id),
+        )
+    except QueueFullError as e:
+        return busy_response(e)
+    except FrameDropped as e:
+        return dropped_response(e, session_id)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
 
     # 4. 결과 저장
-    img_filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-    img_path = os.path.join(SAVE_DIR, img_filename)
-    img_original.save(img_path) 
+    record_result(status, img_original, session_id, rotate=cv2.ROTATE_90_CLOCKWISE)
 
-    save_to_supabase(status, img_path)
-
-    return {"status": status}
+    return {"status": status, "next_interval_ms": next_interval(status, session_id), "face_box": face_box}
 
 
 @app.post("/analyze_jpeg")
-async def analyze_jpeg(file: UploadFile = File(...)):
+async def analyze_jpeg(
+    file: UploadFile = File(...),
+    session_id: Optional[str] = Form(None),
+    capture_ts_ms: Optional[int] = Form(None),
+):
     """웹/일반 이미지 업로드 처리"""
+    if not startup.ready:
+        return not_ready_response()
     image_bytes = await file.read()
-    img_original = Image.open(io.BytesIO(image_bytes))
-    
-    img_processed = preprocess_image(img_original)
-    status = analyze_image(img_processed)
-    
-    img_filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-    img_path = os.path.join(SAVE_DIR, img_filename)
-    img_original.save(img_path)
-    
-    save_to_supabase(status, img_path)
-    return {"status": status}
+
+    try:
+        status, img_original = await inference_pool.run(
+            analyze_jpeg_job, image_bytes, session_id,
+            key=session_id, deadline=deadline_clock.deadline(session_id, capture_ts_ms),
+            weight=session_weight(session_id),
+        )
+    except QueueFullError as e:
+        return busy_response(e)
+    except FrameDropped as e:
+        return dropped_response(e, session_id)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    record_result(status, img_original, session_id)
+    return {"status": status, "next_interval_ms": next_interval(status, session_id)}
+
+@app.post("/analyze_batch")
+async def analyze_batch(
+    frames: UploadFile = File(...),
+    manifest: str = Form(...),
+):
+    """
+    게이트웨이용 다중 프레임 분석 (frames + manifest 형식은 utils/batchManifest.py 참고)
+    랜드마크 단계는 프레임마다 추론 워커에서 병렬로, YOLO는 남은 크롭을 모아 한 번의 forward로 실행
+    results는 manifest와 같은 순서의 프레임별 결과 (분석하지 못한 프레임은 status None + dropped/error)
+    """
+    if not startup.ready:
+        return not_ready_response()
+    payload = await frames.read()
+    try:
+        batch = parse_batch(manifest, payload, BATCH_MAX_FRAMES)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    # 1~2. 수신 + 랜드마크: 프레임마다 세션 key로 제출
+    # 같은 세션 프레임은 세션별 동시 처리 제한으로 순서대로 처리되고, 서로 대체(superseded)하지 않음
+    results = [None] * len(batch)
+    submitted = []
+    busy = None
+    for frame_spec in batch:
+        sid = frame_spec.session_id
+        try:
+            future = inference_pool.submit(
+                batch_landmarks_job, frame_spec,
+                key=sid, deadline=deadline_clock.deadline(sid, frame_spec.capture_ts_ms),
+                weight=session_weight(sid), latest_only=False,
+            )
+        except QueueFullError as e:
+            busy = e
+            results[frame_spec.index] = dropped_response(FrameDropped("busy"), sid)
+            continue
+        except FrameDropped as e:
+            results[frame_spec.index] = dropped_response(e, sid)
+            continue
+        submitted.append((frame_spec, asyncio.wrap_future(future)))
+
+    outcomes = await asyncio.gather(*(future for _, future in submitted), return_exceptions=True)
+    analyzed = []
+    for (frame_spec, _), outcome in zip(submitted, outcomes):
+        if isinstance(outcome, FrameDropped):
+            results[frame_spec.index] = dropped_response(outcome, frame_spec.session_id)
+        elif isinstance(outcome, ValueError):
+            results[frame_spec.index] = {"status": None, "error": str(outcome)}
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            analyzed.append((frame_spec, *outcome))
+
+    # 3~6. YOLO가 필요한 프레임의 크롭을 모아 한 번에 추론 + 판정
+    pending = [analysis for _, analysis, _ in analyzed if analysis.status is None]
+    if pending:
+        try:
+            await inference_pool.run(
+                batch_detect_job, pending,
+                weight=max(session_weight(frame_spec.session_id) for frame_spec, _, _ in analyzed),
+            )
+        except QueueFullError as e:
+            busy = e
+
+    # 7. 결과 저장 (raw 프레임은 센서 방향이므로 저장 시 회전)
+    for frame_spec, analysis, img_original in analyzed:
+        sid, status = frame_spec.session_id, analysis.status
+        if status is None:
+            results[frame_spec.index] = dropped_response(FrameDropped("busy"), sid)
+            continue
+        upload = frame_spec.upload
+        face_box = None
+        if upload is not None:
+            record_result(status, img_original, sid, rotate=cv2.ROTATE_90_CLOCKWISE)
+            if analysis.face_box is not None:
+                face_box = sensor_box(analysis.face_box, upload.full_width, upload.full_height)
+        else:
+            record_result(status, img_original, sid)
+        results[frame_spec.index] = {"status": status, "next_interval_ms": next_interval(status, sid),
+                                     "face_box": face_box}
+
+    # 한 장도 받지 못했으면 단일 요청과 같이 503 + 재시도 안내
+    if busy is not None and all(result.get("dropped") == "busy" for result in results):
+        return busy_response(busy)
+    return {"results": results}
+
+@app.websocket("/ws/stream")
+async def ws_stream(websocket: WebSocket):
+    """
+    운전자 1명의 연속 프레임 스트림 처리 (프로토콜은 utils/streamProtocol.py 참고)
+    프레임 규격은 연결 시 1회만 협상하고 이후 Y 평면 바이너리만 수신
+    프레임마다 분석 작업을 띄우고 바로 다음 프레임을 받음 (분석이 밀리면 대기 중인 이전 프레임은 dropped)
+    """
+    await websocket.accept()
+    session = StreamSession(websocket.query_params.get("session_id"))
+    send_lock = asyncio.Lock()
+    tasks = set()
+
+    async def send(msg: dict):
+        # 여러 프레임 작업이 같은 연결로 응답하므로 전송은 하나씩
+        async with send_lock:
+            await websocket.send_json(msg)
+
+    async def analyze_frame(seq: int, capture_ts_ms: int, y_bytes, geometry: StreamGeometry):
+        try:
+            status, img_original, face_box = await inference_pool.run(
+                analyze_raw_job, y_bytes, geometry.width, geometry.height, geometry.row_stride,
+                session.session_id, capture_ts_ms or None,
+                key=session.session_id, deadline=deadline_clock.deadline(session.session_id, capture_ts_ms or None),
+                weight=session_weight(session.session_id),
+            )
+        except QueueFullError as e:
+            session.rejected += 1
+            await send({"type": "busy", "seq": seq, "retry_after": e.retry_after})
+            return
+        except FrameDropped as e:
+            session.dropped += 1
+            await send({"type": "dropped", "seq": seq, "reason": e.reason,
+                        "next_interval_ms": next_interval([False, False, False], session.session_id)})
+            return
+        except ValueError as e:
+            await send({"type": "error", "seq": seq, "error": str(e)})
+            return
+        except Exception as e:
+            # 워커 예외도 응답 없이 사라지지 않도록 해당 seq에 오류 응답
+            print(f"[ws] 세션 {session.session_id} 프레임 {seq} 분석 실패: {e!r}")
+            await send({"type": "error", "seq": seq, "error": "analysis failed"})
+            return
+
+        session.frames += 1
+        session.last_status = status
+        await send({
+            "type": "result",
+            "seq": seq,
+            "status": status,
+            "next_interval_ms": next_interval(status, session.session_id),
+            "face_box": face_box,
+        })
+        record_result(status, img_original, session.session_id, rotate=cv2.ROTATE_90_CLOCKWISE)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            # A. 텍스트 메시지: 프레임 규격 (재)협상
+            if message.get("text") is not None:
+                try:
+                    msg = json.loads(message["text"])
+                    session.geometry = parse_geometry(msg)
+                except (json.JSONDecodeError, ProtocolError) as e:
+                    await send({"type": "error", "error": str(e)})
+                    continue
+                if msg.get("session_id"):
+                    session.session_id = str(msg["session_id"])
+                await send({
+                    "type": "ready",
+                    "session_id": session.session_id,
+                    "geometry": session.geometry.to_dict(),
+                    "header_size": FRAME_HEADER.size,
+                })
+                continue
+
+            # B. 바이너리 메시지: 헤더 + Y 평면
+            data = message.get("bytes")
+            if data is None:
+                continue
+            if session.geometry is None:
+                await send({"type": "error", "error": "frame geometry not negotiated"})
+                continue
+            try:
+                seq, capture_ts_ms, y_bytes = unpack_frame(data)
+            except ProtocolError as e:
+                await send({"type": "error", "error": str(e)})
+                continue
+
+            if not startup.ready:
+                await send({"type": "busy", "seq": seq, "retry_after": 1})
+                continue
+
+            task = asyncio.create_task(analyze_frame(seq, capture_ts_ms, y_bytes, session.geometry))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # 연결이 끊기면 아직 시작하지 않은 프레임 작업은 취소 (워커는 취소된 작업을 건너뜀)
+        for task in list(tasks):
+            task.cancel()
+
+# ==============================
+# 공유 메모리 로컬 수신 채널 (Unix 도메인 소켓)
+# ==============================
+
+async def shm_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """
+    같은 장치의 카메라 프로세스 1개 = 운전자 세션 1개 (프로토콜은 utils/shmTransport.py 참고)
+    /ws/stream과 같은 흐름이지만 프레임 바이트 대신 공유 메모리 슬롯 번호를 받아 슬롯을 그대로 분석
+    """
+    send_lock = asyncio.Lock()
+    jobs = set()        # 슬롯을 읽을 수 있는 추론 작업 (연결 종료 시 끝날 때까지 링 버퍼를 닫지 않음)
+    tasks = set()
+    busy_slots = set()  # 응답을 보내기 전이라 클라이언트가 다시 쓰면 안 되는 슬롯
+
+    async def send(msg: dict):
+        async with send_lock:
+            try:
+                writer.write(encode_message(msg))
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    try:
+        hello = decode_message(await reader.readline())
+        if hello.get("type") != "hello":
+            raise ProtocolError("expected hello")
+        ring = ShmRing.attach(hello.get("shm"), hello.get("slots"), hello.get("slot_size"))
+    except (ProtocolError, ValueError, ConnectionError) as e:
+        await send({"type": "error", "error": str(e)})
+        writer.close()
+        return
+    session = StreamSession(str(hello["session_id"]) if hello.get("session_id") else None)
+    await send({"type": "ready", "session_id": session.session_id})
+
+    async def finish_frame(seq: int, slot: int, job):
+        reply = {"seq": seq, "slot": slot}
+        ok = False
+        try:
+            status, img_original, face_box = await asyncio.wrap_future(job)
+        except FrameDropped as e:
+            session.dropped += 1
+            msg = {"type": "dropped", **reply, "reason": e.reason,
+                   "next_interval_ms": next_interval([False, False, False], session.session_id)}
+        except ValueError as e:
+            msg = {"type": "error", **reply, "error": str(e)}
+        except Exception as e:
+            print(f"[shm] 세션 {session.session_id} 프레임 {seq} 분석 실패: {e!r}")
+            msg = {"type": "error", **reply, "error": "analysis failed"}
+        else:
+            ok = True
+            session.frames += 1
+            session.last_status = status
+            msg = {"type": "result", **reply, "status": status,
+                   "next_interval_ms": next_interval(status, session.session_id), "face_box": face_box}
+        finally:
+            jobs.discard(job)
+            # 응답을 보내면 클라이언트가 바로 슬롯을 다시 쓸 수 있으므로 먼저 반환 (취소되어도 슬롯이 남지 않게)
+            busy_slots.discard(slot)
+        await send(msg)
+        if ok:
+            record_result(status, img_original, session.session_id, rotate=cv2.ROTATE_90_CLOCKWISE)
+
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except (ValueError, ConnectionError):
+                break
+            if not line:
+                break
+            msg = {}
+            try:
+                msg = decode_message(line)
+                if msg.get("type") != "frame":
+                    raise ProtocolError(f"unexpected message type: {msg.get('type')}")
+                seq, slot, length, upload, capture_ts_ms = parse_frame(msg, ring)
+            except ProtocolError as e:
+                await send({"type": "error", "seq": msg.get("seq"), "slot": msg.get("slot"), "error": str(e)})
+                continue
+            reply = {"seq": seq, "slot": slot}
+            if slot in busy_slots:
+                # 분석 중인 슬롯을 덮어쓴 프레임: 이전 작업이 슬롯을 쓰고 있으므로 slot은 반환하지 않음
+                await send({"type": "error", "seq": seq, "error": f"slot {slot} is still in use"})
+                continue
+            if not startup.ready:
+                await send({"type": "busy", **reply, "retry_after": 1})
+                continue
+
+            # 작업 제출은 수신 루프에서 바로 (연결 종료 시 모든 작업을 추적할 수 있도록)
+            sid = session.session_id
+            try:
+                job = inference_pool.submit(
+                    analyze_shm_job, ring, slot, length, upload, sid, capture_ts_ms,
+                    key=sid, deadline=deadline_clock.deadline(sid, capture_ts_ms), weight=session_weight(sid),
+                )
+            except QueueFullError as e:
+                session.rejected += 1
+                await send({"type": "busy", **reply, "retry_after": e.retry_after})
+                continue
+            except FrameDropped as e:
+                session.dropped += 1
+                await send({"type": "dropped", **reply, "reason": e.reason,
+                            "next_interval_ms": next_interval([False, False, False], sid)})
+                continue
+            busy_slots.add(slot)
+            jobs.add(job)
+            task = asyncio.create_task(finish_frame(seq, slot, job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        # 시작 전 작업은 취소, 이미 실행 중인 작업은 슬롯을 읽고 있으므로 끝날 때까지 기다린 뒤 링 버퍼를 닫음
+        running = [job for job in list(jobs) if not job.cancel()]
+        await asyncio.gather(*(asyncio.wrap_future(job) for job in running), return_exceptions=True)
+        for task in list(tasks):
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            ring.close()
+        except BufferError:
+            # 실패한 작업의 예외 추적 정보가 아직 슬롯 view를 잡고 있으면 GC 시 해제
+            print(f"[shm] 세션 {session.session_id} 링 버퍼 view가 남아 있어 닫기 보류")
+        writer.close()
+
+async def start_shm_server():
+    """공유 메모리 수신 소켓 열기 (이전 실행이 남긴 소켓 파일은 지우고 다시 생성)"""
+    if os.path.exists(SHM_SOCKET_PATH):
+        os.unlink(SHM_SOCKET_PATH)
+    server = await asyncio.start_unix_server(shm_connection, path=SHM_SOCKET_PATH)
+    # 같은 사용자/그룹의 카메라 프로세스만 연결
+    os.chmod(SHM_SOCKET_PATH, 0o660)
+    print(f"[shm] listening on {SHM_SOCKET_PATH}")
+    return server
 
 @app.get("/")
 async def health_check():
-    return {"status": "ok", "endpoints": ["/analyze_raw", "/analyze_jpeg"]}
+    return {
+        "status": "ok" if startup.ready else startup.state,
+        "endpoints": ["/analyze_raw", "/analyze_jpeg", "/analyze_batch", "/ws/stream",
+                      "/livez", "/readyz", "/metrics"],
+    }
+
+@app.get("/livez")
+async def livez():
+    """프로세스(이벤트 루프) 생존 여부: 기동 중에도 200"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz():
+    """모든 워커의 모델 로드 + 워밍업이 끝났을 때만 200"""
+    if not startup.ready:
+        return JSONResponse(status_code=503, content={"status": startup.state, "error": startup.error})
+    return {"status": "ready", "ready_after_ms": startup.ready_after_ms}
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "startup": startup.stats(),
+        "process": process_stats(),
+        "inference": inference_pool.stats(),
+        "sessions": inference_pool.session_stats(),
+        "yolo_batch": yolo_batcher.stats() if yolo_batcher is not None else None,
+        "history": history_writer.stats(),
+        "capture": capture_store.stats(),
+        "landmarkers": landmarker_pool.stats() if landmarker_pool is not None else None,
+        "ingest": inference_pool.sum_context_stats(lambda ctx: ctx.ingestor.stats()),
+        "cadence": cadence.stats(),
+        "cascade": cascade.stats(),
+        "send_interval": interval_advisor.stats(),
+        "stages": summarize_stages(inference_pool.sum_context_stats(lambda ctx: ctx.timer.stats())),
+    }
 
 
 '''
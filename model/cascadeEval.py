@@ -0,0 +1,183 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+import yaml
+
+from utils.camPredictUtils import judge_parts
+from utils.detectorBackends import create_detector
+from utils.landmarkCascade import LandmarkCascade
+from utils.mediapipeUtils import FaceProcessor, eye_aspect_ratio, mouth_aspect_ratio
+
+# 랜드마크 기하 판정(EAR/MAR 캐스케이드)과 YOLO 판정 비교 (오프라인)
+# 프레임마다 MediaPipe -> EAR/MAR + YOLO 판정을 모두 계산한 뒤
+#   - 주어진 임계값에서 YOLO를 생략하는 비율(skip_ratio)과 생략 프레임의 YOLO 일치율
+#   - YOLO 라벨별 EAR/MAR 분포 (임계값 설정 참고용)
+#   - 임계값 격자 탐색: 일치율 --min-agreement 이상, 놓친 경보 비율 --max-missed-rate 이하에서 생략 비율이 가장 큰 조합
+#   - meets_bar: 주어진 임계값이 두 기준을 모두 통과하는지 (통과한 임계값만 서빙에서 CASCADE_MODE=on)
+# 을 출력
+# 실행: python -m model.cascadeEval --source drive.mp4 --model best.onnx
+#       python -m model.cascadeEval --data data_mp.yaml --split val --limit 2000 --report cascade.json
+
+def iter_frames(source, data_yaml, split, stride, limit):
+    """(이름, 흑백 프레임): 동영상 파일, 이미지 폴더, 또는 데이터셋 YAML의 분할 (서빙 경로와 같은 흑백 입력)"""
+    if source and os.path.isfile(source):
+        cap = cv2.VideoCapture(source)
+        index = count = 0
+        while not limit or count < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if index % stride == 0:
+                count += 1
+                yield f"{os.path.basename(source)}#{index}", cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            index += 1
+        cap.release()
+        return
+
+    if source:
+        image_dir = source
+    else:
+        with open(data_yaml, encoding="utf-8") as f:
+            cfg = yaml.safe_load(f)
+        image_dir = os.path.join(cfg["path"], cfg[split], "images")
+    names = sorted(f for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".png")))
+    for name in names[::stride][:limit or None]:
+        frame = cv2.imread(os.path.join(image_dir, name), cv2.IMREAD_GRAYSCALE)
+        if frame is not None:
+            yield name, frame
+
+def collect(frames, processor, detector, imgsz):
+    """얼굴이 검출된 프레임별 (EAR, MAR, YOLO 하품, YOLO 눈감김)"""
+    rows, no_face = [], 0
+    for _, frame in frames:
+        processed = processor.process_frame(frame, out_size=imgsz, gray=True)
+        if processed is None:
+            no_face += 1
+            continue
+        _, bbox_coords, _, crop, letterbox, pts = processed
+        yawn, eye_closed = judge_parts(detector.predict(crop), letterbox, bbox_coords)
+        rows.append((eye_aspect_ratio(pts), mouth_aspect_ratio(pts), yawn, eye_closed))
+    return np.array(rows, dtype=np.float64).reshape(-1, 4), no_face
+
+def evaluate(samples, ear_closed, ear_open, mar_yawn, mar_closed):
+    """임계값 1조합의 생략 비율 / 생략 프레임 일치율 / 놓친 위험(YOLO 양성인데 기하 판정 음성) 수"""
+    ear, mar = samples[:, 0], samples[:, 1]
+    yolo_yawn, yolo_eye = samples[:, 2] > 0, samples[:, 3] > 0
+    eye_sure = (ear <= ear_closed) | (ear >= ear_open)
+    mouth_sure = (mar >= mar_yawn) | (mar <= mar_closed)
+    decided = eye_sure & mouth_sure
+    eye_ok = (ear <= ear_closed) == yolo_eye
+    yawn_ok = (mar >= mar_yawn) == yolo_yawn
+    n = int(decided.sum())
+    missed = int((decided & yolo_eye & ~eye_ok).sum()) + int((decided & yolo_yawn & ~yawn_ok).sum())
+    positives = int(yolo_eye.sum() + yolo_yawn.sum())
+    return {
+        "frames": len(samples),
+        "decided": n,
+        "skip_ratio": round(n / len(samples), 4) if len(samples) else 0.0,
+        "agreement": round(float((eye_ok & yawn_ok)[decided].mean()), 4) if n else None,
+        "eye_agreement": round(float(eye_ok[decided].mean()), 4) if n else None,
+        "yawn_agreement": round(float(yawn_ok[decided].mean()), 4) if n else None,
+        # 전체 판정 일치율 (애매한 프레임은 YOLO를 쓰므로 항상 일치)
+        "overall_agreement": round(1 - float((~(eye_ok & yawn_ok) & decided).sum()) / len(samples), 4)
+        if len(samples) else None,
+        "missed_eye_closed": int((decided & yolo_eye & ~eye_ok).sum()),
+        "missed_yawn": int((decided & yolo_yawn & ~yawn_ok).sum()),
+        # YOLO 양성(눈감김 + 하품) 중 기하 판정이 음성으로 덮어쓴 비율
+        "missed_alert_rate": round(missed / positives, 4) if positives else 0.0,
+    }
+
+def meets_bar(result, min_agreement, max_missed_rate):
+    return (result["agreement"] is not None and result["agreement"] >= min_agreement
+            and result["missed_alert_rate"] <= max_missed_rate)
+
+def distribution(values, mask):
+    if not mask.any():
+        return None
+    q = np.percentile(values[mask], [1, 5, 50, 95, 99])
+    return dict(zip(("p1", "p5", "p50", "p95", "p99"), np.round(q, 4).tolist()))
+
+def sweep(samples, min_agreement, max_missed_rate, steps=6):
+    """
+    라벨별 EAR/MAR 분포 분위수로 만든 격자에서 일치율 min_agreement 이상,
+    놓친 경보 비율 max_missed_rate 이하, 생략 비율 최대 조합
+    (놓친 위험 수가 적은 조합 우선)
+    """
+    ear, mar = samples[:, 0], samples[:, 1]
+    qs = np.linspace(1, 99, steps)
+    ear_grid = np.unique(np.round(np.percentile(ear, qs), 3))
+    mar_grid = np.unique(np.round(np.percentile(mar, qs), 3))
+    best = None
+    for ec, eo, mc, my in itertools.product(ear_grid, ear_grid, mar_grid, mar_grid):
+        if ec >= eo or mc >= my:
+            continue
+        result = evaluate(samples, ec, eo, my, mc)
+        if not meets_bar(result, min_agreement, max_missed_rate):
+            continue
+        key = (result["skip_ratio"], -(result["missed_eye_closed"] + result["missed_yawn"]))
+        if best is None or key > best[0]:
+            thresholds = {"ear_closed": float(ec), "ear_open": float(eo), "mar_yawn": float(my), "mar_closed": float(mc)}
+            best = (key, {"thresholds": thresholds, **result})
+    return best[1] if best else None
+
+if __name__ == "__main__":
+    defaults = LandmarkCascade()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default=None, help="동영상 파일 또는 이미지 폴더 (없으면 --data/--split)")
+    parser.add_argument("--data", default="data_mp.yaml")
+    parser.add_argument("--split", default="val")
+    parser.add_argument("--model", default="best.onnx")
+    parser.add_argument("--backend", default="onnxruntime", choices=["onnxruntime", "openvino", "ultralytics"])
+    parser.add_argument("--landmarker", default="face_landmarker.task")
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--stride", type=int, default=1, help="프레임/이미지 간격")
+    parser.add_argument("--limit", type=int, default=0, help="평가할 프레임 수 (0이면 전체)")
+    parser.add_argument("--ear-closed", type=float, default=defaults.ear_closed)
+    parser.add_argument("--ear-open", type=float, default=defaults.ear_open)
+    parser.add_argument("--mar-yawn", type=float, default=defaults.mar_yawn)
+    parser.add_argument("--mar-closed", type=float, default=defaults.mar_closed)
+    parser.add_argument("--min-agreement", type=float, default=0.99, help="요구할 생략 프레임 일치율")
+    parser.add_argument("--max-missed-rate", type=float, default=0.001,
+                        help="허용할 놓친 경보 비율 (YOLO 양성 중 기하 판정 음성)")
+    parser.add_argument("--report", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    processor = FaceProcessor(args.landmarker)
+    detector = create_detector(args.backend, args.model, imgsz=args.imgsz, conf=args.conf,
+                               device="cpu" if args.backend == "ultralytics" else None)
+    samples, no_face = collect(iter_frames(args.source, args.data, args.split, args.stride, args.limit),
+                               processor, detector, args.imgsz)
+    if len(samples) == 0:
+        sys.exit("얼굴이 검출된 프레임 없음")
+
+    ear, mar = samples[:, 0], samples[:, 1]
+    yolo_yawn, yolo_eye = samples[:, 2] > 0, samples[:, 3] > 0
+    result = evaluate(samples, args.ear_closed, args.ear_open, args.mar_yawn, args.mar_closed)
+    report = {
+        "source": args.source or f"{args.data}:{args.split}",
+        "model": args.model,
+        "no_face_frames": no_face,
+        "yolo_positive": {"eye_closed": int(yolo_eye.sum()), "yawn": int(yolo_yawn.sum())},
+        "thresholds": {"ear_closed": args.ear_closed, "ear_open": args.ear_open,
+                       "mar_yawn": args.mar_yawn, "mar_closed": args.mar_closed},
+        "result": result,
+        "bar": {"min_agreement": args.min_agreement, "max_missed_rate": args.max_missed_rate},
+        "meets_bar": meets_bar(result, args.min_agreement, args.max_missed_rate),
+        "distribution": {
+            "ear|yolo_eye_closed": distribution(ear, yolo_eye),
+            "ear|yolo_eye_open": distribution(ear, ~yolo_eye),
+            "mar|yolo_yawn": distribution(mar, yolo_yawn),
+            "mar|yolo_no_yawn": distribution(mar, ~yolo_yawn),
+        },
+        "best_sweep": sweep(samples, args.min_agreement, args.max_missed_rate),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
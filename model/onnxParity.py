@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+import yaml
+
+from utils.camPredictUtils import pairwise_iou
+from utils.detectorBackends import OnnxDetector, UltralyticsDetector
+
+# ONNX Runtime / OpenVINO 경량 검출기와 ultralytics YOLO.predict 결과 비교
+# 검증 세트 이미지(흑백)를 두 경로로 추론해 박스/신뢰도/클래스가 허용 오차 안에서 같은지 확인
+# 실행: python -m model.onnxParity --model best.onnx --data data_mp.yaml --imgsz 320
+# (ultralytics/torch는 이 비교 스크립트에서만 사용, 서버는 불러오지 않음)
+# 고정 소형 모델 기준 자동 검증은 tests/test_detectorBackends.py (pytest)
+
+def load_val_images(data_yaml):
+    with open(data_yaml, encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+    image_dir = os.path.join(cfg["path"], cfg["val"], "images")
+    return sorted(os.path.join(image_dir, f) for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".png")))
+
+def compare(ref, new, iou_tol, conf_tol):
+    """
+    같은 클래스끼리 IoU가 가장 큰 박스를 짝지어 비교
+    반환: (짝지은 수, 누락 수, 추가 수, 최대 좌표 차이, 최대 신뢰도 차이)
+    """
+    matched, max_coord, max_conf = 0, 0.0, 0.0
+    used = np.zeros(len(new), dtype=bool)
+    iou = pairwise_iou(np.concatenate([ref[:, :4], new[:, :4]]).astype(np.float32))[:len(ref), len(ref):]
+    for i, box in enumerate(ref):
+        candidates = np.flatnonzero((new[:, 5] == box[5]) & ~used)
+        if len(candidates) == 0:
+            continue
+        j = candidates[np.argmax(iou[i, candidates])]
+        if iou[i, j] < iou_tol or abs(new[j, 4] - box[4]) > conf_tol:
+            continue
+        used[j] = True
+        matched += 1
+        max_coord = max(max_coord, float(np.abs(new[j, :4] - box[:4]).max()))
+        max_conf = max(max_conf, float(abs(new[j, 4] - box[4])))
+    return matched, len(ref) - matched, len(new) - matched, max_coord, max_conf
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="best.onnx")
+    parser.add_argument("--data", default="data_mp.yaml")
+    parser.add_argument("--backend", default="onnxruntime", choices=["onnxruntime", "openvino"])
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--limit", type=int, default=0, help="비교할 이미지 수 (0이면 전체)")
+    parser.add_argument("--iou-tol", type=float, default=0.99, help="같은 박스로 볼 최소 IoU")
+    parser.add_argument("--conf-tol", type=float, default=1e-3, help="허용 신뢰도 차이")
+    parser.add_argument("--report", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    classes = [0, 1, 2, 3]
+    reference = UltralyticsDetector(args.model, imgsz=args.imgsz, conf=args.conf, classes=classes, device="cpu")
+    detector = OnnxDetector(args.model, imgsz=args.imgsz, conf=args.conf, classes=classes, backend=args.backend)
+
+    images = load_val_images(args.data)
+    if args.limit:
+        images = images[:args.limit]
+
+    totals = {"images": 0, "identical_images": 0, "ref_boxes": 0, "matched": 0, "missing": 0, "extra": 0,
+              "max_coord_diff": 0.0, "max_conf_diff": 0.0}
+    mismatched = []
+    for path in images:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        ref = reference.predict(gray)
+        new = detector.predict(gray)
+        matched, missing, extra, coord, conf = compare(ref, new, args.iou_tol, args.conf_tol)
+
+        totals["images"] += 1
+        totals["ref_boxes"] += len(ref)
+        totals["matched"] += matched
+        totals["missing"] += missing
+        totals["extra"] += extra
+        totals["max_coord_diff"] = max(totals["max_coord_diff"], coord)
+        totals["max_conf_diff"] = max(totals["max_conf_diff"], conf)
+        if missing or extra:
+            mismatched.append(os.path.basename(path))
+        else:
+            totals["identical_images"] += 1
+
+    totals["mismatched_files"] = mismatched[:50]
+    print(json.dumps(totals, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(totals, f, indent=2, ensure_ascii=False)
+
+    # 누락/추가 박스가 하나라도 있으면 실패
+    sys.exit(1 if mismatched else 0)
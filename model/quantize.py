@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+from utils.detectorBackends import OnnxDetector, letterbox_gray
+
+# YOLO 검출기 INT8 정적 양자화 (Post-Training Quantization) + 정확도 게이트
+# 1. best.pt면 imgsz별 FP32 ONNX로 export, best.onnx면 그대로 사용
+# 2. 학습 세트 흑백 이미지 일부로 보정(calibration)해 QDQ INT8 ONNX 생성
+#    (보정 입력은 서버 OnnxDetector와 같은 레터박스/정규화 사용)
+# 3. openvino가 설치되어 있으면 INT8 ONNX를 OpenVINO IR로도 변환
+# 4. 검증 세트 mAP50-95(FP32 vs INT8)와 CPU 지연 시간(320, 640) 측정 -> JSON 리포트
+# 5. mAP 하락이 --max-map-drop을 넘으면 배포 경로로 복사하지 않고 종료 코드 1
+# 실행: python -m model.quantize --weights best.pt --data data_mp.yaml --imgsz 320 640
+# (ultralytics/torch는 export와 mAP 측정에서만 사용, 서버는 MODEL_PATH로 INT8 ONNX만 불러옴)
+
+def load_split_images(data_yaml, split):
+    with open(data_yaml, encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+    image_dir = os.path.join(cfg["path"], cfg[split], "images")
+    return sorted(os.path.join(image_dir, f) for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".png")))
+
+def input_size(onnx_path):
+    """ONNX 입력 (H, W), 동적 크기면 None"""
+    import onnxruntime as ort
+
+    shape = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].shape
+    h, w = shape[2], shape[3]
+    return (h, w) if isinstance(h, int) and isinstance(w, int) else None
+
+# ==============================
+# FP32 모델 준비
+# ==============================
+def export_fp32(weights, imgsz, out_dir):
+    """best.pt -> imgsz 고정 FP32 ONNX (ultralytics export 결과를 작업 폴더로 이동)"""
+    if weights.endswith(".onnx"):
+        size = input_size(weights)
+        if size is not None and size != (imgsz, imgsz):
+            return None  # 입력 크기가 고정된 ONNX는 해당 크기만 측정
+        return weights
+
+    from ultralytics import YOLO
+
+    path = YOLO(weights).export(format="onnx", imgsz=imgsz, simplify=True, dynamic=False)
+    target = os.path.join(out_dir, f"fp32_{imgsz}.onnx")
+    shutil.move(path, target)
+    return target
+
+# ==============================
+# INT8 양자화
+# ==============================
+class CalibrationReader:
+    """
+    onnxruntime.quantization.CalibrationDataReader 구현
+    이미지를 서버와 같은 흑백 레터박스 + /255 정규화로 변환해 한 장씩 반환
+    """
+    def __init__(self, images, input_name, imgsz, channels):
+        self.images = images
+        self.input_name = input_name
+        self.imgsz = (imgsz, imgsz)
+        self.channels = channels
+        self._iter = iter(self.images)
+
+    def get_next(self):
+        for path in self._iter:
+            gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                continue
+            canvas, _ = letterbox_gray(gray, self.imgsz)
+            x = np.divide(canvas, np.float32(255), dtype=np.float32)
+            return {self.input_name: np.broadcast_to(x, (1, self.channels) + self.imgsz).copy()}
+        return None
+
+    def rewind(self):
+        self._iter = iter(self.images)
+
+def head_nodes_to_exclude(model):
+    """
+    검출 헤드(마지막 모듈)의 Conv 이외 연산 (박스 디코드, DFL, Sigmoid, TopK 등)
+    좌표/점수 계산은 INT8 오차에 민감해 FP32로 유지 (ultralytics OpenVINO INT8 export와 같은 방식)
+    """
+    pattern = re.compile(r"/model\.(\d+)/")
+    indices = [int(m.group(1)) for node in model.graph.node if (m := pattern.search(node.name))]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [node.name for node in model.graph.node if head in node.name and node.op_type != "Conv"]
+
+def quantize_int8(fp32_path, int8_path, images, imgsz, calibrate_method):
+    import onnx
+    import onnxruntime as ort
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType, quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    # 양자화 전처리 (shape 추론 + 그래프 최적화), 실패하면 원본 그대로 사용
+    prep_path = int8_path.replace(".onnx", "_prep.onnx")
+    try:
+        quant_pre_process(fp32_path, prep_path, skip_symbolic_shape=True)
+    except Exception as e:
+        print(f"[quantize] pre-process 생략: {e}")
+        shutil.copyfile(fp32_path, prep_path)
+
+    inp = ort.InferenceSession(prep_path, providers=["CPUExecutionProvider"]).get_inputs()[0]
+    reader = CalibrationReader(images, inp.name, imgsz, inp.shape[1])
+    exclude = head_nodes_to_exclude(onnx.load(prep_path))
+    quantize_static(
+        prep_path,
+        int8_path,
+        reader,
+        quant_format=QuantFormat.QDQ,           # Conv 앞뒤에 Q/DQ 삽입 (ORT, OpenVINO 모두 INT8 커널 사용)
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,                       # 출력 채널별 가중치 스케일
+        calibrate_method=getattr(CalibrationMethod, calibrate_method),
+        nodes_to_exclude=exclude,
+        extra_options={"ActivationSymmetric": False, "WeightSymmetric": True},
+    )
+    os.remove(prep_path)
+    # ultralytics export 메타데이터(names, imgsz 등) 유지
+    fp32, int8 = onnx.load(fp32_path), onnx.load(int8_path)
+    keys = {p.key for p in int8.metadata_props}
+    missing = [p for p in fp32.metadata_props if p.key not in keys]
+    if missing:
+        int8.metadata_props.extend(missing)
+        onnx.save(int8, int8_path)
+    return len(exclude)
+
+def export_openvino(int8_path, out_dir):
+    """INT8 QDQ ONNX -> OpenVINO IR (openvino 미설치 시 None)"""
+    try:
+        import openvino as ov
+    except ImportError:
+        return None
+    ir_dir = os.path.join(out_dir, os.path.basename(int8_path).replace(".onnx", "_openvino_model"))
+    os.makedirs(ir_dir, exist_ok=True)
+    xml = os.path.join(ir_dir, "model.xml")
+    ov.save_model(ov.convert_model(int8_path), xml, compress_to_fp16=False)
+    return ir_dir
+
+# ==============================
+# 평가
+# ==============================
+def evaluate_map(model_path, data_yaml, imgsz):
+    """ultralytics 검증 (mAP50-95, mAP50), 흑백 1채널 설정은 data yaml의 channels를 따름"""
+    from ultralytics import YOLO
+
+    metrics = YOLO(model_path, task="detect").val(data=data_yaml, imgsz=imgsz, batch=1, device="cpu",
+                                                  plots=False, verbose=False)
+    return {"map50_95": round(float(metrics.box.map), 4), "map50": round(float(metrics.box.map50), 4)}
+
+def measure_latency(model_path, imgsz, images, threads, runs, warmup):
+    """OnnxDetector.predict 한 장 지연 시간(ms), 서버와 같은 전처리/후처리 포함"""
+    detector = OnnxDetector(model_path, imgsz=imgsz, num_threads=threads)
+    crops = [cv2.imread(p, cv2.IMREAD_GRAYSCALE) for p in images[:max(1, runs)]]
+    crops = [c for c in crops if c is not None] or [np.full((imgsz, imgsz), 128, dtype=np.uint8)]
+    for i in range(warmup):
+        detector.predict(crops[i % len(crops)])
+    times = []
+    for i in range(runs):
+        start = time.perf_counter()
+        detector.predict(crops[i % len(crops)])
+        times.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(float(np.percentile(times, 50)), 2),
+            "p95_ms": round(float(np.percentile(times, 95)), 2),
+            "mean_ms": round(float(np.mean(times)), 2)}
+
+def file_mb(path):
+    return round(os.path.getsize(path) / (1024 * 1024), 2)
+
+def publish(src, dst):
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+    else:
+        shutil.copyfile(src, dst)
+    print(f"[quantize] published {src} -> {dst}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="best.pt", help="best.pt (imgsz별 export) 또는 best.onnx")
+    parser.add_argument("--data", default="data_mp.yaml")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[320, 640])
+    parser.add_argument("--calib-split", default="train", help="보정 이미지를 가져올 data yaml 항목")
+    parser.add_argument("--calib-images", type=int, default=300, help="보정 이미지 수")
+    parser.add_argument("--calib-method", default="MinMax", choices=["MinMax", "Entropy", "Percentile"])
+    parser.add_argument("--max-map-drop", type=float, default=0.01,
+                        help="허용 mAP50-95 하락 (절대값), 넘으면 배포하지 않음")
+    parser.add_argument("--threads", type=int, default=1, help="지연 시간 측정 스레드 수")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--out", default="runs/quantize", help="중간 모델/리포트 저장 폴더")
+    parser.add_argument("--publish", default="best_int8.onnx",
+                        help="게이트 통과 시 첫 번째 imgsz INT8 모델을 복사할 경로 (서버 MODEL_PATH)")
+    parser.add_argument("--skip-map", action="store_true", help="mAP 측정 생략 (게이트도 생략, 배포하지 않음)")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    rng = np.random.default_rng(0)
+    calib = load_split_images(args.data, args.calib_split)
+    calib = sorted(rng.choice(calib, size=min(args.calib_images, len(calib)), replace=False).tolist())
+    val_images = load_split_images(args.data, "val")
+
+    report = {"weights": args.weights, "data": args.data, "calib_images": len(calib),
+              "calib_method": args.calib_method, "max_map_drop": args.max_map_drop,
+              "threads": args.threads, "sizes": {}}
+    passed = not args.skip_map
+    for imgsz in args.imgsz:
+        fp32_path = export_fp32(args.weights, imgsz, args.out)
+        if fp32_path is None:
+            print(f"[quantize] {args.weights}는 입력 크기가 고정되어 imgsz={imgsz} 생략")
+            continue
+        int8_path = os.path.join(args.out, f"int8_{imgsz}.onnx")
+        excluded = quantize_int8(fp32_path, int8_path, calib, imgsz, args.calib_method)
+        ir_dir = export_openvino(int8_path, args.out)
+
+        entry = {
+            "fp32": {"path": fp32_path, "size_mb": file_mb(fp32_path)},
+            "int8": {"path": int8_path, "size_mb": file_mb(int8_path), "openvino_ir": ir_dir,
+                     "fp32_nodes": excluded},
+        }
+        for key in ("fp32", "int8"):
+            path = entry[key]["path"]
+            entry[key]["latency"] = measure_latency(path, imgsz, val_images, args.threads, args.runs, args.warmup)
+            if not args.skip_map:
+                entry[key].update(evaluate_map(path, args.data, imgsz))
+        entry["speedup"] = round(entry["fp32"]["latency"]["p50_ms"] / entry["int8"]["latency"]["p50_ms"], 2)
+        if not args.skip_map:
+            entry["map_drop"] = round(entry["fp32"]["map50_95"] - entry["int8"]["map50_95"], 4)
+            entry["passed"] = entry["map_drop"] <= args.max_map_drop
+            passed &= entry["passed"]
+        report["sizes"][imgsz] = entry
+        print(f"[quantize] imgsz={imgsz}: {json.dumps(entry, ensure_ascii=False)}")
+
+    # 모든 크기에서 허용 범위 안일 때만 배포 경로로 복사
+    report["passed"] = passed and bool(report["sizes"])
+    if report["passed"]:
+        first = report["sizes"][next(iter(report["sizes"]))]["int8"]
+        publish(first["path"], args.publish)
+        if first["openvino_ir"]:
+            publish(first["openvino_ir"], args.publish.replace(".onnx", "_openvino_model"))
+        report["published"] = args.publish
+    else:
+        print("[quantize] 정확도 게이트 미통과(또는 mAP 미측정) -> 배포하지 않음")
+
+    with open(os.path.join(args.out, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    sys.exit(0 if report["passed"] else 1)
@@ -0,0 +1,159 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from utils.serveRuntime import apply_thread_budget, available_cpus, partition_cpus, process_memory
+
+# ==============================
+# 멀티 프로세스 서빙 슈퍼바이저 (Linux 전용, os.fork 사용)
+# ==============================
+# 1. 부모 프로세스에서 무거운 모듈 import (fork 후 자식과 모듈 코드/데이터 페이지 공유, 자식은 import 시간 절약)
+#    모델 가중치는 워커마다 세션이 따로 올리므로 공유되지 않음 (모델 파일 자체는 OS 페이지 캐시가 공유)
+# 2. 리스닝 소켓을 하나 만들고 워커 수만큼 fork (커널이 연결을 워커에 분배)
+# 3. 워커마다 겹치지 않는 코어 묶음에 고정하고 그 크기로 스레드 예산 설정
+# 4. 워커가 죽으면 같은 코어 묶음으로 다시 띄우고, 주기적으로 워커별 RSS/PSS 출력
+#
+# 실행: python serve.py --workers 4 --port 8000
+# 주의: HTTP 요청은 매번 다른 워커로 갈 수 있어 세션별 얼굴 추적은 /ws/stream(연결 고정)에서만 연속적
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=os.environ.get("SERVE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SERVE_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SERVE_PROCESSES", 2)),
+                        help="워커 프로세스 수")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("CPU_THREADS", 0)),
+                        help="워커 프로세스당 스레드 예산 (0이면 고정된 코어 묶음 크기)")
+    parser.add_argument("--no-pin", action="store_true", help="워커를 코어에 고정하지 않음")
+    parser.add_argument("--report-sec", type=float, default=float(os.environ.get("SERVE_REPORT_SEC", 60)),
+                        help="워커별 메모리 출력 주기(초), 0이면 출력하지 않음")
+    return parser.parse_args()
+
+def preload(threads):
+    """
+    fork 전에 부모 프로세스에서 수행: 무거운 모듈 import
+    (세션/그래프 생성은 스레드를 만들기 때문에 fork 이후 워커에서 수행)
+    """
+    started = time.perf_counter()
+    # numpy BLAS / OpenMP 스레드 수는 라이브러리 import 전에 정해야 함
+    apply_thread_budget(threads)
+
+    import fastapi  # noqa: F401
+    import utils.mediapipeUtils  # noqa: F401
+    from utils.serverStartup import BACKEND_MODULES
+    backend = os.environ.get("DETECTOR_BACKEND", "onnxruntime")
+    if backend in BACKEND_MODULES:
+        __import__(BACKEND_MODULES[backend])
+
+    # import로 만들어진 객체를 GC 추적 대상에서 빼서 자식의 GC가 공유 페이지를 건드리지 않게 함
+    gc.collect()
+    gc.freeze()
+    print(f"[serve] preload {(time.perf_counter() - started) * 1000:.0f}ms")
+
+def run_worker(index, sock, cpus, threads, pin):
+    """fork된 자식 프로세스: 코어 고정 -> 워커별 설정 -> uvicorn 실행"""
+    if pin and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    budget = threads or len(cpus)
+
+    os.environ["SERVE_WORKER_INDEX"] = str(index)
+    os.environ["CPU_THREADS"] = str(budget)
+    # 캡처 이미지/DB 기록 저널은 워커별 폴더로 분리 (SQLite/용량 한도 공유 방지)
+    save_root = os.environ.get("SAVE_DIR", "drowsy_data")
+    os.environ["SAVE_DIR"] = os.path.join(save_root, f"worker{index}")
+    os.environ["HISTORY_JOURNAL_PATH"] = os.path.join(os.environ["SAVE_DIR"], "history_journal.db")
+    os.makedirs(os.environ["SAVE_DIR"], exist_ok=True)
+    # 공유 메모리 수신 소켓도 워커별로 분리 (<경로>.<워커 번호>)
+    if os.environ.get("SHM_SOCKET_PATH"):
+        os.environ["SHM_SOCKET_PATH"] = f"{os.environ['SHM_SOCKET_PATH']}.{index}"
+
+    import uvicorn
+    import main
+
+    print(f"[serve] worker {index} pid={os.getpid()} cpus={cpus} threads={budget}")
+    config = uvicorn.Config(main.app, log_level="warning")
+    uvicorn.Server(config).run(sockets=[sock])
+
+def spawn(index, sock, cpus, threads, pin):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            run_worker(index, sock, cpus, threads, pin)
+        except BaseException as e:
+            print(f"[serve] worker {index} 종료: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+def report(workers):
+    rows = []
+    total_pss = 0.0
+    for pid, (index, cpus) in sorted(workers.items(), key=lambda kv: kv[1][0]):
+        mem = process_memory(pid)
+        total_pss += mem.get("pss_mb", 0.0)
+        rows.append(f"w{index}(pid={pid}, cpus={cpus[0]}-{cpus[-1]}) rss={mem.get('rss_mb')}MB "
+                    f"pss={mem.get('pss_mb')}MB shared={mem.get('shared_mb')}MB")
+    print("[serve] " + " | ".join(rows) + f" | total pss={total_pss:.1f}MB")
+
+if __name__ == "__main__":
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py는 os.fork를 지원하는 OS(Linux)에서만 동작합니다. 단일 프로세스는 uvicorn main:app 사용")
+
+    args = parse_args()
+    os.environ["SERVE_PROCESSES"] = str(args.workers)
+    # 캡처 디스크 한도(CAPTURE_QUOTA_MB)는 노드 전체 값으로 보고 워커 수로 나눔
+    os.environ["CAPTURE_QUOTA_MB"] = str(float(os.environ.get("CAPTURE_QUOTA_MB", 2048)) / args.workers)
+    core_sets = partition_cpus(args.workers) if not args.no_pin else [available_cpus()] * args.workers
+    preload(args.threads or len(core_sets[0]))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    print(f"[serve] listening on {args.host}:{args.port}, workers={args.workers}")
+
+    workers = {}  # pid -> (index, cpus)
+    for i, cpus in enumerate(core_sets):
+        workers[spawn(i, sock, cpus, args.threads, not args.no_pin)] = (i, cpus)
+
+    stopping = False
+    def stop(signum, frame):
+        global stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    next_report = time.monotonic() + args.report_sec
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            if args.report_sec and time.monotonic() >= next_report and not stopping:
+                report(workers)
+                next_report = time.monotonic() + args.report_sec
+            time.sleep(0.5)
+            continue
+
+        index, cpus = workers.pop(pid)
+        if stopping:
+            continue
+        # 비정상 종료한 워커는 같은 코어 묶음으로 다시 실행
+        print(f"[serve] worker {index} (pid={pid}) exited with {os.waitstatus_to_exitcode(status)}, restarting")
+        time.sleep(1.0)
+        workers[spawn(index, sock, cpus, args.threads, not args.no_pin)] = (index, cpus)
+    print("[serve] stopped")
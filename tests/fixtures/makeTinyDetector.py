@@ -0,0 +1,94 @@
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+# tests/test_detectorBackends.py용 초소형 YOLO 형식 ONNX 모델 생성 (onnx 패키지 필요, 결과 파일은 저장소에 포함)
+# 실행: python tests/fixtures/makeTinyDetector.py
+#
+# 입력: images (batch, 3, 320, 320) float32 0~1 (ultralytics export와 같은 형식)
+# 출력은 상수 후보 + 입력 평균 밝기에 비례하는 후보 1개
+# -> 레터박스/정규화 결과(패딩 114 포함)가 달라지면 검출 결과도 달라짐
+#   tinyYoloRaw.onnx : NMS 이전 출력 (batch, 4 + 5, 12) [cx, cy, w, h, 클래스별 점수]
+#   tinyYoloE2E.onnx : end2end 출력 (batch, 8, 6) [x1, y1, x2, y2, conf, cls]
+
+IMGSZ = 320
+NAMES = {0: "eye_opened", 1: "eye_closed", 2: "mouth_opened", 3: "mouth_closed", 4: "face"}
+
+# (cx, cy, w, h, cls, 점수), 점수 None은 입력 평균 밝기
+RAW_CANDIDATES = [
+    (100, 100, 40, 20, 1, 0.90),
+    (102, 100, 40, 20, 1, 0.80),   # 0번과 IoU 0.905 -> 같은 클래스라 억제
+    (102, 100, 40, 20, 0, 0.70),   # 0번과 같은 위치지만 다른 클래스 -> 유지
+    (200, 150, 60, 40, 2, 0.60),
+    (200, 150, 60, 40, 4, 0.95),   # 얼굴 클래스 -> classes 필터로 제외
+    (220, 200, 30, 30, 3, 0.20),   # conf 0.25 미만
+    (150, 220, 50, 30, 3, None),   # 입력 평균 밝기 (흰 크롭이면 남고 검은 크롭이면 사라짐)
+]
+NUM_ANCHORS = 12
+
+# [x1, y1, x2, y2, conf, cls], conf None은 입력 평균 밝기
+E2E_ROWS = [
+    (80, 90, 120, 110, 0.90, 1),
+    (170, 130, 230, 170, 0.60, 2),
+    (40, 40, 280, 300, 0.95, 4),   # 얼굴 클래스 -> classes 필터로 제외
+    (125, 205, 175, 235, None, 3),
+    (220, 200, 250, 230, 0.20, 3),  # conf 0.25 미만
+]
+NUM_ROWS = 8
+
+
+def raw_tensors():
+    base = np.zeros((1, 4 + len(NAMES), NUM_ANCHORS), dtype=np.float32)
+    gain = np.zeros_like(base)
+    for a, (cx, cy, w, h, cls, score) in enumerate(RAW_CANDIDATES):
+        base[0, :4, a] = cx, cy, w, h
+        if score is None:
+            gain[0, 4 + cls, a] = 1.0
+        else:
+            base[0, 4 + cls, a] = score
+    return base, gain
+
+
+def e2e_tensors():
+    base = np.zeros((1, NUM_ROWS, 6), dtype=np.float32)
+    gain = np.zeros_like(base)
+    for k, (x1, y1, x2, y2, conf, cls) in enumerate(E2E_ROWS):
+        base[0, k] = x1, y1, x2, y2, conf or 0.0, cls
+        if conf is None:
+            gain[0, k, 4] = 1.0
+    return base, gain
+
+
+def build(path, base, gain):
+    """output = base + mean(images) * gain (배치 차원은 입력을 따름)"""
+    x = helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, IMGSZ, IMGSZ])
+    y = helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch"] + list(base.shape[1:]))
+    initializers = [
+        numpy_helper.from_array(base, "base"),
+        numpy_helper.from_array(gain, "gain"),
+        numpy_helper.from_array(np.array([1, 2, 3], dtype=np.int64), "axes"),
+        numpy_helper.from_array(np.array([-1, 1, 1], dtype=np.int64), "shape"),
+    ]
+    nodes = [
+        helper.make_node("ReduceMean", ["images", "axes"], ["mean"], keepdims=1),  # (batch, 1, 1, 1)
+        helper.make_node("Reshape", ["mean", "shape"], ["mean3"]),                 # (batch, 1, 1)
+        helper.make_node("Mul", ["mean3", "gain"], ["scaled"]),
+        helper.make_node("Add", ["scaled", "base"], ["output0"]),
+    ]
+    graph = helper.make_graph(nodes, "tiny_yolo", [x], [y], initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 18)])
+    model.ir_version = 9
+    # ultralytics export와 같은 메타데이터 키
+    for key, value in {"names": str(NAMES), "stride": "32", "task": "detect", "batch": "1",
+                       "imgsz": str([IMGSZ, IMGSZ]), "channels": "3"}.items():
+        model.metadata_props.append(onnx.StringStringEntryProto(key=key, value=value))
+    onnx.checker.check_model(model)
+    onnx.save(model, path)
+
+
+if __name__ == "__main__":
+    import os
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    build(os.path.join(here, "tinyYoloRaw.onnx"), *raw_tensors())
+    build(os.path.join(here, "tinyYoloE2E.onnx"), *e2e_tensors())
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from utils.camPredictUtils import (SMALL_NMS_MAX, calculate_iou, filter_overlapping_batch,
+                                   filter_overlapping_boxes, greedy_nms, judge_parts)
+
+# 벡터화/작은 N 경로의 NMS가 기존 O(n^2) 구현과 값, 순서, dtype까지 같은지 검증
+
+
+def legacy_filter(data, iou_threshold=0.3):
+    """기존 filter_overlapping_parts 구현 (results 대신 data 배열을 받도록만 변경)"""
+    eye_indices = [i for i, x in enumerate(data) if x[5] in [0, 1]]
+    mouth_indices = [i for i, x in enumerate(data) if x[5] in [2, 3]]
+
+    def get_best_idx(indices, weight_map={1: 1.05, 2: 1.2}):
+        sorted_indices = sorted(indices, key=lambda i: data[i][4] * weight_map.get(int(data[i][5]), 1.0),
+                                reverse=True)
+        valid, used = [], set()
+        for i in sorted_indices:
+            if i in used: continue
+            valid.append(i)
+            for j in sorted_indices:
+                if i == j or j in used: continue
+                if calculate_iou(data[i][:4], data[j][:4]) > iou_threshold:
+                    used.add(j)
+        return valid
+
+    return data[get_best_idx(eye_indices) + get_best_idx(mouth_indices)]
+
+
+def legacy_nms(boxes, iou_threshold):
+    """calculate_iou 쌍별 비교로 만든 greedy NMS 기준 구현"""
+    keep = []
+    for i in range(len(boxes)):
+        if all(not calculate_iou(boxes[k], boxes[i]) > iou_threshold for k in keep):
+            keep.append(i)
+    return keep
+
+
+def make_detections(num_boxes, rng):
+    """
+    눈 2곳, 입 1곳, 얼굴 1곳 주변에 흔들린 박스가 몰린 가짜 검출 결과 (N, 6) float32
+    동점 신뢰도, 완전히 같은 박스, 넓이 0 박스, 맞닿은 박스 포함
+    """
+    centers = np.array([[110, 130, 40, 24], [210, 130, 40, 24], [160, 240, 70, 40], [160, 170, 260, 300]])
+    part = rng.integers(0, 4, num_boxes)
+    cx, cy, bw, bh = (centers[part] * rng.normal(1.0, [0.06, 0.06, 0.2, 0.2], (num_boxes, 4))).T
+    cls = np.where(part < 2, rng.integers(0, 2, num_boxes), np.where(part == 2, rng.integers(2, 4, num_boxes), 4))
+    conf = np.round(rng.uniform(0.25, 0.95, num_boxes), 2)  # 소수 둘째 자리 -> 동점 발생
+
+    data = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2, conf, cls], axis=1)
+    data[:, :4] = np.clip(data[:, :4], 0, 320)
+    data = data.astype(np.float32)
+    if num_boxes >= 4:
+        data[1, :4] = data[0, :4]                        # 완전히 같은 박스
+        data[2, :4] = data[0, [2, 1, 2, 3]]              # 넓이 0 박스
+        data[3, 0], data[3, 2] = data[0, 2], data[0, 2] + 10  # 맞닿은 박스
+        data[3, 5] = data[0, 5]
+    return data
+
+
+def assert_same(ref, new):
+    assert ref.dtype == new.dtype and np.array_equal(ref, new), (ref, new)
+
+
+# SMALL_NMS_MAX 양쪽 (파이썬 루프 경로 / IoU 행렬 경로)
+BOX_COUNTS = [0, 1, 2, 5, SMALL_NMS_MAX - 1, SMALL_NMS_MAX, SMALL_NMS_MAX + 1, 30, 100]
+
+
+@pytest.mark.parametrize("num_boxes", BOX_COUNTS)
+def test_filter_matches_legacy_filter(num_boxes):
+    rng = np.random.default_rng(num_boxes)
+    for _ in range(20):
+        data = make_detections(num_boxes, rng)
+        assert_same(legacy_filter(data), filter_overlapping_boxes(data))
+
+
+@pytest.mark.parametrize("num_boxes", BOX_COUNTS)
+def test_greedy_nms_matches_pairwise_reference(num_boxes):
+    rng = np.random.default_rng(100 + num_boxes)
+    for _ in range(20):
+        boxes = make_detections(num_boxes, rng)[:, :4]
+        assert greedy_nms(boxes, 0.3) == legacy_nms(boxes, 0.3)
+
+
+def test_batch_matches_single_image_filter():
+    rng = np.random.default_rng(7)
+    # 작은 N / 큰 N 이미지를 섞은 배치
+    batch = [make_detections(n, rng) for n in [0, 3, 50, SMALL_NMS_MAX, 300, SMALL_NMS_MAX + 1, 1]]
+    filtered = filter_overlapping_batch(batch)
+    assert len(filtered) == len(batch)
+    for data, new in zip(batch, filtered):
+        assert_same(legacy_filter(data), new)
+    assert filter_overlapping_batch([]) == []
+
+
+@pytest.mark.parametrize("num_boxes", [4, SMALL_NMS_MAX + 4])
+def test_ties_keep_original_order(num_boxes):
+    # 같은 클래스, 같은 신뢰도, 겹치지 않는 박스: 입력 순서 그대로 모두 남음
+    x = np.arange(num_boxes, dtype=np.float32) * 20
+    data = np.stack([x, np.zeros_like(x), x + 10, np.full_like(x, 10),
+                     np.full_like(x, 0.5), np.zeros_like(x)], axis=1)
+    assert_same(data, filter_overlapping_boxes(data))
+    # 가중치 적용 후 동점 (0.5 * 1.2 == 0.6): 먼저 온 박스가 남음
+    pair = np.array([[0, 0, 10, 10, 0.6, 3], [0, 0, 10, 10, 0.5, 2]], dtype=np.float32)
+    assert_same(legacy_filter(pair), filter_overlapping_boxes(pair))
+
+
+@pytest.mark.parametrize("num_boxes", [3, SMALL_NMS_MAX + 3])
+def test_identical_boxes_collapse_per_class_group(num_boxes):
+    box = [10, 10, 50, 40]
+    rows = []
+    for i in range(num_boxes):
+        rows.append(box + [0.3 + 0.01 * i, i % 2])        # 눈 그룹 (0: 열림, 1: 닫힘)
+        rows.append(box + [0.3 + 0.01 * i, 2 + i % 2])    # 입 그룹 (2: 열림, 3: 닫힘)
+        rows.append(box + [0.9, 4])                        # 얼굴: 어떤 그룹에도 속하지 않아 버림
+    data = np.array(rows, dtype=np.float32)
+    kept = filter_overlapping_boxes(data)
+    # 같은 위치의 박스는 그룹마다 가중 신뢰도가 가장 높은 1개만 남음 (눈 -> 입 순서)
+    assert kept[:, 5].tolist() in ([0, 2], [0, 3], [1, 2], [1, 3])
+    assert_same(legacy_filter(data), kept)
+
+
+def test_judge_parts_accepts_prefiltered_detections():
+    rng = np.random.default_rng(3)
+    batch = [make_detections(n, rng) for n in [8, 40]]
+    letterbox, bbox = (0.5, 10, 0), (0, 0, 640, 640)
+    for data, filtered in zip(batch, filter_overlapping_batch(batch)):
+        assert judge_parts(data, letterbox, bbox) == judge_parts(filtered, letterbox, bbox, filtered=True)
@@ -0,0 +1,57 @@
+import sqlite3
+
+import numpy as np
+
+from utils.captureStore import CaptureStore
+
+NORMAL = [False, False, False]
+EVENT = [False, True, False]
+
+
+def frame(value):
+    return np.full((8, 8), value, dtype=np.uint8)
+
+
+def saved(store):
+    """(session_id, reason) 목록 (저장 순서)"""
+    store.close()
+    with sqlite3.connect(f"{store.save_dir}/captures.db") as db:
+        return db.execute("SELECT session_id, reason FROM captures ORDER BY filename").fetchall()
+
+
+def test_event_flushes_pre_event_ring_of_the_same_session(tmp_path):
+    store = CaptureStore(str(tmp_path), policy="event", pre_event_frames=2, post_event_frames=1)
+    store.start()
+    for i in range(3):
+        store.submit("car-1", frame(i), NORMAL)
+        store.submit("car-2", frame(i), NORMAL)
+    assert store.submit("car-1", frame(9), EVENT) is not None
+    store.submit("car-1", frame(10), NORMAL)
+    store.submit("car-1", frame(11), NORMAL)
+
+    assert saved(store) == [("car-1", "pre_event"), ("car-1", "pre_event"),
+                            ("car-1", "event"), ("car-1", "post_event")]
+
+
+def test_anonymous_frames_do_not_share_event_context(tmp_path):
+    store = CaptureStore(str(tmp_path), policy="event", pre_event_frames=3, post_event_frames=3)
+    store.start()
+    # session_id 없는 서로 다른 클라이언트: 한쪽의 이상 감지가 다른 쪽 프레임을 저장하면 안 됨
+    for i in range(3):
+        assert store.submit(None, frame(i), NORMAL) is None
+    assert store.submit(None, frame(9), EVENT) is not None
+    for i in range(3):
+        assert store.submit(None, frame(i), NORMAL) is None
+
+    assert saved(store) == [(None, "event")]
+    assert store.stats()["sessions"] == 0
+
+
+def test_anonymous_frames_follow_sample_policy(tmp_path):
+    store = CaptureStore(str(tmp_path), policy="sample", sample_every=3)
+    store.start()
+    for i in range(7):
+        store.submit(None, frame(i), NORMAL)
+    store.submit(None, frame(9), EVENT)
+
+    assert saved(store) == [(None, "sample"), (None, "sample"), (None, "event")]
@@ -0,0 +1,168 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.camPredictUtils import unletterbox_boxes
+from utils.detectorBackends import OnnxDetector, letterbox_gray
+
+# OnnxDetector를 고정 ONNX 모델(tests/fixtures/makeTinyDetector.py)로 실행해
+# ultralytics 규칙(LetterBox -> non_max_suppression -> scale_boxes)으로 계산해 둔 결과와 비교
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+RAW_MODEL = os.path.join(FIXTURES, "tinyYoloRaw.onnx")
+E2E_MODEL = os.path.join(FIXTURES, "tinyYoloE2E.onnx")
+
+# 입력 평균 밝기 (흰 크롭 + 114 패딩, 0~1)
+WIDE_MEAN = (240 * 255 + 80 * 114) / (320 * 255)   # 120x160 -> 세로 패딩 40px씩
+TALL_MEAN = (80 * 255 + 240 * 114) / (320 * 255)   # 200x50 -> 가로 패딩 120px씩
+
+CROPS = {
+    "wide_white": np.full((120, 160), 255, dtype=np.uint8),  # scale 2.0, pad (0, 40)
+    "square_black": np.zeros((320, 320), dtype=np.uint8),    # 레터박스 없음
+    "tall_white": np.full((200, 50), 255, dtype=np.uint8),   # scale 1.6, pad (120, 0), 경계 밖 좌표는 clip
+}
+
+# 크롭 좌표 기준 [x1, y1, x2, y2, conf, cls], 신뢰도 내림차순 (ultralytics 결과 순서)
+EXPECTED_RAW = {
+    "wide_white": [
+        [40, 25, 60, 35, 0.90, 1],
+        [62.5, 82.5, 87.5, 97.5, WIDE_MEAN, 3],
+        [41, 25, 61, 35, 0.70, 0],
+        [85, 45, 115, 65, 0.60, 2],
+    ],
+    "square_black": [
+        [80, 90, 120, 110, 0.90, 1],
+        [82, 90, 122, 110, 0.70, 0],
+        [170, 130, 230, 170, 0.60, 2],
+    ],
+    "tall_white": [
+        [0, 56.25, 0, 68.75, 0.90, 1],
+        [0, 56.25, 1.25, 68.75, 0.70, 0],
+        [31.25, 81.25, 50, 106.25, 0.60, 2],
+        [3.125, 128.125, 34.375, 146.875, TALL_MEAN, 3],
+    ],
+}
+
+# end2end 출력은 모델이 낸 순서 그대로 (conf/클래스 필터만 적용)
+EXPECTED_E2E = {
+    "wide_white": [
+        [40, 25, 60, 35, 0.90, 1],
+        [85, 45, 115, 65, 0.60, 2],
+        [62.5, 82.5, 87.5, 97.5, WIDE_MEAN, 3],
+    ],
+    "square_black": [
+        [80, 90, 120, 110, 0.90, 1],
+        [170, 130, 230, 170, 0.60, 2],
+    ],
+    "tall_white": [
+        [0, 56.25, 0, 68.75, 0.90, 1],
+        [31.25, 81.25, 50, 106.25, 0.60, 2],
+        [3.125, 128.125, 34.375, 146.875, TALL_MEAN, 3],
+    ],
+}
+
+
+def assert_detections(det, expected):
+    assert det.dtype == np.float32 and det.shape == (len(expected), 6)
+    expected = np.array(expected, dtype=np.float32)
+    np.testing.assert_allclose(det[:, :4], expected[:, :4], atol=1e-4)
+    assert np.array_equal(det[:, 5], expected[:, 5])
+    # 평균 밝기 점수는 ONNX Runtime float32 합산 오차가 있어 onnxParity 기본 허용치(1e-3)로 비교
+    # (패딩 값이 1만 달라도 0.003 이상 차이)
+    np.testing.assert_allclose(det[:, 4], expected[:, 4], atol=1e-3)
+
+
+@pytest.mark.parametrize("model,expected", [(RAW_MODEL, EXPECTED_RAW), (E2E_MODEL, EXPECTED_E2E)])
+def test_predict_matches_recorded_outputs(model, expected):
+    detector = OnnxDetector(model, imgsz=320, conf=0.25)
+    assert detector.names[4] == "face"
+    for name, crop in CROPS.items():
+        assert_detections(detector.predict(crop), expected[name])
+
+
+@pytest.mark.parametrize("model,expected", [(RAW_MODEL, EXPECTED_RAW), (E2E_MODEL, EXPECTED_E2E)])
+@pytest.mark.parametrize("max_batch", [1, 2, 4])
+def test_predict_batch_matches_single_predict(model, expected, max_batch):
+    detector = OnnxDetector(model, imgsz=320, conf=0.25, max_batch=max_batch)
+    names = list(CROPS) * 2
+    # 배치 크기로 나뉘는 경계와 버퍼 재사용 후에도 크롭별 결과가 같아야 함
+    results = detector.predict_batch([CROPS[name] for name in names])
+    assert len(results) == len(names)
+    for name, det in zip(names, results):
+        assert_detections(det, expected[name])
+
+
+def test_three_channel_crop_is_converted_to_gray():
+    detector = OnnxDetector(RAW_MODEL, imgsz=320, conf=0.25)
+    bgr = cv2.cvtColor(CROPS["wide_white"], cv2.COLOR_GRAY2BGR)
+    assert_detections(detector.predict(bgr), EXPECTED_RAW["wide_white"])
+
+
+def ultralytics_letterbox(img, new_shape):
+    """ultralytics LetterBox(auto=False, scaleup=True, center=True) 흑백 버전"""
+    h, w = img.shape[:2]
+    r = min(new_shape[0] / h, new_shape[1] / w)
+    new_unpad = int(round(w * r)), int(round(h * r))
+    dw, dh = (new_shape[1] - new_unpad[0]) / 2, (new_shape[0] - new_unpad[1]) / 2
+    if (w, h) != new_unpad:
+        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=114)
+    return img, (r, left, top)
+
+
+SHAPES = [(120, 160), (200, 50), (320, 320), (480, 640), (121, 77), (1, 500), (33, 400), (319, 321)]
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("imgsz", [(320, 320), (256, 320)])
+def test_letterbox_gray_matches_ultralytics_letterbox(shape, imgsz):
+    crop = np.random.default_rng(sum(shape)).integers(0, 256, shape, dtype=np.uint8)
+    ref, ref_lb = ultralytics_letterbox(crop, imgsz)
+    canvas = np.zeros(imgsz, dtype=np.uint8)
+    img, lb = letterbox_gray(crop, imgsz, canvas)
+    assert img.shape == imgsz and np.array_equal(img, ref)
+    if crop.shape != imgsz:
+        assert lb == ref_lb
+        # 재사용 버퍼에 직접 기록
+        assert img is canvas
+    else:
+        assert lb == (1.0, 0, 0) and img is crop
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_unletterbox_boxes_round_trip(shape):
+    h, w = shape
+    rng = np.random.default_rng(h * 1000 + w)
+    _, (scale, pad_x, pad_y) = letterbox_gray(np.zeros(shape, dtype=np.uint8), (320, 320))
+    xy = rng.uniform(0, 1, (20, 4)) * [w, h, w, h]
+    boxes = np.concatenate([np.minimum(xy[:, :2], xy[:, 2:]), np.maximum(xy[:, :2], xy[:, 2:]),
+                            rng.uniform(0.25, 1, (20, 1)), rng.integers(0, 4, (20, 1))], axis=1).astype(np.float32)
+    # 크롭 좌표 -> 레터박스 입력 좌표 -> 크롭 좌표
+    letterboxed = boxes.copy()
+    letterboxed[:, [0, 2]] = letterboxed[:, [0, 2]] * scale + pad_x
+    letterboxed[:, [1, 3]] = letterboxed[:, [1, 3]] * scale + pad_y
+    restored = unletterbox_boxes(letterboxed, (scale, pad_x, pad_y))
+    np.testing.assert_allclose(restored, boxes, rtol=1e-5, atol=1e-3)
+    assert np.array_equal(restored[:, 4:], boxes[:, 4:])
+    # 입력 배열은 그대로 두고 레터박스가 없으면 복사하지 않음
+    if (scale, pad_x, pad_y) != (1.0, 0, 0):
+        assert not np.shares_memory(restored, letterboxed)
+    assert unletterbox_boxes(boxes, (1.0, 0, 0)) is boxes
+
+
+def test_matches_ultralytics_predict():
+    # ultralytics가 설치된 환경에서는 같은 모델의 YOLO.predict 결과와도 직접 비교
+    pytest.importorskip("ultralytics")
+    from model.onnxParity import compare
+    from utils.detectorBackends import UltralyticsDetector
+
+    reference = UltralyticsDetector(RAW_MODEL, imgsz=320, conf=0.25, device="cpu")
+    detector = OnnxDetector(RAW_MODEL, imgsz=320, conf=0.25)
+    for crop in CROPS.values():
+        ref, new = reference.predict(crop), detector.predict(crop)
+        matched, missing, extra, max_coord, max_conf = compare(ref, new, iou_tol=0.99, conf_tol=1e-3)
+        assert (missing, extra) == (0, 0) and max_coord < 0.5 and max_conf < 1e-3
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from utils.frameIngest import check_plane, y_plane_view
+
+
+@pytest.mark.parametrize("width,height,stride,size", [
+    (4, 3, 4, 12),
+    (4, 3, 6, 16),   # 마지막 행 stride 패딩 생략
+    (4, 3, 6, 18),
+])
+def test_check_plane_accepts_valid_geometry(width, height, stride, size):
+    check_plane(width, height, stride, size)
+    view, copied = y_plane_view(bytes(size), width, height, stride)
+    assert view.shape == (height, width) and not copied
+
+
+@pytest.mark.parametrize("width,height,stride,size", [
+    (0, 3, 4, 12),
+    (4, 0, 4, 12),
+    (-4, 3, 4, 12),
+    (4, 3, 3, 12),   # stride < width
+    (4, 3, 6, 15),   # 마지막 행이 잘림
+    (640, 480, 640, 100),
+])
+def test_check_plane_rejects_invalid_geometry(width, height, stride, size):
+    with pytest.raises(ValueError):
+        check_plane(width, height, stride, size)
+
+
+def test_y_plane_view_keeps_row_layout():
+    buf = np.arange(16, dtype=np.uint8).tobytes()
+    view, _ = y_plane_view(buf, 4, 3, 6)
+    assert view.tolist() == [[0, 1, 2, 3], [6, 7, 8, 9], [12, 13, 14, 15]]
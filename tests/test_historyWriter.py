@@ -0,0 +1,144 @@
+import sqlite3
+import time
+
+import pytest
+
+from utils.historyWriter import HistoryWriter, make_postgrest_insert
+from utils.supabaseStub import start_stub
+
+# HistoryWriter를 로컬 Supabase 대체 서버(utils/supabaseStub.py)에 붙여 검증
+
+TABLE = "drowsy_history"
+
+
+@pytest.fixture
+def stub():
+    server, state, base_url = start_stub()
+    yield state, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def make_writer(base_url, tmp_path, **kwargs):
+    options = dict(max_batch=5, flush_interval=0.05, max_retries=0, backoff_base=0.01, backoff_max=0.05)
+    options.update(kwargs)
+    insert = make_postgrest_insert(base_url, "test-key", TABLE, timeout=2.0)
+    return HistoryWriter(insert, str(tmp_path / "journal.db"), **options)
+
+
+def wait_until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def rows(n, start=0):
+    return [{"seq": i} for i in range(start, start + n)]
+
+
+def sent_seqs(state):
+    return [r["seq"] for r in state.rows(TABLE)]
+
+
+def test_flushes_buffer_in_batches(stub, tmp_path):
+    state, base_url = stub
+    writer = make_writer(base_url, tmp_path, flush_interval=10.0)
+    # 시작 전에 쌓아 두면 첫 flush에서 max_batch씩 나눠 전송
+    for row in rows(12):
+        writer.add(row)
+    writer.start()
+    writer.close()
+
+    assert sent_seqs(state) == list(range(12))
+    assert state.requests == 3
+    assert writer.stats()["sent"] == 12
+    assert writer.stats()["queue_depth"] == 0
+
+
+def test_outage_spills_to_journal_and_replays_in_order(stub, tmp_path):
+    state, base_url = stub
+    state.fail = True
+    writer = make_writer(base_url, tmp_path)
+    writer.start()
+    try:
+        for row in rows(8):
+            writer.add(row)
+        wait_until(lambda: writer.stats()["journaled"] == 8)
+        assert not writer.stats()["backend_up"]
+        assert sent_seqs(state) == []
+        with sqlite3.connect(str(tmp_path / "journal.db")) as db:
+            assert db.execute("SELECT COUNT(*) FROM pending").fetchone()[0] == 8
+
+        # 복구 후 저널 -> 새 행 순서로 전송
+        state.fail = False
+        for row in rows(4, start=8):
+            writer.add(row)
+        wait_until(lambda: writer.stats()["sent"] == 12)
+    finally:
+        writer.close()
+
+    assert sent_seqs(state) == list(range(12))
+    stats = writer.stats()
+    assert stats["backend_up"] and stats["journaled"] == 0 and stats["spilled"] >= 8
+    with sqlite3.connect(str(tmp_path / "journal.db")) as db:
+        assert db.execute("SELECT COUNT(*) FROM pending").fetchone()[0] == 0
+
+
+def test_permanent_rejection_is_dead_lettered(stub, tmp_path):
+    state, base_url = stub
+    state.fail_next.append(400)
+    writer = make_writer(base_url, tmp_path, flush_interval=10.0)
+    for row in rows(7):
+        writer.add(row)
+    writer.start()
+    writer.close()
+
+    # 첫 배치(0~4)만 거부되어 dead_letter로, 다음 배치는 정상 전송
+    assert sent_seqs(state) == [5, 6]
+    stats = writer.stats()
+    assert stats["dead_lettered"] == 5 and stats["sent"] == 2 and stats["journaled"] == 0
+    with sqlite3.connect(str(tmp_path / "journal.db")) as db:
+        dead = db.execute("SELECT payload, error FROM dead_letter ORDER BY id").fetchall()
+    assert [p for p, _ in dead] == ['{"seq": %d}' % i for i in range(5)]
+    assert all("400" in error for _, error in dead)
+
+
+def test_rejection_during_replay_advances_journal(stub, tmp_path):
+    state, base_url = stub
+    state.fail = True
+    writer = make_writer(base_url, tmp_path)
+    writer.start()
+    try:
+        for row in rows(10):
+            writer.add(row)
+        wait_until(lambda: writer.stats()["journaled"] == 10)
+        # 저널 맨 앞 배치가 거부되어도 나머지 저널은 계속 재전송
+        state.fail_next.append(422)
+        state.fail = False
+        wait_until(lambda: writer.stats()["journaled"] == 0)
+    finally:
+        writer.close()
+
+    assert sent_seqs(state) == list(range(5, 10))
+    assert writer.stats()["dead_lettered"] == 5
+
+
+@pytest.mark.parametrize("status", [408, 429, 503])
+def test_retryable_errors_are_retried(stub, tmp_path, status):
+    state, base_url = stub
+    state.fail_next.extend([status, status])
+    writer = make_writer(base_url, tmp_path, max_batch=3, max_retries=2)
+    writer.start()
+    try:
+        # 종료 중에는 재시도하지 않으므로 전송이 끝난 뒤 close
+        for row in rows(3):
+            writer.add(row)
+        wait_until(lambda: writer.stats()["sent"] == 3)
+    finally:
+        writer.close()
+
+    assert sent_seqs(state) == [0, 1, 2]
+    stats = writer.stats()
+    assert stats["failed_attempts"] == 2 and stats["dead_lettered"] == 0 and stats["sent"] == 3
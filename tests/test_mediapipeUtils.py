@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils.mediapipeUtils import FaceProcessor
+
+
+@pytest.fixture(scope="module")
+def processor():
+    processor = FaceProcessor("face_landmarker.task")
+    yield processor
+    # 인터프리터 종료 시점까지 남겨 두면 MediaPipe 정리 단계에서 멈추므로 직접 닫음
+    processor.detector.close()
+
+
+def fake_results(x, y, n=478):
+    """모든 랜드마크가 정규화 좌표 (x, y) 근처에 있는 검출 결과"""
+    rng = np.random.default_rng(0)
+    jitter = rng.uniform(-0.01, 0.01, size=(n, 2))
+    return SimpleNamespace(face_landmarks=[
+        [SimpleNamespace(x=x + dx, y=y + dy, z=0.0) for dx, dy in jitter]
+    ])
+
+
+@pytest.mark.parametrize("crop_coords", [(10, 10, 10, 50), (10, 10, 50, 10), (60, 10, 40, 50)])
+@pytest.mark.parametrize("out_size", [None, 32])
+def test_align_crop_rejects_empty_crop(processor, crop_coords, out_size):
+    frame = np.zeros((64, 64), dtype=np.uint8)
+    assert processor.align_crop(frame, (32.0, 32.0), 5.0, crop_coords, out_size, gray=True) is None
+
+
+def test_align_crop_letterboxes_thin_crop(processor):
+    frame = np.zeros((64, 64), dtype=np.uint8)
+    crop, _, (scale, pad_x, pad_y) = processor.align_crop(frame, (32.0, 32.0), 0.0, (0, 0, 64, 1), 32, gray=True)
+    assert crop.shape == (32, 32) and scale == 0.5
+
+
+@pytest.mark.parametrize("x,y", [(1.5, 0.5), (0.5, -0.5), (-0.5, -0.5)])
+def test_landmarks_outside_frame_count_as_no_face(processor, monkeypatch, x, y):
+    monkeypatch.setattr(processor, "detect", lambda *args, **kwargs: fake_results(x, y))
+    frame = np.zeros((120, 160), dtype=np.uint8)
+    assert processor.process_frame(frame, out_size=32, gray=True) is None
+
+
+def test_landmarks_inside_frame_are_cropped(processor, monkeypatch):
+    monkeypatch.setattr(processor, "detect", lambda *args, **kwargs: fake_results(0.5, 0.5))
+    frame = np.zeros((120, 160), dtype=np.uint8)
+    result = processor.process_frame(frame, out_size=32, gray=True)
+    assert result is not None and result[3].shape == (32, 32)
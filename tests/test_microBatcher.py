@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from utils.microBatcher import MicroBatcher
+
+
+def make_batcher(max_batch=2, max_wait_ms=50.0, predict=None):
+    calls = []
+
+    def predict_fn(ctx, items):
+        calls.append(list(items))
+        return predict(items) if predict else [item * 10 for item in items]
+
+    batcher = MicroBatcher(lambda: None, predict_fn, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    batcher.start()
+    assert batcher.wait_ready(5)
+    return batcher, calls
+
+
+def test_submit_many_keeps_group_in_one_batch():
+    batcher, calls = make_batcher(max_batch=2)
+    try:
+        # max_batch보다 큰 묶음도 나누지 않고 한 번에 추론
+        futures = batcher.submit_many(list(range(7)))
+        assert [f.result(5) for f in futures] == [i * 10 for i in range(7)]
+    finally:
+        batcher.shutdown()
+    assert calls == [list(range(7))]
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["items"] == 7 and stats["batch_size_hist"] == {7: 1}
+
+
+def test_single_items_still_fire_at_max_batch():
+    batcher, calls = make_batcher(max_batch=2, max_wait_ms=2000.0)
+    try:
+        results = [None] * 2
+
+        def worker(i):
+            results[i] = batcher.predict(i, timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(1.0)  # max_wait(2초)를 기다리지 않고 2개가 모이면 바로 실행
+        assert results == [0, 10]
+    finally:
+        batcher.shutdown()
+    assert sorted(calls[0]) == [0, 1]
+
+
+def test_group_failure_fails_every_future():
+    def boom(items):
+        raise RuntimeError("forward failed")
+
+    batcher, _ = make_batcher(predict=boom)
+    try:
+        futures = batcher.submit_many([1, 2, 3])
+        for f in futures:
+            with pytest.raises(RuntimeError):
+                f.result(5)
+    finally:
+        batcher.shutdown()
+    assert batcher.submit_many([]) == []
+
+
+def test_submit_after_init_failure_fails_immediately():
+    def init():
+        raise OSError("no model")
+
+    batcher = MicroBatcher(init, lambda ctx, items: items, max_batch=4)
+    batcher.start()
+    assert not batcher.wait_ready(5)
+    futures = batcher.submit_many([1, 2])
+    assert all(isinstance(f.exception(0), OSError) for f in futures)
+    batcher.shutdown()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from utils.sessionCadence import CadenceScheduler
+
+FRAME = np.full((160, 128), 100, dtype=np.uint8)
+CROP = (32, 32, 96, 128)
+PTS = np.tile(np.array([[50.0, 60.0]], dtype=np.float32), (10, 1))
+BBOX = (40, 40, 90, 120)
+NORMAL = [False, False, False]
+EYES_CLOSED = [False, True, False]
+
+
+def make(mode, **kwargs):
+    return CadenceScheduler(mode=mode, detect_every=3, max_stale_ms=60_000, **kwargs)
+
+
+def full_analysis(cadence, plan, status):
+    """YOLO까지 실행한 프레임의 결과 기록 (main.finish_analysis와 같은 호출)"""
+    cadence.finish(plan, status, CROP, PTS, 0.3, 0.2, detected=True)
+
+
+def test_modes():
+    assert not make("off").enabled
+    assert make("audit").enabled and make("audit").audit_only
+    assert make("on").enabled and not make("on").audit_only
+    assert not CadenceScheduler(mode="on", detect_every=1).enabled
+    with pytest.raises(ValueError):
+        make("sometimes")
+
+
+def test_audit_records_missed_alarm_of_reused_frame():
+    cadence = make("audit")
+    full_analysis(cadence, cadence.begin("car-1", FRAME), NORMAL)
+
+    # 장면이 그대로라 재사용 대상이지만 audit 모드는 전체 분석 결과와 비교만 함
+    plan = cadence.begin("car-1", FRAME)
+    assert plan.reuse == NORMAL
+    full_analysis(cadence, plan, EYES_CLOSED)
+
+    stats = cadence.stats()
+    assert stats["mode"] == "audit" and stats["reused"] == 1
+    assert stats["audited"] == 1 and stats["audit_agreement"] == 0.0 and stats["missed_alarms"] == 1
+    # on 모드처럼 재사용 프레임은 세션 상태를 바꾸지 않음 (다음 프레임도 같은 기준으로 판단)
+    assert cadence.begin("car-1", FRAME).reuse == NORMAL
+
+
+def test_audit_records_skipped_detection():
+    cadence = make("audit", reuse_diff=-1)  # 1단계 재사용 없이 2단계만 확인
+    full_analysis(cadence, cadence.begin("car-1", FRAME), NORMAL)
+
+    plan = cadence.begin("car-1", FRAME)
+    assert plan.reuse is None
+    assert not cadence.needs_detection(plan, PTS, BBOX, 0.3, 0.2)
+    full_analysis(cadence, plan, [False, False, True])  # 눈/입은 같고 고개 떨굼만 새로 계산
+
+    stats = cadence.stats()
+    assert stats["detect_skipped"] == 1 and stats["audited"] == 1
+    assert stats["audit_agreement"] == 1.0 and stats["missed_alarms"] == 0
+    # on 모드와 같이 YOLO를 생략한 프레임으로 기록 -> detect_every(3)번째 프레임마다 YOLO 실행
+    plan = cadence.begin("car-1", FRAME)
+    assert not cadence.needs_detection(plan, PTS, BBOX, 0.3, 0.2)
+    full_analysis(cadence, plan, NORMAL)
+    plan = cadence.begin("car-1", FRAME)
+    assert cadence.needs_detection(plan, PTS, BBOX, 0.3, 0.2)
+
+
+def test_audit_counts_match_on_mode():
+    frames = [FRAME, FRAME, FRAME + 20, FRAME + 20, FRAME + 20, FRAME]
+    on, audit = make("on"), make("audit")
+    for frame in frames:
+        plan = on.begin("car-1", frame)
+        if plan.reuse is None:
+            if on.needs_detection(plan, PTS, BBOX, 0.3, 0.2):
+                full_analysis(on, plan, NORMAL)
+            else:
+                on.finish(plan, NORMAL, CROP, PTS, 0.3, 0.2, detected=False)
+
+        plan = audit.begin("car-1", frame)
+        if plan.reuse is None:
+            audit.needs_detection(plan, PTS, BBOX, 0.3, 0.2)
+        full_analysis(audit, plan, NORMAL)
+
+    on_stats, audit_stats = on.stats(), audit.stats()
+    for key in ("reused", "detect_skipped", "detections", "forced"):
+        assert on_stats[key] == audit_stats[key], key
+    assert audit_stats["audited"] == audit_stats["reused"] + audit_stats["detect_skipped"] > 0
+    assert audit_stats["audit_agreement"] == 1.0 and on_stats["audited"] == 0
@@ -0,0 +1,80 @@
+import json
+
+from utils.frameIngest import RawUpload
+
+# ==============================
+# 다중 프레임 배치 요청 (/analyze_batch)
+# ==============================
+# 게이트웨이(여러 차량의 프레임을 모아 보내는 중계 서버)가 프레임 N장을 요청 1건으로 전송
+#   frames: 프레임 바이트를 순서대로 이어 붙인 파일 1개
+#   manifest: 프레임별 정보 JSON 리스트 (frames 안의 순서와 같음)
+#     공통: length (바이트 수, 필수), session_id, capture_ts_ms, type ("raw" 기본 / "image")
+#     raw: 센서 방향 흑백 평면 (/analyze_raw와 같은 의미)
+#          width, height 필수, format/row_stride/full_width/full_height 선택, roi는 [x, y, w, h]
+#     image: JPEG/PNG 등 정방향 이미지 (/analyze_jpeg와 같음)
+# 예: [{"length": 345600, "session_id": "car-1", "width": 720, "height": 480},
+#      {"length": 5120, "session_id": "car-2", "type": "image"}]
+
+BATCH_FRAME_TYPES = ("raw", "image")
+
+
+class BatchFrame:
+    """
+    배치 안 프레임 1장
+    payload: frames 버퍼의 memoryview 조각 (복사 없음)
+    upload: raw 프레임의 RawUpload 규격, image 프레임이면 None
+    """
+    def __init__(self, index, payload, session_id=None, capture_ts_ms=None, upload=None):
+        self.index = index
+        self.payload = payload
+        self.session_id = session_id
+        self.capture_ts_ms = capture_ts_ms
+        self.upload = upload
+
+
+def _optional_int(entry, name):
+    value = entry.get(name)
+    return None if value is None else int(value)
+
+
+def parse_batch(manifest, frames, max_frames) -> list:
+    """manifest JSON 문자열 + 이어 붙인 프레임 바이트 -> BatchFrame 리스트 (형식 오류는 ValueError)"""
+    try:
+        entries = json.loads(manifest)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid manifest: {e}")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("manifest must be a non-empty list")
+    if len(entries) > max_frames:
+        raise ValueError(f"too many frames: {len(entries)} > {max_frames}")
+
+    buf = memoryview(frames)
+    batch, offset = [], 0
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"frame {index}: entry must be an object")
+        try:
+            length = int(entry["length"])
+            kind = entry.get("type", "raw")
+            if kind not in BATCH_FRAME_TYPES:
+                raise ValueError(f"unknown type: {kind}")
+            upload = None
+            if kind == "raw":
+                upload = RawUpload(entry.get("format"), int(entry["width"]), int(entry["height"]),
+                                   _optional_int(entry, "row_stride"), _optional_int(entry, "full_width"),
+                                   _optional_int(entry, "full_height"), entry.get("roi"))
+            session_id = entry.get("session_id")
+            frame = BatchFrame(index, buf[offset:offset + length],
+                               None if session_id is None else str(session_id),
+                               _optional_int(entry, "capture_ts_ms"), upload)
+        except KeyError as e:
+            raise ValueError(f"frame {index}: missing {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"frame {index}: {e}")
+        if length <= 0 or offset + length > len(buf):
+            raise ValueError(f"frame {index}: length {length} does not fit in frames ({len(buf)} bytes)")
+        batch.append(frame)
+        offset += length
+    if offset != len(buf):
+        raise ValueError(f"frames has {len(buf) - offset} trailing bytes not described by manifest")
+    return batch
@@ -30,52 +30,154 @@ def calculate_iou(box1, box2):
     iou = intersection_area / union_area
     return iou
 
+# 클래스 그룹 NMS 설정: 0, 1(눈) 그룹과 2, 3(입) 그룹, 얼굴(4)은 버림
+NMS_CLASS_GROUPS = ((0, 1), (2, 3))
+# 닫힌 눈(1)과 열린 입(2)에 가중치를 부여
+NMS_CLASS_WEIGHTS = {1: 1.05, 2: 1.2}
+
+def pairwise_iou(boxes):
+    """
+    (N, 4) 박스들의 IoU 행렬 (N, N)
+    calculate_iou와 같은 dtype/연산 순서로 계산 (float32 입력이면 결과도 동일)
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    inter_w = np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :])
+    inter_h = np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :])
+    inter = inter_w * inter_h
+    area = (x2 - x1) * (y2 - y1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = inter / (area[:, None] + area[None, :] - inter)
+    # 겹치는 영역이 없으면 IoU 0
+    iou[(inter_w < 0) | (inter_h < 0)] = 0
+    return iou
+
+# 박스가 이 개수 이하면 IoU 행렬 대신 파이썬 루프로 NMS
+# (서빙 중 이미지당 박스는 보통 10개 안팎이라 numpy 호출 고정 비용이 계산 자체보다 큼)
+SMALL_NMS_MAX = 16
+
+def _greedy_nms_rows(rows, iou_threshold):
+    """greedy_nms의 파이썬 루프 버전 (rows: [x1, y1, x2, y2, ...] 리스트, 신뢰도 순)"""
+    keep = []
+    for i, (x1, y1, x2, y2) in enumerate(r[:4] for r in rows):
+        area = (x2 - x1) * (y2 - y1)
+        for k in keep:
+            kx1, ky1, kx2, ky2 = rows[k][:4]
+            inter_w = min(x2, kx2) - max(x1, kx1)
+            inter_h = min(y2, ky2) - max(y1, ky1)
+            if inter_w < 0 or inter_h < 0:
+                continue
+            inter = inter_w * inter_h
+            union = area + (kx2 - kx1) * (ky2 - ky1) - inter
+            # 넓이 0 박스끼리는 pairwise_iou와 같이 억제하지 않음 (nan > 임계값은 False)
+            if union > 0 and inter / union > iou_threshold:
+                break
+        else:
+            keep.append(i)
+    return keep
+
+def greedy_nms(boxes, iou_threshold):
+    """신뢰도 순으로 정렬된 박스에 대한 greedy NMS, 남길 위치 반환"""
+    if len(boxes) <= SMALL_NMS_MAX:
+        return _greedy_nms_rows(boxes.tolist(), iou_threshold)
+    suppress = pairwise_iou(boxes) > iou_threshold
+    removed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for i in range(len(boxes)):
+        if removed[i]: continue
+        keep.append(i)
+        removed |= suppress[i]
+    return keep
+
+def _filter_overlapping_rows(data, iou_threshold, weight_map):
+    """filter_overlapping_boxes의 작은 N 경로: 정렬/NMS를 파이썬 리스트로 처리 (결과와 순서는 배열 경로와 동일)"""
+    rows = data.tolist()
+    # 가중 신뢰도는 배열 경로와 같은 dtype으로 계산 (동점 판정이 같도록)
+    weights = np.array([weight_map.get(int(r[5]), 1.0) for r in rows], dtype=data.dtype)
+    weighted = (data[:, 4] * weights).tolist()
+    keep = []
+    for classes in NMS_CLASS_GROUPS:
+        # 가중 신뢰도 내림차순 (stable, 동점이면 원래 순서 유지)
+        idx = sorted((i for i, r in enumerate(rows) if r[5] in classes), key=weighted.__getitem__, reverse=True)
+        keep.extend(idx[k] for k in _greedy_nms_rows([rows[i] for i in idx], iou_threshold))
+    return data[np.asarray(keep, dtype=int)]
+
+def _filter_overlapping_arrays(batch, iou_threshold, weight_map):
+    """이미지 여러 장을 이어 붙여 정렬을 한 번에 수행하는 클래스 그룹 NMS (박스가 많은 이미지용)"""
+    counts = [len(d) for d in batch]
+    data = np.concatenate(batch, axis=0)
+    cls = data[:, 5]
+
+    # 그룹 번호 (-1: 버리는 클래스), 이미지 번호와 묶어 정렬 키로 사용
+    group = np.full(len(data), -1)
+    for g, classes in enumerate(NMS_CLASS_GROUPS):
+        group[np.isin(cls, classes)] = g
+    image = np.repeat(np.arange(len(batch)), counts)
+
+    # 가중 신뢰도 (conf 와 같은 dtype)
+    weights = np.ones(len(data), dtype=data.dtype)
+    for c, w in weight_map.items():
+        weights[cls == c] = w
+    weighted = data[:, 4] * weights
+
+    # 이미지 -> 그룹 -> 가중 신뢰도 내림차순 (stable, 동점이면 원래 순서 유지)
+    valid = np.flatnonzero(group >= 0)
+    order = valid[np.lexsort((-weighted[valid], group[valid], image[valid]))]
+    keys = image[order] * len(NMS_CLASS_GROUPS) + group[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+
+    kept = [[] for _ in batch]
+    for block in np.split(order, bounds):
+        if len(block) == 0: continue
+        kept[image[block[0]]].extend(block[greedy_nms(data[block, :4], iou_threshold)])
+
+    offsets = np.cumsum([0] + counts[:-1])
+    return [d[np.asarray(k, dtype=int) - off] for d, k, off in zip(batch, kept, offsets)]
+
+def filter_overlapping_batch(batch, iou_threshold=0.3, weight_map=NMS_CLASS_WEIGHTS):
+    """
+    이미지 여러 장의 검출 결과에 클래스 그룹 NMS (/analyze_batch 후처리)
+    batch: 이미지별 [x1, y1, x2, y2, conf, cls] 배열 리스트
+    반환: 이미지별 필터링 결과 (filter_overlapping_boxes와 동일, 눈 그룹 -> 입 그룹, 각 그룹은 가중 신뢰도 내림차순)
+    박스가 SMALL_NMS_MAX 이하인 이미지는 파이썬 경로, 나머지만 모아 배열 경로 1회로 처리
+    """
+    results = [None] * len(batch)
+    large = []
+    for i, data in enumerate(batch):
+        if len(data) > SMALL_NMS_MAX:
+            large.append(i)
+        else:
+            results[i] = _filter_overlapping_rows(data, iou_threshold, weight_map)
+    if large:
+        filtered = _filter_overlapping_arrays([batch[i] for i in large], iou_threshold, weight_map)
+        for i, data in zip(large, filtered):
+            results[i] = data
+    return results
+
+def filter_overlapping_boxes(data, iou_threshold=0.3, weight_map=NMS_CLASS_WEIGHTS):
+    """이미지 1장의 [x1, y1, x2, y2, conf, cls] 배열에 클래스 그룹 NMS 적용"""
+    if len(data) > SMALL_NMS_MAX:
+        return _filter_overlapping_arrays([data], iou_threshold, weight_map)[0]
+    # 박스가 적으면 numpy 호출 고정 비용이 더 커서 파이썬 리스트로 처리
+    return _filter_overlapping_rows(data, iou_threshold, weight_map)
+
 def filter_overlapping_parts(results, iou_threshold=0.3):
     boxes = results[0].boxes
     data = boxes.data.cpu().numpy() # [x1, y1, x2, y2, conf, cls]
-    
-    # 0, 1(눈) 그룹과 2, 3(입) 그룹 인덱스 정의
-    eye_indices = [i for i, x in enumerate(data) if x[5] in [0, 1]]
-    mouth_indices = [i for i, x in enumerate(data) if x[5] in [2, 3]]
-    
-    keep_indices = []
-
-    def get_best_idx(indices, weight_map={1: 1.05, 2: 1.2}):
-        """
-        weight_map: {class_id: weight_value}
-        닫힌 눈(1)과 열린 입(2)에 가중치를 부여
-        """
-        if not indices: return []
-        
-        # 가중치가 적용된 신뢰도를 기준으로 정렬
-        def get_weighted_conf(i):
-            cls = int(data[i][5])
-            conf = data[i][4]
-            return conf * weight_map.get(cls, 1.0)
+    return filter_overlapping_boxes(data, iou_threshold)
 
-        sorted_indices = sorted(indices, key=get_weighted_conf, reverse=True)
-        
-        valid = []
-        used = set()
-        
-        for i in sorted_indices:
-            if i in used: continue
-            valid.append(i)
-            for j in sorted_indices:
-                if i == j or j in used: continue
-                if calculate_iou(data[i][:4], data[j][:4]) > iou_threshold:
-                    used.add(j)
-        return valid
-
-    # 눈과 입 각각에 대해 최선의 박스만 추출
-    keep_indices.extend(get_best_idx(eye_indices))
-    keep_indices.extend(get_best_idx(mouth_indices))
-    
-    # 얼굴(class 4)은 그대로 유지
-    # face_indices = [i for i, x in enumerate(data) if x[5] == 4]
-    # keep_indices.extend(face_indices)
-    
-    return data[keep_indices]
+def unletterbox_boxes(filtered_data, letterbox):
+    """
+    레터박스 입력 기준 박스 좌표를 원래 크롭 좌표로 복원
+    letterbox: (scale, pad_x, pad_y) - FaceProcessor.process_frame 반환값
+    """
+    scale, pad_x, pad_y = letterbox
+    if scale == 1.0 and pad_x == 0 and pad_y == 0:
+        return filtered_data
+
+    restored = filtered_data.copy()
+    restored[:, [0, 2]] = (restored[:, [0, 2]] - pad_x) / scale
+    restored[:, [1, 3]] = (restored[:, [1, 3]] - pad_y) / scale
+    return restored
 
 def draw_filtered_results(frame, filtered_data, class_names, crop_coords):
     """
@@ -128,4 +230,26 @@ def isYawning(box, bbox_coords):
     if mouth_area / face_area >= 0.1:
         return True
     
-    return False
\ No newline at end of file
+    return False
+
+# YOLO 결과로 눈/입 상태 판정
+def judge_parts(detections, letterbox, bbox_coords, filtered=False):
+    """
+    YOLO 검출 결과 [x1, y1, x2, y2, conf, cls] -> (하품, 눈감김)
+    중복 박스 제거 후 레터박스 좌표를 크롭 좌표로 복원
+    filtered=True: 이미 filter_overlapping_batch로 중복 박스를 제거한 결과
+    닫힌 눈(1)이 2개 이상이면 눈감김, 열린 입(2)은 isYawning으로 하품 여부 검증
+    """
+    if not filtered:
+        detections = filter_overlapping_boxes(detections)
+    filtered_data = unletterbox_boxes(detections, letterbox)
+
+    isYawn = False
+    closed_eye_count = 0
+    for detected in filtered_data:
+        class_id = detected[5]
+        if class_id == 1:
+            closed_eye_count += 1
+        elif class_id == 2 and isYawning(detected, bbox_coords):
+            isYawn = True
+    return isYawn, closed_eye_count >= 2
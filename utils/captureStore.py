@@ -0,0 +1,246 @@
+import datetime
+import itertools
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+import cv2
+
+CAPTURE_POLICIES = ("all", "event", "sample", "none")
+
+
+class _SessionState:
+    def __init__(self, pre_event_frames):
+        self.ring = deque(maxlen=pre_event_frames)  # 이벤트 직전 정상 프레임 보관
+        self.post_remaining = 0                     # 이벤트 이후 추가로 저장할 프레임 수
+        self.normal_count = 0
+        self.last_seen = time.monotonic()
+
+
+class CaptureStore:
+    """
+    분석 프레임의 JPEG 저장을 요청 경로에서 분리한 백그라운드 저장소
+    - policy
+        all    : 모든 프레임 저장
+        event  : 이상 감지 프레임 + 직전 pre_event_frames장(세션별 링버퍼) + 직후 post_event_frames장
+                 (session_id가 없는 프레임은 서로 다른 클라이언트일 수 있으므로 이상 감지 프레임만)
+        sample : 이상 감지 프레임 + 정상 프레임은 sample_every장 중 1장
+        none   : 저장하지 않음
+    - 파일명: 밀리초 시각 + 세션 ID + 전역 일련번호 (동시 요청 간 충돌 없음)
+    - 디스크 사용량이 quota_bytes를 넘으면 가장 오래된 파일부터 삭제
+    - 저장/삭제 내역은 save_dir/captures.db(SQLite) 인덱스에 기록
+    """
+    def __init__(self, save_dir, policy="event", sample_every=30, pre_event_frames=10,
+                 post_event_frames=10, quota_mb=2048, queue_size=64, jpeg_quality=90,
+                 session_ttl=600.0):
+        if policy not in CAPTURE_POLICIES:
+            raise ValueError(f"unknown capture policy: {policy}")
+        self.save_dir = save_dir
+        self.policy = policy
+        self.sample_every = max(1, int(sample_every))
+        self.pre_event_frames = max(0, int(pre_event_frames))
+        self.post_event_frames = max(0, int(post_event_frames))
+        self.quota_bytes = int(quota_mb * 1024 * 1024)
+        self.jpeg_quality = jpeg_quality
+        self.session_ttl = session_ttl
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._anon_normal_count = 0  # session_id 없는 정상 프레임 수 (sample 정책용)
+
+        # 쓰기 스레드 전용 상태
+        self._files = OrderedDict()  # 파일명 -> 크기 (오래된 순)
+        self._total_bytes = 0
+        self._db = None
+
+        # 통계 값
+        self._saved = 0
+        self._evicted = 0
+        self._dropped = 0
+        self._errors = 0
+
+    # ==============================
+    # 수명 주기
+    # ==============================
+    def start(self):
+        os.makedirs(self.save_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name="capture-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=10.0):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ==============================
+    # 저장 요청 (요청 경로, 논블로킹)
+    # ==============================
+    def submit(self, session_id, image, status, rotate=None):
+        """
+        정책에 따라 저장 대상이면 쓰기 대기열에 넣고 저장될 경로를 반환
+        저장하지 않는 프레임은 None 반환 (이벤트 직전 링버퍼에 보관될 수는 있음)
+        image: 저장할 NumPy 배열(흑백 또는 BGR), 호출 이후 수정하지 않아야 함
+        rotate: 저장 직전에 적용할 cv2.rotate 코드 (회전 비용도 쓰기 스레드에서 부담)
+        """
+        if self.policy == "none":
+            return None
+
+        positive = any(status)
+        now = time.time()
+        with self._lock:
+            # session_id가 없으면 링버퍼/이벤트 이후 상태 없이 프레임 단위 정책만 적용
+            state = self._session(session_id) if session_id is not None else None
+            retained = []  # (image, rotate, status, ts, reason)
+
+            if self.policy == "all":
+                retained.append((image, rotate, status, now, "all"))
+            elif positive:
+                if state is not None:
+                    # 이벤트 직전 프레임을 먼저 내보내고 이벤트 프레임 저장
+                    retained.extend(state.ring)
+                    state.ring.clear()
+                    state.post_remaining = self.post_event_frames if self.policy == "event" else 0
+                retained.append((image, rotate, status, now, "event"))
+            elif state is not None and state.post_remaining > 0:
+                state.post_remaining -= 1
+                retained.append((image, rotate, status, now, "post_event"))
+            else:
+                if state is not None:
+                    state.normal_count += 1
+                    normal_count = state.normal_count
+                else:
+                    self._anon_normal_count += 1
+                    normal_count = self._anon_normal_count
+                if self.policy == "sample" and normal_count % self.sample_every == 0:
+                    retained.append((image, rotate, status, now, "sample"))
+                elif self.policy == "event" and self.pre_event_frames and state is not None:
+                    state.ring.append((image, rotate, status, now, "pre_event"))
+
+        path = None
+        for item in retained:
+            path = self._enqueue(session_id, *item)
+        # 마지막으로 넣은 항목이 현재 프레임
+        return path if retained and retained[-1][0] is image else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = len(self._sessions)
+        return {
+            "policy": self.policy,
+            "pending": self._queue.qsize(),
+            "saved": self._saved,
+            "evicted": self._evicted,
+            "dropped": self._dropped,
+            "errors": self._errors,
+            "files": len(self._files),
+            "disk_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "quota_mb": round(self.quota_bytes / (1024 * 1024), 2),
+            "sessions": sessions,
+        }
+
+    def _session(self, session_id):
+        now = time.monotonic()
+        # 오래 들어오지 않은 세션 상태 정리
+        if len(self._sessions) > 64:
+            for sid in [k for k, s in self._sessions.items() if now - s.last_seen > self.session_ttl]:
+                del self._sessions[sid]
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _SessionState(self.pre_event_frames)
+        state.last_seen = now
+        return state
+
+    def _enqueue(self, session_id, image, rotate, status, ts, reason):
+        stamp = datetime.datetime.fromtimestamp(ts).strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        sid = re.sub(r"[^0-9A-Za-z_-]", "", str(session_id or "anon"))[:16] or "anon"
+        filename = f"{stamp}_{sid}_{next(self._seq):06d}.jpg"
+        try:
+            self._queue.put_nowait((filename, image, rotate, session_id, ts, status, reason))
+        except queue.Full:
+            # 디스크가 밀리면 저장을 포기하고 요청 경로는 그대로 진행
+            self._dropped += 1
+            return None
+        return os.path.join(self.save_dir, filename)
+
+    # ==============================
+    # 인덱스 (SQLite)
+    # ==============================
+    def _open_index(self):
+        db = sqlite3.connect(os.path.join(self.save_dir, "captures.db"))
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS captures ("
+            "filename TEXT PRIMARY KEY, session_id TEXT, ts REAL, status TEXT, reason TEXT, bytes INTEGER)"
+        )
+        db.commit()
+
+        # 기존 파일로 용량 현황 복원 (인덱스에 없는 예전 파일도 포함, 오래된 순)
+        entries = []
+        for name in os.listdir(self.save_dir):
+            if name.endswith(".jpg"):
+                st = os.stat(os.path.join(self.save_dir, name))
+                entries.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total_bytes += size
+        return db
+
+    # ==============================
+    # 쓰기 루프
+    # ==============================
+    def _write_loop(self):
+        self._db = self._open_index()
+        self._evict()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                filename, image, rotate, session_id, ts, status, reason = job
+                path = os.path.join(self.save_dir, filename)
+                try:
+                    if rotate is not None:
+                        image = cv2.rotate(image, rotate)
+                    if not cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]):
+                        raise IOError(f"cv2.imwrite failed: {path}")
+                    size = os.path.getsize(path)
+                except Exception as e:
+                    self._errors += 1
+                    print(f"[capture] 저장 실패: {e}")
+                    continue
+
+                self._files[filename] = size
+                self._total_bytes += size
+                self._saved += 1
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO captures VALUES (?, ?, ?, ?, ?, ?)",
+                        (filename, session_id, ts, str([int(s) for s in status]), reason, size),
+                    )
+                self._evict()
+        finally:
+            self._db.close()
+
+    def _evict(self):
+        evicted = []
+        while self._total_bytes > self.quota_bytes and self._files:
+            name, size = self._files.popitem(last=False)
+            try:
+                os.remove(os.path.join(self.save_dir, name))
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            evicted.append((name,))
+        if evicted:
+            self._evicted += len(evicted)
+            with self._db:
+                self._db.executemany("DELETE FROM captures WHERE filename = ?", evicted)
@@ -0,0 +1,268 @@
+import ast
+import glob
+import os
+
+import cv2
+import numpy as np
+
+from utils.camPredictUtils import greedy_nms
+
+# ==============================
+# YOLO 검출기 백엔드
+# ==============================
+# onnxruntime : ONNX Runtime CPU 세션 직접 실행 (기본값, torch 불필요)
+# openvino    : OpenVINO 런타임 직접 실행 (.onnx 또는 IR 폴더/.xml)
+# ultralytics : 기존 YOLO.predict 경로 (torch를 불러오므로 비교/대체용)
+DETECTOR_BACKENDS = ("onnxruntime", "openvino", "ultralytics")
+
+LETTERBOX_PAD = 114  # ultralytics LetterBox 패딩 값
+MAX_WH = 7680        # 클래스별 NMS용 좌표 오프셋 (ultralytics와 동일)
+# NMS에 넣을 최대 후보 수 (신뢰도 상위만, ultralytics max_nms와 같은 역할)
+# greedy_nms는 N x N IoU 행렬을 만들므로 ultralytics 기본값(30000)보다 작게 둠 (1000개 약 20ms, 2000개 약 110ms)
+MAX_NMS = 1000
+
+
+def letterbox_gray(crop, imgsz, canvas=None):
+    """
+    흑백 크롭을 비율 유지 리사이즈 + 114 패딩으로 imgsz(H, W)에 배치 (ultralytics LetterBox와 같은 규칙)
+    canvas: 재사용할 (H, W) uint8 버퍼, 크기가 이미 같으면 크롭을 그대로 반환
+    반환: (레터박스 이미지, (scale, pad_x, pad_y))
+    """
+    if crop.ndim == 3:
+        crop = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    h0, w0 = crop.shape
+    H, W = imgsz
+    if (h0, w0) == (H, W):
+        return crop, (1.0, 0, 0)
+
+    r = min(H / h0, W / w0)
+    uw, uh = int(round(w0 * r)), int(round(h0 * r))
+    dw, dh = (W - uw) / 2, (H - uh) / 2
+    left, top = int(round(dw - 0.1)), int(round(dh - 0.1))
+    if canvas is None:
+        canvas = np.empty((H, W), dtype=np.uint8)
+    canvas.fill(LETTERBOX_PAD)
+    cv2.resize(crop, (uw, uh), dst=canvas[top:top + uh, left:left + uw], interpolation=cv2.INTER_LINEAR)
+    return canvas, (r, left, top)
+
+
+class OnnxDetector:
+    """
+    ultralytics 없이 export된 YOLO 모델을 직접 실행하는 경량 검출기
+    - 입력/출력 버퍼를 미리 할당해 두고 매 호출 재사용
+      (ONNX Runtime IOBinding, OpenVINO 공유 메모리 텐서)
+    - 흑백 1채널 레터박스를 직접 수행 (ultralytics LetterBox와 같은 규칙)
+    - end2end 출력 (B, K, 6)과 NMS 이전 출력 (B, 4 + nc, A) 모두 처리
+    - 반환: 크롭별 [x1, y1, x2, y2, conf, cls] float32 (N, 6) 배열, 좌표는 입력 크롭 기준
+    워커 1개(또는 배치 스레드)가 독점해서 사용 (스레드 간 공유 금지)
+    """
+    def __init__(self, model_path, imgsz=320, conf=0.25, iou=0.7, classes=(0, 1, 2, 3), max_det=300,
+                 max_nms=MAX_NMS, backend="onnxruntime", max_batch=1, device="CPU", num_threads=0):
+        if backend not in ("onnxruntime", "openvino"):
+            raise ValueError(f"unknown onnx backend: {backend}")
+        self.model_path = model_path
+        self.backend = backend
+        self.conf = conf
+        self.iou = iou
+        self.classes = np.asarray(classes) if classes is not None else None
+        self.max_det = max_det
+        self.max_nms = max_nms
+        self.names = {}
+
+        if backend == "onnxruntime":
+            shape, out_shape = self._load_onnxruntime(model_path, num_threads)
+        else:
+            shape, out_shape = self._load_openvino(model_path, device, num_threads)
+
+        # 입력 크기가 고정된 모델이면 모델 크기를 따름
+        _, self.channels, h, w = shape
+        self.imgsz = (h if h > 0 else imgsz, w if w > 0 else imgsz)
+        # 배치 차원이 고정(1)인 모델은 크롭을 한 장씩 실행
+        self.max_batch = max(1, int(max_batch)) if shape[0] <= 0 else shape[0]
+
+        # 미리 할당한 입력 버퍼 (배치, 채널, 높이, 너비)와 레터박스 작업 버퍼
+        self._input = np.zeros((self.max_batch, self.channels) + self.imgsz, dtype=np.float32)
+        self._canvas = np.full(self.imgsz, LETTERBOX_PAD, dtype=np.uint8)
+        # 출력 크기가 배치 외에 고정이면 출력 버퍼도 미리 할당
+        self._output = None
+        if all(d > 0 for d in out_shape[1:]):
+            self._output = np.zeros((self.max_batch,) + tuple(out_shape[1:]), dtype=np.float32)
+        self._bound = {}  # 배치 크기별 바인딩 캐시
+
+    # ==============================
+    # 런타임 로드
+    # ==============================
+    def _load_onnxruntime(self, model_path, num_threads):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self._ort = ort
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        inp = self._session.get_inputs()[0]
+        out = self._session.get_outputs()[0]
+        self._input_name, self._output_name = inp.name, out.name
+
+        # ultralytics export 메타데이터의 클래스 이름
+        names = self._session.get_modelmeta().custom_metadata_map.get("names")
+        if names:
+            self.names = ast.literal_eval(names)
+        return _dims(inp.shape), _dims(out.shape)
+
+    def _load_openvino(self, model_path, device, num_threads):
+        import openvino as ov
+
+        # IR 폴더(best_openvino_model/)를 넘기면 안의 .xml 사용
+        if os.path.isdir(model_path):
+            model_path = glob.glob(os.path.join(model_path, "*.xml"))[0]
+        core = ov.Core()
+        config = {"INFERENCE_NUM_THREADS": num_threads} if num_threads else {}
+        self._compiled = core.compile_model(core.read_model(model_path), device, config)
+        self._request = self._compiled.create_infer_request()
+
+        def dims(port):
+            return [d.get_length() if d.is_static else -1 for d in port.get_partial_shape()]
+        return dims(self._compiled.input(0)), dims(self._compiled.output(0))
+
+    # ==============================
+    # 추론
+    # ==============================
+    def predict(self, crop):
+        return self.predict_batch([crop])[0]
+
+    def predict_batch(self, crops):
+        """흑백 크롭 리스트 -> 크롭별 (N, 6) 검출 결과 리스트"""
+        results = []
+        for start in range(0, len(crops), self.max_batch):
+            chunk = crops[start:start + self.max_batch]
+            letterboxes = [self._fill_input(i, crop) for i, crop in enumerate(chunk)]
+            output = self._run(len(chunk))
+            for i, (crop, lb) in enumerate(zip(chunk, letterboxes)):
+                results.append(self._postprocess(output[i], crop.shape[:2], lb))
+        return results
+
+    def _fill_input(self, i, crop):
+        """크롭을 레터박스해 입력 버퍼 i번째 칸에 0~1 float32로 기록"""
+        canvas, lb = letterbox_gray(crop, self.imgsz, self._canvas)
+        # 채널이 3개인 모델이면 같은 흑백 값을 모든 채널에 기록
+        for c in range(self.channels):
+            np.divide(canvas, np.float32(255), out=self._input[i, c])
+        return lb
+
+    def _run(self, n):
+        if self.backend == "openvino":
+            tensor = self._bound.get(n)
+            if tensor is None:
+                import openvino as ov
+                tensor = self._bound[n] = ov.Tensor(self._input[:n], shared_memory=True)
+            self._request.set_input_tensor(tensor)
+            self._request.infer()
+            return self._request.get_output_tensor(0).data
+
+        binding = self._bound.get(n)
+        if binding is None:
+            binding = self._bound[n] = self._session.io_binding()
+            binding.bind_cpu_input(self._input_name, self._input[:n])
+            if self._output is not None:
+                out = self._ort.OrtValue.ortvalue_from_numpy(self._output[:n])
+                binding.bind_ortvalue_output(self._output_name, out)
+            else:
+                binding.bind_output(self._output_name, "cpu")
+        self._session.run_with_iobinding(binding)
+        if self._output is not None:
+            return self._output[:n]
+        return binding.copy_outputs_to_cpu()[0]
+
+    # ==============================
+    # 후처리
+    # ==============================
+    def _postprocess(self, pred, shape, letterbox):
+        if pred.shape[-1] == 6:
+            # end2end 모델: 이미 NMS가 끝난 [x1, y1, x2, y2, conf, cls]
+            det = pred[pred[:, 4] > self.conf]
+            if self.classes is not None:
+                det = det[np.isin(det[:, 5], self.classes)]
+            det = det[:self.max_det]
+        else:
+            det = self._nms(pred)
+
+        det = np.array(det, dtype=np.float32)  # 출력 버퍼와 분리
+        scale, pad_x, pad_y = letterbox
+        if scale != 1.0 or pad_x or pad_y:
+            det[:, [0, 2]] -= pad_x
+            det[:, [1, 3]] -= pad_y
+            det[:, :4] /= scale
+        h0, w0 = shape
+        det[:, [0, 2]] = det[:, [0, 2]].clip(0, w0)
+        det[:, [1, 3]] = det[:, [1, 3]].clip(0, h0)
+        return det
+
+    def _nms(self, pred):
+        """NMS 이전 출력 (4 + nc, A) -> 클래스별 NMS 결과 (N, 6)"""
+        pred = pred.T
+        scores = pred[:, 4:]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(cls)), cls]
+        mask = conf > self.conf
+        if self.classes is not None:
+            mask &= np.isin(cls, self.classes)
+        xywh, conf, cls = pred[mask, :4], conf[mask], cls[mask].astype(np.float32)
+
+        # 신뢰도 내림차순 상위 max_nms개만 NMS (후보가 많아도 비용 상한 유지)
+        order = np.argsort(-conf, kind="stable")[:self.max_nms]
+        xywh, conf, cls = xywh[order], conf[order], cls[order]
+        boxes = np.empty_like(xywh)
+        boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+        boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+        # 클래스마다 좌표를 멀리 떨어뜨려 한 번의 NMS로 클래스별 NMS 수행
+        keep = greedy_nms(boxes + cls[:, None] * MAX_WH, self.iou)[:self.max_det]
+        return np.concatenate([boxes, conf[:, None], cls[:, None]], axis=1)[keep]
+
+
+class UltralyticsDetector:
+    """
+    기존 ultralytics YOLO.predict 경로 (torch 필요, OnnxDetector 비교/대체용)
+    반환 형식은 OnnxDetector와 동일한 크롭별 (N, 6) 배열
+    """
+    def __init__(self, model_path, imgsz=320, conf=0.25, classes=(0, 1, 2, 3), device=None):
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+        self.imgsz = imgsz
+        self.conf = conf
+        self.classes = list(classes) if classes is not None else None
+        self.device = device
+
+    def predict(self, crop):
+        return self.predict_batch([crop])[0]
+
+    def predict_batch(self, crops):
+        results = self.model.predict(
+            source=crops,            # 크롭된 흑백 얼굴 이미지 리스트
+            verbose=False,           # 로그 출력 억제
+            save=False,              # 이미지 저장 비활성
+            imgsz=self.imgsz,        # 입력 사이즈 최적화
+            conf=self.conf,          # 탐지 임계값
+            classes=self.classes,    # 분석 대상 클래스 정의
+            device=self.device       # 하드웨어 가속 사용
+            )
+        return [r.boxes.data.cpu().numpy() for r in results]
+
+
+def create_detector(backend, model_path, imgsz=320, conf=0.25, classes=(0, 1, 2, 3),
+                    max_batch=1, device=None, num_threads=0):
+    """DETECTOR_BACKEND 설정값에 맞는 검출기 생성"""
+    if backend == "ultralytics":
+        return UltralyticsDetector(model_path, imgsz=imgsz, conf=conf, classes=classes, device=device)
+    if backend in ("onnxruntime", "openvino"):
+        return OnnxDetector(model_path, imgsz=imgsz, conf=conf, classes=classes, backend=backend,
+                            max_batch=max_batch, device=device or "CPU", num_threads=num_threads)
+    raise ValueError(f"unknown detector backend: {backend} (choose from {DETECTOR_BACKENDS})")
+
+
+def _dims(shape):
+    # ONNX 동적 차원(문자열/None)은 -1로 표시
+    return [d if isinstance(d, int) and d > 0 else -1 for d in shape]
@@ -0,0 +1,206 @@
+import collections
+import threading
+import time
+
+# ==============================
+# 세션별 공정 스케줄링 (추론 대기열)
+# ==============================
+# 단일 FIFO에서는 빠르게 보내는 세션 하나가 대기열을 채워 다른 차량 프레임이 밀림
+# 세션(key)마다 대기열을 따로 두고 가중 공정 큐잉(WFQ)으로 꺼냄
+#   - 시작 태그 = max(가상 시각, 같은 세션 직전 작업의 종료 태그), 종료 태그 = 시작 태그 + 1/weight
+#   - 종료 태그가 가장 작은 작업 먼저 -> 세션마다 번갈아 처리, 많이 보낸 세션은 태그가 앞서 나가 뒤로 밀림
+#     weight가 큰 세션은 종료 태그가 짧아 같은 시점에 도착한 다른 세션 프레임보다 먼저, 더 자주 처리
+#   - 세션별 동시 처리 수를 max_inflight로 제한 (워커를 한 세션이 독점하지 않음, 프레임 순서 유지)
+#   - 세션별 대기 작업 수를 max_queued로 제한 (한 세션이 대기열 전체를 채우지 못함)
+#   - 위험 상태 세션은 weight를 키워 먼저 처리 (main.py에서 submit 시 지정)
+# key가 없는 작업(세션 없는 /analyze_jpeg, 배치 검출 등)은 작업마다 별도 세션으로 취급
+#   서로 무관한 요청이 공용 세션 하나의 max_inflight/max_queued 한도를 나눠 쓰지 않도록 (전체 한도 maxsize만 적용)
+#   태그는 새 세션의 첫 작업과 같음 (세션이 있는 작업과 번갈아 처리)
+# fair=False면 도착 순서(FIFO) + 동시 처리 제한 없음 (비교용)
+
+ANONYMOUS_KEY = "__anonymous__"
+
+
+class _Entry:
+    __slots__ = ("item", "key", "start", "finish", "seq")
+
+    def __init__(self, item, key, start, finish, seq):
+        self.item = item
+        self.key = key
+        self.start = start
+        self.finish = finish
+        self.seq = seq
+
+
+class FairQueue:
+    """
+    queue.Queue 대신 쓰는 세션별 공정 대기열 (put_nowait / get / qsize)
+    get으로 꺼낸 작업은 처리가 끝나면 반드시 done(key) 호출 (동시 처리 수 반환)
+    """
+    def __init__(self, maxsize, max_inflight=1, max_queued=None, fair=True):
+        self.maxsize = max(1, int(maxsize))
+        self.max_inflight = int(max_inflight) if fair else 0  # 0이면 제한 없음
+        if max_queued is None:
+            max_queued = max(1, self.maxsize // 2)
+        self.max_queued = int(max_queued) if fair else self.maxsize
+        self.fair = fair
+
+        self._queues = {}     # key -> deque[_Entry]
+        self._last_tag = {}   # key -> 마지막으로 넣은 작업의 종료 태그
+        self._inflight = {}   # key -> 처리 중 작업 수
+        self._vtime = 0.0     # 가상 시각 (마지막으로 꺼낸 작업의 시작 태그)
+        self._size = 0
+        self._seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put_nowait(self, item, key=None, weight=1.0):
+        """대기열 전체 또는 세션 몫이 가득 차면 False 반환"""
+        with self._cond:
+            if key is None:
+                # 작업마다 새 키 (다음 작업이 이어받을 태그가 없으므로 _last_tag에도 남기지 않음)
+                if self._size >= self.maxsize:
+                    return False
+                key = (ANONYMOUS_KEY, self._seq + 1)
+                start = self._vtime
+                finish = start + 1.0 / max(weight, 1e-6)
+            else:
+                if self._size >= self.maxsize or len(self._queues.get(key, ())) >= self.max_queued:
+                    return False
+                start = max(self._vtime, self._last_tag.get(key, 0.0))
+                finish = self._last_tag[key] = start + 1.0 / max(weight, 1e-6)
+            self._seq += 1
+            self._queues.setdefault(key, collections.deque()).append(_Entry(item, key, start, finish, self._seq))
+            self._size += 1
+            self._cond.notify()
+            return True
+
+    def get(self):
+        """(key, item) 반환, close() 후 남은 작업이 없으면 None"""
+        with self._cond:
+            while True:
+                entry = self._pick()
+                if entry is not None:
+                    break
+                if self._closed and self._size == 0:
+                    return None
+                self._cond.wait()
+            queue = self._queues[entry.key]
+            queue.popleft()
+            if not queue:
+                del self._queues[entry.key]
+            self._size -= 1
+            self._vtime = max(self._vtime, entry.start)
+            self._inflight[entry.key] = self._inflight.get(entry.key, 0) + 1
+            self._forget_idle()
+            return entry.key, entry.item
+
+    def done(self, key):
+        with self._cond:
+            count = self._inflight.get(key, 0) - 1
+            if count > 0:
+                self._inflight[key] = count
+            else:
+                self._inflight.pop(key, None)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def _pick(self):
+        """동시 처리 한도에 걸리지 않은 세션의 맨 앞 작업 중 태그(FIFO면 도착 순서)가 가장 작은 것"""
+        best = None
+        for key, queue in self._queues.items():
+            if self.max_inflight and self._inflight.get(key, 0) >= self.max_inflight:
+                continue
+            head = queue[0]
+            order = (head.finish, head.seq) if self.fair else (head.seq,)
+            if best is None or order < best[0]:
+                best = (order, head)
+        return best[1] if best else None
+
+    def _forget_idle(self):
+        # 대기 작업이 없고 태그가 가상 시각보다 뒤처진 세션은 기록이 의미 없으므로 정리
+        for key in [k for k, tag in self._last_tag.items() if tag <= self._vtime and k not in self._queues]:
+            del self._last_tag[key]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "policy": "fair" if self.fair else "fifo",
+                "max_inflight": self.max_inflight,
+                "max_queued": self.max_queued,
+                "waiting_sessions": len(self._queues),
+                "running_sessions": len(self._inflight),
+            }
+
+
+class SessionLatencies:
+    """
+    세션별 최근 window건의 대기열 진입 -> 처리 완료 시간(ms)과 처리/버림 횟수
+    특정 세션이 굶고 있는지 확인하기 위한 용도 (idle_timeout초 이상 안 보인 세션은 정리)
+    """
+    def __init__(self, window=200, idle_timeout=60.0):
+        self.window = window
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key, now):
+        state = self._sessions.get(key)
+        if state is None:
+            state = self._sessions[key] = {"latencies": collections.deque(maxlen=self.window),
+                                           "completed": 0, "dropped": 0, "last_seen": now}
+        state["last_seen"] = now
+        return state
+
+    def record(self, key, latency_s):
+        key = ANONYMOUS_KEY if key is None else key
+        with self._lock:
+            state = self._get(key, time.monotonic())
+            state["latencies"].append(latency_s * 1000)
+            state["completed"] += 1
+
+    def record_drop(self, key):
+        key = ANONYMOUS_KEY if key is None else key
+        with self._lock:
+            self._get(key, time.monotonic())["dropped"] += 1
+
+    def stats(self, limit=20) -> dict:
+        """p95가 가장 나쁜 limit개 세션 + 세션 간 p95 최댓값/중앙값"""
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, s in self._sessions.items() if now - s["last_seen"] > self.idle_timeout]:
+                del self._sessions[key]
+            rows = {key: (sorted(s["latencies"]), s["completed"], s["dropped"])
+                    for key, s in self._sessions.items()}
+        sessions = {}
+        for key, (values, completed, dropped) in rows.items():
+            sessions[key] = {
+                "completed": completed,
+                "dropped": dropped,
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "p99_ms": _percentile(values, 99),
+            }
+        p95 = sorted(s["p95_ms"] for s in sessions.values() if s["p95_ms"] is not None)
+        worst = sorted(sessions.items(), key=lambda kv: kv[1]["p95_ms"] or 0.0, reverse=True)[:limit]
+        return {
+            "sessions": len(sessions),
+            "p95_max_ms": p95[-1] if p95 else None,
+            "p95_median_ms": _percentile(p95, 50),
+            "worst": dict(worst),
+        }
+
+
+def _percentile(values, q):
+    """정렬된 리스트의 최근접 순위 분위수"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return round(values[index], 2)
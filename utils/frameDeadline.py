@@ -0,0 +1,62 @@
+import threading
+import time
+
+# ==============================
+# 프레임별 처리 마감 시각
+# ==============================
+# 클라이언트가 보낸 촬영 시각(capture_ts_ms, 클라이언트 시계 기준 epoch ms)으로
+# "이 시각까지 분석을 시작하지 못하면 버림" 마감 시각(서버 perf_counter 기준)을 계산
+# 클라이언트와 서버 시계 차이를 모르므로 세션별로 (수신 시각 - 촬영 시각)의 최솟값을 지연 없는 기준으로 보고,
+# 그보다 늦게 도착한 만큼(네트워크 지연, 클라이언트 대기)을 이미 소비한 시간으로 뺌
+# 시계가 서서히 어긋나도 따라가도록 기준값은 초당 DRIFT_MS_PER_SEC만큼 늘어날 수 있음
+
+DRIFT_MS_PER_SEC = 1.0
+
+
+class _ClockState:
+    def __init__(self, offset_ms, now):
+        self.min_offset_ms = offset_ms
+        self.updated_at = now
+        self.last_used = now
+
+
+class DeadlineClock:
+    def __init__(self, deadline_ms, idle_timeout=60.0):
+        self.deadline_ms = deadline_ms
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.deadline_ms > 0
+
+    def _late_ms(self, session_id, offset_ms, now):
+        """세션 기준 지연(최소 offset) 대비 이번 프레임이 늦게 도착한 시간(ms)"""
+        with self._lock:
+            if now - self._last_sweep > self.idle_timeout / 4:
+                self._last_sweep = now
+                for sid, s in list(self._sessions.items()):
+                    if now - s.last_used > self.idle_timeout:
+                        del self._sessions[sid]
+            state = self._sessions.get(session_id)
+            if state is None:
+                self._sessions[session_id] = _ClockState(offset_ms, now)
+                return 0.0
+            base = state.min_offset_ms + (now - state.updated_at) * DRIFT_MS_PER_SEC
+            if offset_ms <= base:
+                state.min_offset_ms, state.updated_at = offset_ms, now
+                base = offset_ms
+            state.last_used = now
+            return offset_ms - base
+
+    def deadline(self, session_id=None, capture_ts_ms=None):
+        """InferencePool.submit에 넘길 마감 시각 (비활성화면 None)"""
+        if not self.enabled:
+            return None
+        budget_ms = self.deadline_ms
+        if capture_ts_ms and session_id is not None:
+            offset_ms = time.time() * 1000 - capture_ts_ms
+            budget_ms -= self._late_ms(session_id, offset_ms, time.monotonic())
+        return time.perf_counter() + budget_ms / 1000
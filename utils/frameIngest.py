@@ -0,0 +1,277 @@
+import numpy as np
+import cv2
+
+# ==============================
+# 프레임 수신(ingestion) 유틸리티
+# ==============================
+# 업로드 버퍼 -> 분석용 프레임(흑백, 정방향, 좌우 반전, 가로 640px) 변환을
+# PIL 없이 OpenCV warpAffine 한 번으로 처리
+#
+# 안드로이드 전면 카메라 Y 평면 기준 기존 처리 순서:
+#   시계 방향 90도 회전 -> 가로 640px 리사이즈 -> 좌우 반전
+# 시계 방향 90도 회전 + 좌우 반전 = 전치(transpose)이므로
+# "전치 + 스케일"을 하나의 아핀 행렬로 표현해 출력 버퍼에 바로 기록
+
+ANALYSIS_WIDTH = 640
+INGEST_INTERPOLATION = cv2.INTER_LINEAR
+
+# /analyze_raw 업로드 형식 (센서 방향 흑백 평면)
+#   nv21, y8: Y 평면 그대로 (uv_plane은 사용하지 않음)
+#   zstd: zstd 압축 Y 평면 (zstandard 패키지 필요)
+#   jpeg, webp: 흑백 압축 이미지
+RAW_FORMATS = ("nv21", "y8", "zstd", "jpeg", "webp")
+
+
+def check_plane(width, height, row_stride, size):
+    """
+    전체 해상도 Y 평면 업로드 규격 검증 (잘못된 값은 ValueError -> 400)
+    마지막 행은 stride 패딩 없이 width 바이트만 와도 허용
+    """
+    if width <= 0 or height <= 0 or row_stride < width:
+        raise ValueError("invalid plane geometry")
+    required = row_stride * (height - 1) + width
+    if size < required:
+        raise ValueError(f"y_plane is too short: {size} bytes < {required} ({width}x{height}, stride {row_stride})")
+
+
+def y_plane_view(y_bytes, width, height, row_stride):
+    """
+    업로드된 Y 평면 버퍼를 복사 없이 (height, width) 배열로 보는 strided view
+    마지막 행의 stride 패딩이 잘려서 온 경우도 복사 없이 처리
+    반환: (view, copied) - 버퍼가 더 짧아 0으로 채운 사본을 만든 경우 copied=True
+    """
+    buf = np.frombuffer(y_bytes, dtype=np.uint8)
+    required = row_stride * (height - 1) + width
+
+    copied = False
+    if buf.size < required:
+        padded = np.zeros(row_stride * height, dtype=np.uint8)
+        padded[:buf.size] = buf
+        buf = padded
+        copied = True
+
+    view = np.lib.stride_tricks.as_strided(
+        buf, shape=(height, width), strides=(row_stride, 1), writeable=False
+    )
+    return view, copied
+
+
+class RawUpload:
+    """
+    /analyze_raw 업로드 1장의 규격 (좌표는 모두 회전 전 센서 방향 기준)
+    width/height/row_stride: 업로드된 평면 크기
+    full_width/full_height: 센서 전체 프레임 크기 (클라이언트가 축소해 보냈으면 원래 크기)
+    roi: 업로드 평면이 덮는 센서 영역 (x, y, w, h), None이면 전체 프레임
+    -> 축소 업로드: 평면 크기 < roi 크기, 얼굴 영역만 업로드: roi가 전체 프레임의 일부
+    """
+    def __init__(self, fmt, width, height, row_stride=None, full_width=None, full_height=None, roi=None):
+        fmt = (fmt or "nv21").lower()
+        if fmt not in RAW_FORMATS:
+            raise ValueError(f"unsupported format: {fmt} (expected one of {', '.join(RAW_FORMATS)})")
+        self.format = fmt
+        self.width = int(width)
+        self.height = int(height)
+        self.row_stride = int(row_stride or width)
+        self.full_width = int(full_width or width)
+        self.full_height = int(full_height or height)
+        self.roi = tuple(int(v) for v in roi) if roi is not None else (0, 0, self.full_width, self.full_height)
+
+        x, y, w, h = self.roi
+        if self.width <= 0 or self.height <= 0 or self.row_stride < self.width:
+            raise ValueError("invalid plane geometry")
+        if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > self.full_width or y + h > self.full_height:
+            raise ValueError("roi is outside the full frame")
+        if self.width > w or self.height > h:
+            raise ValueError("plane is larger than its roi")
+
+    @property
+    def reduced(self) -> bool:
+        """전체 해상도 Y 평면 그대로가 아닌 업로드 (축소, ROI, 압축)"""
+        return (self.format not in ("nv21", "y8") or self.roi != (0, 0, self.full_width, self.full_height)
+                or (self.width, self.height) != (self.full_width, self.full_height))
+
+    def decode(self, payload):
+        """업로드 바이트 -> ((height, width) 흑백 평면, 복사/0 채움 여부)"""
+        if self.format in ("nv21", "y8"):
+            return y_plane_view(payload, self.width, self.height, self.row_stride)
+        if self.format == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("zstd payload is not supported on this server (zstandard not installed)")
+            try:
+                raw = zstandard.ZstdDecompressor().decompress(
+                    payload, max_output_size=self.row_stride * self.height)
+            except zstandard.ZstdError as e:
+                raise ValueError(f"cannot decompress zstd payload: {e}")
+            view, _ = y_plane_view(raw, self.width, self.height, self.row_stride)
+            return view, False
+        plane = decode_gray(payload)
+        if plane.shape != (self.height, self.width):
+            raise ValueError(f"decoded size {plane.shape[1]}x{plane.shape[0]} != {self.width}x{self.height}")
+        return plane, False
+
+    def to_dict(self) -> dict:
+        return {
+            "format": self.format,
+            "width": self.width,
+            "height": self.height,
+            "full_width": self.full_width,
+            "full_height": self.full_height,
+            "roi": list(self.roi),
+        }
+
+
+class FrameIngestor:
+    """
+    추론 워커 1개 전용 프레임 변환기
+    출력 버퍼를 미리 할당해 두고 프레임 크기가 바뀔 때만 다시 할당
+    반환된 분석 프레임은 다음 ingest 호출 시 덮어써지므로 워커 안에서만 사용
+    """
+    def __init__(self, target_width=ANALYSIS_WIDTH, interpolation=INGEST_INTERPOLATION):
+        self.target_width = target_width
+        self.interpolation = interpolation
+        self._out = None
+        self._transposed = None  # 축소/ROI 업로드 평면 전치 버퍼
+
+        # 프레임당 할당/복사 측정용 카운터
+        self.frames = 0
+        self.allocations = 0
+        self.copies = 0
+        self.bytes_copied = 0
+        # 업로드 크기 (축소/ROI/압축 업로드 효과 확인용)
+        self.bytes_received = 0
+        self.reduced_frames = 0
+
+    def _output(self, out_h, out_w):
+        if self._out is None or self._out.shape != (out_h, out_w):
+            self._out = np.empty((out_h, out_w), dtype=np.uint8)
+            self.allocations += 1
+        return self._out
+
+    def ingest_nv21(self, y_bytes, width, height, row_stride):
+        """
+        NV21/YUV420 Y 평면 -> 분석 프레임
+        반환: (분석 프레임, 원본 Y 평면 view)
+        원본 view는 업로드 버퍼를 참조하므로 저장용으로 그대로 넘겨도 됨
+        """
+        view, copied = y_plane_view(y_bytes, width, height, row_stride)
+        if copied:
+            self.copies += 1
+            self.bytes_copied += row_stride * height
+        self.bytes_received += len(y_bytes)
+        return self._ingest_sensor(view, width, height), view
+
+    def ingest_upload(self, payload, upload):
+        """
+        RawUpload 규격의 업로드 -> 전체 프레임 기준 분석 프레임
+        축소/ROI 업로드도 분석 프레임은 전체 프레임 크기로 만들고, 평면을 ROI 위치에 배치 (나머지는 0)
+        -> 랜드마크/얼굴 좌표가 항상 전체 프레임 기준이라 이후 단계와 세션 상태가 그대로 동작
+        반환: (분석 프레임, 업로드 평면)
+        """
+        plane, copied = upload.decode(payload)
+        if copied:
+            self.copies += 1
+            self.bytes_copied += upload.row_stride * upload.height
+        self.bytes_received += len(payload)
+        self.reduced_frames += upload.reduced
+        # 축소/ROI 없이 전체 프레임을 그대로 보낸 업로드는 ingest_nv21과 같은 워프 경로 (결과 동일)
+        full = upload.roi == (0, 0, upload.full_width, upload.full_height) and plane.shape == (
+            upload.full_height, upload.full_width)
+        return self._ingest_sensor(plane, upload.full_width, upload.full_height, None if full else upload.roi), plane
+
+    def _ingest_sensor(self, plane, full_width, full_height, roi=None):
+        """
+        센서 방향 평면 -> 분석 프레임
+        roi가 None이면 전체 해상도 평면: 전치 + 스케일 워프 1회
+        roi가 있으면 (축소/ROI 업로드) 작은 평면을 전치한 뒤 분석 프레임의 ROI 위치에 바로 리사이즈
+        (전체 출력에 워프하는 것보다 빠르고, ROI 밖은 0)
+        """
+        # 회전 후 가로 = 원본 세로(height), 회전 후 세로 = 원본 가로(width)
+        out_w = self.target_width
+        out_h = int(out_w * (full_width / full_height))
+        sx = out_w / full_height
+        sy = out_h / full_width
+        out = self._output(out_h, out_w)
+        self.frames += 1
+
+        if roi is None:
+            # 출력 좌표 (u, v) -> 원본 좌표 (x, y): x = v / sy, y = u / sx (픽셀 중심 기준)
+            M = np.array([
+                [0.0, 1.0 / sy, 0.5 / sy - 0.5],
+                [1.0 / sx, 0.0, 0.5 / sx - 0.5],
+            ])
+            cv2.warpAffine(plane, M, (out_w, out_h), dst=out,
+                           flags=self.interpolation | cv2.WARP_INVERSE_MAP)
+            return out
+
+        # ROI가 분석 프레임에 놓이는 영역 (u: 센서 y축, v: 센서 x축)
+        rx, ry, rw, rh = roi
+        u0, u1 = int(round(ry * sx)), min(out_w, int(round((ry + rh) * sx)))
+        v0, v1 = int(round(rx * sy)), min(out_h, int(round((rx + rw) * sy)))
+        if (u0, v0, u1, v1) != (0, 0, out_w, out_h):
+            out.fill(0)
+        dst = out[v0:v1, u0:u1]
+        if dst.size:
+            ph, pw = plane.shape[:2]
+            if self._transposed is None or self._transposed.shape != (pw, ph):
+                self._transposed = np.empty((pw, ph), dtype=np.uint8)
+                self.allocations += 1
+            cv2.transpose(plane, self._transposed)
+            cv2.resize(self._transposed, (dst.shape[1], dst.shape[0]), dst=dst, interpolation=self.interpolation)
+        return out
+
+    def ingest_gray(self, gray):
+        """
+        이미 정방향인 흑백 이미지(JPEG 디코딩 결과 등) -> 좌우 반전 + 가로 640px 분석 프레임
+        """
+        h, w = gray.shape[:2]
+        out_w = self.target_width
+        out_h = int(out_w * (h / w))
+        sx = out_w / w
+        sy = out_h / h
+
+        # 출력 좌표 (u, v) -> 원본 좌표: x = (w - 1) - u / sx, y = v / sy
+        M = np.array([
+            [-1.0 / sx, 0.0, w - 0.5 - 0.5 / sx],
+            [0.0, 1.0 / sy, 0.5 / sy - 0.5],
+        ])
+        out = self._output(out_h, out_w)
+        cv2.warpAffine(gray, M, (out_w, out_h), dst=out,
+                       flags=self.interpolation | cv2.WARP_INVERSE_MAP)
+        self.frames += 1
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "allocations": self.allocations,
+            "copies": self.copies,
+            "bytes_copied": self.bytes_copied,
+            "bytes_received": self.bytes_received,
+            "reduced_frames": self.reduced_frames,
+        }
+
+
+def sensor_box(box, full_width, full_height, target_width=ANALYSIS_WIDTH):
+    """
+    분석 프레임 좌표 박스 (x1, y1, x2, y2) -> 센서 방향 전체 프레임 좌표 박스
+    클라이언트가 다음 프레임의 ROI를 정할 때 쓰도록 응답에 그대로 넘김
+    """
+    out_w = target_width
+    out_h = int(out_w * (full_width / full_height))
+    sx = out_w / full_height
+    sy = out_h / full_width
+    u1, v1, u2, v2 = box
+    x1, x2 = max(0, int(v1 / sy)), min(full_width, int(np.ceil(v2 / sy)))
+    y1, y2 = max(0, int(u1 / sx)), min(full_height, int(np.ceil(u2 / sx)))
+    return [x1, y1, x2, y2]
+
+
+def decode_gray(image_bytes):
+    """JPEG/PNG 등 압축 이미지를 흑백으로 바로 디코딩 (EXIF 회전은 기존 PIL 처리와 같이 무시)"""
+    buf = np.frombuffer(image_bytes, dtype=np.uint8)
+    gray = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION)
+    if gray is None:
+        raise ValueError("cannot decode image")
+    return gray
@@ -0,0 +1,253 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+
+# 4xx 중 재시도하면 성공할 수 있는 코드 (요청 시간 초과, 요청 과다)
+RETRYABLE_CLIENT_ERRORS = (408, 429)
+
+
+def is_permanent_error(e) -> bool:
+    """백엔드가 요청 자체를 거부한 경우 (같은 행을 다시 보내도 계속 실패)"""
+    return (isinstance(e, urllib.error.HTTPError) and 400 <= e.code < 500
+            and e.code not in RETRYABLE_CLIENT_ERRORS)
+
+
+def make_postgrest_insert(base_url, api_key, table, timeout=5.0):
+    """
+    Supabase(PostgREST) REST API로 여러 행을 한 번에 INSERT 하는 함수 생성
+    base_url만 바꾸면 로컬 대체 서버(utils/supabaseStub.py)로도 동작
+    """
+    url = f"{base_url.rstrip('/')}/rest/v1/{table}"
+    headers = {
+        "apikey": api_key,
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Prefer": "return=minimal",
+    }
+
+    def insert(rows):
+        body = json.dumps(rows).encode("utf-8")
+        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+
+    return insert
+
+
+class HistoryWriter:
+    """
+    요청 경로에서 분리된 DB 기록용 write-behind 버퍼
+    - add()는 메모리 버퍼에 넣고 바로 반환
+    - 백그라운드 스레드가 max_batch개 또는 flush_interval초마다 묶어서 INSERT
+    - 실패 시 지수 백오프로 재시도, 그래도 실패하면 SQLite(WAL) 저널에 보관
+    - 백엔드가 복구되면 저널에 쌓인 행을 먼저 재전송
+    - 백엔드가 거부한 배치(4xx, 408/429 제외)는 재시도하지 않고 저널의 dead_letter 테이블로 옮김
+    """
+    def __init__(self, insert_fn, journal_path, max_batch=50, flush_interval=1.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=30.0):
+        self.insert_fn = insert_fn
+        self.journal_path = journal_path
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._db = None  # flush 스레드 전용 연결
+
+        # 상태 및 통계 값
+        self._backend_up = True
+        self._next_attempt_at = 0.0
+        self._consecutive_failures = 0
+        self._journal_depth = 0
+        self._sent = 0
+        self._spilled = 0
+        self._dead_lettered = 0
+        self._failed_attempts = 0
+        self._last_error = None
+
+    # ==============================
+    # 수명 주기
+    # ==============================
+    def start(self):
+        self._thread = threading.Thread(target=self._flush_loop, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=10.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    # ==============================
+    # 기록 요청
+    # ==============================
+    def add(self, row: dict):
+        with self._cond:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.max_batch:
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "journaled": self._journal_depth,
+            "queue_depth": buffered + self._journal_depth,
+            "sent": self._sent,
+            "spilled": self._spilled,
+            "dead_lettered": self._dead_lettered,
+            "failed_attempts": self._failed_attempts,
+            "backend_up": self._backend_up,
+            "last_error": self._last_error,
+        }
+
+    # ==============================
+    # 저널 (SQLite WAL)
+    # ==============================
+    def _open_journal(self):
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.journal_path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS pending (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS dead_letter (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                   "payload TEXT NOT NULL, error TEXT, failed_at REAL NOT NULL)")
+        db.commit()
+        self._journal_depth = db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return db
+
+    def _spill(self, rows):
+        with self._db:
+            self._db.executemany("INSERT INTO pending (payload) VALUES (?)", [(json.dumps(r),) for r in rows])
+        self._journal_depth += len(rows)
+        self._spilled += len(rows)
+
+    def _dead_letter(self, rows, error):
+        """백엔드가 거부한 배치를 따로 보관 (재전송 대상에서 제외, 원인 확인 후 수동 처리)"""
+        now = time.time()
+        with self._db:
+            self._db.executemany("INSERT INTO dead_letter (payload, error, failed_at) VALUES (?, ?, ?)",
+                                 [(json.dumps(r), error, now) for r in rows])
+        self._dead_lettered += len(rows)
+        print(f"[history] 백엔드가 {len(rows)}건 거부, dead_letter로 이동: {error}")
+
+    def _replay_journal(self):
+        """저널에 보관된 행을 오래된 순으로 재전송 (실패 시 그대로 보관, 거부된 배치는 dead_letter로 옮기고 진행)"""
+        while self._journal_depth > 0 and not self._stop:
+            records = self._db.execute(
+                "SELECT id, payload FROM pending ORDER BY id LIMIT ?", (self.max_batch,)
+            ).fetchall()
+            if not records:
+                self._journal_depth = 0
+                return True
+            if not self._try_insert([json.loads(p) for _, p in records], retries=0):
+                return False
+            with self._db:
+                self._db.execute("DELETE FROM pending WHERE id <= ?", (records[-1][0],))
+            self._journal_depth -= len(records)
+        return True
+
+    # ==============================
+    # 전송
+    # ==============================
+    def _try_insert(self, rows, retries):
+        """
+        True: 전송 완료 또는 거부되어 dead_letter로 이동 (어느 쪽이든 다음 배치로 진행)
+        False: 일시적 장애로 실패 (호출 쪽에서 저널에 보관)
+        """
+        for attempt in range(retries + 1):
+            try:
+                self.insert_fn(rows)
+            except Exception as e:
+                self._failed_attempts += 1
+                self._last_error = f"{type(e).__name__}: {e}"
+                if is_permanent_error(e):
+                    # 응답이 왔으므로 백엔드는 살아 있음
+                    self._dead_letter(rows, self._last_error)
+                    self._mark_up()
+                    return True
+                if attempt < retries:
+                    time.sleep(min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                continue
+
+            self._sent += len(rows)
+            self._mark_up()
+            return True
+
+        self._mark_down()
+        return False
+
+    def _mark_up(self):
+        if not self._backend_up:
+            print(f"[history] 백엔드 복구, 저널 대기 {self._journal_depth}건 재전송")
+        self._backend_up = True
+        self._consecutive_failures = 0
+
+    def _mark_down(self):
+        if self._backend_up:
+            print(f"[history] 백엔드 연결 실패, 로컬 저널로 전환: {self._last_error}")
+        self._backend_up = False
+        self._consecutive_failures += 1
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self._consecutive_failures))
+        self._next_attempt_at = time.monotonic() + delay
+
+    def _take_batch(self):
+        with self._cond:
+            n = min(self.max_batch, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(n)]
+
+    def _drain_buffer(self):
+        with self._cond:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        return rows
+
+    def _flush_loop(self):
+        self._db = self._open_journal()
+        try:
+            while True:
+                with self._cond:
+                    if not self._stop and len(self._buffer) < self.max_batch:
+                        self._cond.wait(timeout=self.flush_interval)
+                    stopping = self._stop
+
+                # 백엔드 장애 중: 다음 재시도 시각 전까지는 버퍼를 바로 저널로 보냄
+                if not self._backend_up and time.monotonic() < self._next_attempt_at:
+                    rows = self._drain_buffer()
+                    if rows:
+                        self._spill(rows)
+                    if stopping:
+                        break
+                    continue
+
+                if self._journal_depth > 0 and not self._replay_journal():
+                    continue
+
+                while True:
+                    rows = self._take_batch()
+                    if not rows:
+                        break
+                    if not self._try_insert(rows, retries=0 if stopping else self.max_retries):
+                        self._spill(rows + self._drain_buffer())
+                        break
+
+                if stopping:
+                    break
+        finally:
+            rows = self._drain_buffer()
+            if rows:
+                self._spill(rows)
+            self._db.close()
@@ -0,0 +1,267 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.fairScheduler import FairQueue, SessionLatencies
+
+
+class QueueFullError(Exception):
+    """
+    추론 대기열이 가득 찼을 때 발생
+    retry_after: 클라이언트에게 안내할 재시도 대기 시간(초)
+    """
+    def __init__(self, retry_after):
+        super().__init__(f"inference queue is full (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class FrameDropped(Exception):
+    """
+    프레임이 분석되지 않고 버려졌을 때 발생
+    reason: "superseded" (같은 세션의 더 새 프레임으로 대체) / "deadline" (시작 전에 마감 시각 초과)
+            / "busy" (배치 요청에서 대기열이 가득 차 넣지 못한 프레임, main.py에서 사용)
+    """
+    def __init__(self, reason):
+        super().__init__(f"frame dropped ({reason})")
+        self.reason = reason
+
+
+class _Job:
+    def __init__(self, future, fn, args, enqueued_at, key=None, deadline=None):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.enqueued_at = enqueued_at
+        self.key = key
+        self.deadline = deadline  # perf_counter 기준 시작 마감 시각 (None이면 없음)
+        self.started = False
+
+
+class InferencePool:
+    """
+    고정 개수의 추론 전용 워커 스레드와 크기 제한 대기열
+    - 워커마다 init_fn()으로 자기 전용 컨텍스트(모델, 랜드마커)를 생성
+    - 작업은 fn(ctx, *args) 형태로 워커 스레드에서 실행
+    - 대기열이 가득 차면 즉시 QueueFullError 발생 (백프레셔)
+    - 대기열은 key(세션)별 공정 큐 (utils/fairScheduler.py), weight가 큰 작업(위험 상태 세션)이 먼저 처리됨
+    - key(세션)가 같은 작업은 대기 중인 것 1개만 유지 (최신 프레임 우선)
+      새 작업이 대기 중인 작업의 대기열 자리를 그대로 이어받고, 밀려난 작업은 FrameDropped("superseded")
+      latest_only=False로 넣은 작업(배치 요청의 프레임)은 대체하지도, 대체되지도 않음
+    - deadline이 지난 작업은 시작하지 않고 FrameDropped("deadline")
+    """
+    def __init__(self, init_fn, num_workers=2, queue_size=8, name="inference",
+                 max_inflight_per_key=1, fair=True, latency_window=200, idle_timeout=60.0):
+        self.init_fn = init_fn
+        self.num_workers = max(1, int(num_workers))
+        self.queue_size = max(1, int(queue_size))
+        self.name = name
+
+        self._queue = FairQueue(self.queue_size, max_inflight=max_inflight_per_key, fair=fair)
+        self._latencies = SessionLatencies(window=latency_window, idle_timeout=idle_timeout)
+        self._pending = {}  # key -> 아직 시작하지 않은 작업
+        self._threads = []
+        self._contexts = []
+        self._lock = threading.Lock()
+
+        # 워커 초기화(모델 로드, 워밍업) 완료 상태
+        self._initialized = 0
+        self._init_errors = []
+        self._init_done = threading.Event()
+
+        # 통계 값
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._superseded = 0
+        self._expired = 0
+        self._service_ema = None  # 작업 1건 평균 처리 시간(초, 지수 이동 평균)
+        self._wait_ema = None     # 대기열 평균 대기 시간(초)
+
+    # ==============================
+    # 수명 주기
+    # ==============================
+    def start(self):
+        for i in range(self.num_workers):
+            t = threading.Thread(target=self._worker_loop, name=f"{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def shutdown(self, timeout=5.0):
+        # 남은 작업을 처리한 워커부터 종료
+        self._queue.close()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    # ==============================
+    # 작업 제출
+    # ==============================
+    def submit(self, fn, *args, key=None, deadline=None, weight=1.0, latest_only=True) -> Future:
+        """
+        key: 같은 key의 대기 중 작업이 있으면 그 자리를 대체 (이전 작업은 FrameDropped)
+        latest_only: False면 대체 없이 같은 key의 작업을 모두 순서대로 처리
+        deadline: 이 시각(perf_counter)까지 시작하지 못하면 실행하지 않음
+        weight: 공정 큐 가중치 (클수록 같은 세션 작업이 더 자주 선택됨)
+        """
+        future = Future()
+        now = time.perf_counter()
+        superseded = None
+        with self._lock:
+            if deadline is not None and deadline <= now:
+                # 도착했을 때 이미 마감이 지난 프레임은 대기열에 넣지 않음
+                self._expired += 1
+                self._latencies.record_drop(key)
+                raise FrameDropped("deadline")
+            latest_only = latest_only and key is not None
+            job = self._pending.get(key) if latest_only else None
+            if job is not None and not job.started:
+                superseded = job.future
+                job.future, job.fn, job.args, job.deadline = future, fn, args, deadline
+                job.enqueued_at = now
+                self._superseded += 1
+                self._latencies.record_drop(key)
+            else:
+                job = _Job(future, fn, args, now, key, deadline)
+                if not self._queue.put_nowait(job, key, weight):
+                    self._rejected += 1
+                    raise QueueFullError(self.retry_after_seconds())
+                if latest_only:
+                    self._pending[key] = job
+        # 클라이언트가 이미 끊겨 취소된 future면 건너뜀
+        if superseded is not None and superseded.set_running_or_notify_cancel():
+            superseded.set_exception(FrameDropped("superseded"))
+        return future
+
+    async def run(self, fn, *args, key=None, deadline=None, weight=1.0, latest_only=True):
+        """이벤트 루프를 막지 않고 워커 결과를 기다림"""
+        return await asyncio.wrap_future(self.submit(fn, *args, key=key, deadline=deadline, weight=weight,
+                                                     latest_only=latest_only))
+
+    def wait_ready(self, timeout=None) -> bool:
+        """모든 워커의 초기화가 끝날 때까지 대기, 전부 성공했으면 True"""
+        self._init_done.wait(timeout)
+        with self._lock:
+            return self._init_done.is_set() and not self._init_errors
+
+    @property
+    def init_errors(self) -> list:
+        with self._lock:
+            return list(self._init_errors)
+
+    def retry_after_seconds(self) -> int:
+        # 대기열이 빠지는 데 걸릴 예상 시간 (최소 1초)
+        service = self._service_ema or 0.1
+        backlog = self._queue.qsize() + self._busy
+        return max(1, int(round(service * backlog / self.num_workers)))
+
+    def load(self) -> tuple:
+        """(대기 + 처리 중 작업 수, 평균 처리 시간(초)), 응답마다 호출되므로 잠금 없이 읽음"""
+        return self._queue.qsize() + self._busy, self._service_ema or 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "alive_workers": sum(t.is_alive() for t in self._threads),
+                "ready_workers": len(self._contexts),
+                "queue_size": self.queue_size,
+                "queue_depth": self._queue.qsize(),
+                "busy": self._busy,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "superseded": self._superseded,
+                "expired": self._expired,
+                "avg_service_ms": round((self._service_ema or 0.0) * 1000, 2),
+                "avg_wait_ms": round((self._wait_ema or 0.0) * 1000, 2),
+                "scheduler": self._queue.stats(),
+            }
+
+    def session_stats(self, limit=20) -> dict:
+        """세션별 대기열 진입 -> 처리 완료 지연 분위수 (p95가 나쁜 세션 순)"""
+        return self._latencies.stats(limit)
+
+    def sum_context_stats(self, stats_fn) -> dict:
+        """워커 컨텍스트별 카운터(dict)를 합산 (예: 프레임 변환기 할당/복사 횟수)"""
+        total = {}
+        for ctx in list(self._contexts):
+            for key, value in stats_fn(ctx).items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    # ==============================
+    # 워커 루프
+    # ==============================
+    def _worker_loop(self):
+        try:
+            ctx = self.init_fn()
+        except Exception as e:
+            print(f"[{threading.current_thread().name}] 워커 초기화 실패: {e}")
+            with self._lock:
+                self._init_errors.append(f"{threading.current_thread().name}: {e}")
+                self._mark_initialized()
+            return
+        with self._lock:
+            self._contexts.append(ctx)
+            self._mark_initialized()
+
+        while True:
+            got = self._queue.get()
+            if got is None:
+                break
+            queue_key, job = got
+            try:
+                self._run_job(ctx, job)
+            finally:
+                self._queue.done(queue_key)
+
+    def _run_job(self, ctx, job):
+        # 대체(superseded)는 시작 전 작업에만 일어나므로 잠금 안에서 시작 표시 후 내용을 읽음
+        with self._lock:
+            job.started = True
+            if job.key is not None and self._pending.get(job.key) is job:
+                del self._pending[job.key]
+            future, fn, args, enqueued_at = job.future, job.fn, job.args, job.enqueued_at
+            expired = job.deadline is not None and time.perf_counter() > job.deadline
+            if expired:
+                self._expired += 1
+        if not future.set_running_or_notify_cancel():
+            return
+        if expired:
+            self._latencies.record_drop(job.key)
+            future.set_exception(FrameDropped("deadline"))
+            return
+
+        started_at = time.perf_counter()
+        with self._lock:
+            self._busy += 1
+        try:
+            result = fn(ctx, *args)
+        except BaseException as e:
+            future.set_exception(e)
+            ok = False
+        else:
+            future.set_result(result)
+            ok = True
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self._busy -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._service_ema = _ema(self._service_ema, finished_at - started_at)
+                self._wait_ema = _ema(self._wait_ema, started_at - enqueued_at)
+            self._latencies.record(job.key, finished_at - enqueued_at)
+
+    def _mark_initialized(self):
+        self._initialized += 1
+        if self._initialized >= self.num_workers:
+            self._init_done.set()
+
+
+def _ema(prev, value, alpha=0.1):
+    return value if prev is None else prev + alpha * (value - prev)
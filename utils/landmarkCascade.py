@@ -0,0 +1,114 @@
+import threading
+import time
+
+# ==============================
+# 랜드마크 기하 판정 (YOLO 앞단 캐스케이드)
+# ==============================
+# MediaPipe 랜드마크로 계산한 EAR(눈)/MAR(입)이 임계값에서 충분히 멀면 YOLO 없이 바로 판정
+#   EAR <= ear_closed -> 눈 감김,   EAR >= ear_open -> 눈 뜸
+#   MAR >= mar_yawn   -> 하품,      MAR <= mar_closed -> 하품 아님
+# 둘 중 하나라도 애매한 구간이면 YOLO 실행 (YOLO는 한 번에 눈/입을 모두 판정하므로 부분 판정은 하지 않음)
+# mode
+#   off  : 사용 안 함 (매 프레임 YOLO)
+#   audit: 판정만 하고 YOLO 결과로 응답, 기하 판정이 된 프레임은 모두 YOLO와 비교해 기록 (서빙 결과는 off와 같음)
+#   on   : 기하 판정 프레임은 YOLO 생략, audit_every번째마다 YOLO도 실행해 일치율 기록 (0이면 생략)
+# 임계값은 model/cascadeEval.py의 YOLO 일치율/놓친 경보 기준을 통과한 값으로만 on 사용
+CASCADE_MODES = ("off", "audit", "on")
+
+
+class LandmarkCascade:
+    def __init__(self, ear_closed=0.12, ear_open=0.22, mar_yawn=0.75, mar_closed=0.35, audit_every=0, mode="off",
+                 log_interval=10.0):
+        if mode not in CASCADE_MODES:
+            raise ValueError(f"unknown cascade mode: {mode} (choose from {CASCADE_MODES})")
+        self.mode = mode
+        self.ear_closed = ear_closed
+        self.ear_open = ear_open
+        self.mar_yawn = mar_yawn
+        self.mar_closed = mar_closed
+        self.audit_every = audit_every
+        self.log_interval = log_interval  # 불일치 로그 최소 간격(초)
+        self._lock = threading.Lock()
+        self._last_log = float("-inf")
+
+        # 통계 값
+        self.frames = 0
+        self.decided = 0     # 기하 판정으로 YOLO 생략
+        self.ambiguous = 0   # 애매 -> YOLO 실행
+        self.audited = 0
+        self.audit_agree = 0
+        self.missed_eye_closed = 0  # YOLO는 눈감김인데 기하 판정은 눈 뜸 (놓친 경보)
+        self.missed_yawn = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" and self.ear_closed < self.ear_open and self.mar_closed < self.mar_yawn
+
+    @property
+    def audit_only(self) -> bool:
+        """판정을 기록만 하고 응답에는 쓰지 않는 모드"""
+        return self.mode == "audit"
+
+    def classify(self, ear, mar):
+        """(하품, 눈감김) 판정, 애매하면 None (통계 미반영, 오프라인 평가용)"""
+        if ear <= self.ear_closed:
+            eye_closed = True
+        elif ear >= self.ear_open:
+            eye_closed = False
+        else:
+            return None
+        if mar >= self.mar_yawn:
+            yawn = True
+        elif mar <= self.mar_closed:
+            yawn = False
+        else:
+            return None
+        return yawn, eye_closed
+
+    def decide(self, ear, mar):
+        """
+        서빙용 판정: (하품, 눈감김) 또는 None(YOLO 필요)
+        두 번째 값은 이번 프레임을 감사(YOLO 병행 실행) 대상으로 삼을지 여부 (audit 모드는 항상 True)
+        """
+        parts = self.classify(ear, mar)
+        with self._lock:
+            self.frames += 1
+            if parts is None:
+                self.ambiguous += 1
+                return None, False
+            self.decided += 1
+            audit = self.audit_only or (self.audit_every > 0 and self.decided % self.audit_every == 0)
+        return parts, audit
+
+    def record_audit(self, parts, yolo_parts, ear, mar):
+        """기하 판정 (하품, 눈감김)과 같은 프레임의 YOLO 판정 비교, 불일치는 log_interval초에 한 번 출력"""
+        (yawn, eye_closed), (yolo_yawn, yolo_eye_closed) = parts, yolo_parts
+        agree = (yawn, eye_closed) == (yolo_yawn, yolo_eye_closed)
+        with self._lock:
+            self.audited += 1
+            self.audit_agree += agree
+            self.missed_eye_closed += yolo_eye_closed and not eye_closed
+            self.missed_yawn += yolo_yawn and not yawn
+            now = time.monotonic()
+            log = not agree and now - self._last_log >= self.log_interval
+            if log:
+                self._last_log = now
+        if log:
+            print(f"[cascade] 판정 불일치 ear={ear:.3f} mar={mar:.3f} "
+                  f"기하(하품, 눈감김)={(yawn, eye_closed)} YOLO={(yolo_yawn, yolo_eye_closed)}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "enabled": self.enabled,
+                "frames": self.frames,
+                "decided": self.decided,
+                "ambiguous": self.ambiguous,
+                # audit 모드에서는 on으로 바꿨을 때 YOLO를 생략했을 비율
+                "skip_ratio": round(self.decided / self.frames, 3) if self.frames else 0.0,
+                "audited": self.audited,
+                "audit_agreement": round(self.audit_agree / self.audited, 3) if self.audited else None,
+                "missed_eye_closed": self.missed_eye_closed,
+                "missed_yawn": self.missed_yawn,
+            }
@@ -86,6 +86,8 @@ import mediapipe as mp
 import numpy as np
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
+import math
+import threading
 import time
 
 '''class FaceProcessor:
@@ -152,8 +154,220 @@ import time
 
         return [head_drop, bbox_coords, crop_coords]'''
 
+# ==============================
+# 랜드마크 기하 계산 (벡터화)
+# ==============================
+# 랜드마크 478개를 (N, 2) float32 픽셀 좌표 배열로 한 번만 변환한 뒤 모든 파생 값을 배열 연산으로 계산
+# (z는 어떤 파생 값에도 쓰지 않으므로 읽지 않음)
+
+HEAD_DROP_IDX = (10, 1, 152)                       # 이마, 코끝, 턱끝
+EYE_CORNER_IDX = (33, 263)                         # 왼쪽/오른쪽 눈 바깥 꼬리
+LEFT_EYE_IDX = (33, 160, 158, 133, 153, 144)       # EAR 계산용 p1~p6
+RIGHT_EYE_IDX = (362, 385, 387, 263, 373, 380)
+MOUTH_IDX = (78, 81, 13, 311, 308, 402, 14, 178)   # MAR 계산용 (입술 안쪽 윤곽)
+
+# EAR/MAR 거리 계산용 인덱스 쌍 [a..., b...] (take 한 번으로 모아서 계산)
+_EYE_PAIRS = np.array([
+    LEFT_EYE_IDX[1], LEFT_EYE_IDX[2], RIGHT_EYE_IDX[1], RIGHT_EYE_IDX[2], LEFT_EYE_IDX[0], RIGHT_EYE_IDX[0],
+    LEFT_EYE_IDX[5], LEFT_EYE_IDX[4], RIGHT_EYE_IDX[5], RIGHT_EYE_IDX[4], LEFT_EYE_IDX[3], RIGHT_EYE_IDX[3],
+])
+_MOUTH_PAIRS = np.array([
+    MOUTH_IDX[1], MOUTH_IDX[2], MOUTH_IDX[3], MOUTH_IDX[0],
+    MOUTH_IDX[7], MOUTH_IDX[6], MOUTH_IDX[5], MOUTH_IDX[4],
+])
+
+def landmarks_to_array(face_landmarks, w, h):
+    """MediaPipe 랜드마크 리스트 -> 픽셀 좌표 (N, 2) float32 배열 [x*w, y*h]"""
+    n = len(face_landmarks)
+    # 축별 리스트 컴프리헨션 + fromiter (attrgetter/map, 좌표 튜플 생성보다 빠름)
+    pts = np.empty((n, 2), dtype=np.float32)
+    pts[:, 0] = np.fromiter([lm.x for lm in face_landmarks], dtype=np.float32, count=n)
+    pts[:, 1] = np.fromiter([lm.y for lm in face_landmarks], dtype=np.float32, count=n)
+    pts *= np.array([w, h], dtype=np.float32)
+    return pts
+
+def landmark_bbox(pts):
+    """랜드마크 전체를 감싸는 박스 (min_x, min_y, max_x, max_y)"""
+    xs, ys = pts[:, 0], pts[:, 1]
+    return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+def padded_crop_coords(bbox, pad_ratio, w, h):
+    """박스 크기 대비 pad_ratio만큼 여유를 둔 크롭 좌표 (이미지 경계로 clip)"""
+    min_x, min_y, max_x, max_y = bbox
+    pw = (max_x - min_x) * pad_ratio
+    ph = (max_y - min_y) * pad_ratio
+    return (
+        int(max(0, min_x - pw)),
+        int(max(0, min_y - ph)),
+        int(min(w, max_x + pw)),
+        int(min(h, max_y + ph)),
+    )
+
+def roll_angle(pts):
+    """두 눈 꼬리를 잇는 선의 기울기(도)"""
+    (lx, ly), (rx, ry) = pts[EYE_CORNER_IDX, :2].tolist()
+    return math.degrees(math.atan2(ry - ly, rx - lx))
+
+def head_drop_ratio(pts):
+    """(코끝 - 이마) / (턱끝 - 이마) 세로 비율, 클수록 고개가 숙여진 상태"""
+    forehead, nose, chin = pts[HEAD_DROP_IDX, 1].tolist()
+    face_height = chin - forehead
+    return (nose - forehead) / face_height if face_height != 0 else 0.0
+
+def _pair_distances(pts, pairs):
+    g = pts.take(pairs, axis=0)[:, :2].tolist()
+    k = len(g) // 2
+    return [math.dist(g[i], g[i + k]) for i in range(k)]
+
+def eye_aspect_ratio(pts):
+    """양쪽 눈 EAR 평균: (|p2-p6| + |p3-p5|) / (2|p1-p4|), 눈을 감을수록 0에 가까움"""
+    l1, l2, r1, r2, lw, rw = _pair_distances(pts, _EYE_PAIRS)
+    left = (l1 + l2) / (2 * lw) if lw > 0 else 0.0
+    right = (r1 + r2) / (2 * rw) if rw > 0 else 0.0
+    return (left + right) / 2
+
+def mouth_aspect_ratio(pts):
+    """입 MAR: 입술 안쪽 세로 거리 3쌍 평균 / 가로 거리, 입을 벌릴수록 커짐"""
+    v1, v2, v3, width = _pair_distances(pts, _MOUTH_PAIRS)
+    return (v1 + v2 + v3) / (3 * width) if width > 0 else 0.0
+
+class _SessionLandmarker:
+    def __init__(self, landmarker):
+        self.landmarker = landmarker
+        self.lock = threading.Lock()
+        self.last_ts_ms = -1
+        self.last_used = time.monotonic()
+        self.frames = 0
+
+
+class LandmarkerPool:
+    """
+    운전자 세션별 VIDEO 모드 FaceLandmarker 풀
+    - VIDEO 모드는 이전 프레임 결과로 얼굴을 추적하므로 매 프레임 얼굴 검출을 다시 하지 않음
+    - 세션마다 단조 증가 타임스탬프를 보장 (detect_for_video 요구사항)
+    - idle_timeout초 이상 쓰이지 않은 세션은 해제, 최대 max_sessions개 유지
+    """
+    def __init__(self, model_path='face_landmarker.task', max_sessions=32, idle_timeout=60.0):
+        self.model_path = model_path
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+
+        self._sessions = {}
+        self._spares = []  # 미리 만들어 둔 예비 랜드마커 (새 세션에 바로 배정)
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+        # 통계 값
+        self.created = 0
+        self.evicted = 0
+        self.fallbacks = 0  # 풀이 가득 차 IMAGE 모드로 처리한 횟수
+
+    def _create_landmarker(self):
+        options = vision.FaceLandmarkerOptions(
+            base_options=python.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_faces=1
+        )
+        self.created += 1
+        return vision.FaceLandmarker.create_from_options(options)
+
+    def _close(self, sid, entry):
+        # 다른 워커가 사용 중인 세션은 건너뜀
+        if not entry.lock.acquire(blocking=False):
+            return False
+        try:
+            del self._sessions[sid]
+            entry.landmarker.close()
+        finally:
+            entry.lock.release()
+        self.evicted += 1
+        return True
+
+    def evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            self._last_sweep = now
+            for sid, entry in list(self._sessions.items()):
+                if now - entry.last_used > self.idle_timeout:
+                    self._close(sid, entry)
+
+    def _get(self, session_id):
+        now = time.monotonic()
+        if now - self._last_sweep > self.idle_timeout / 4:
+            self.evict_idle()
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                # 가득 찼으면 가장 오래 쉬고 있는 세션부터 해제 시도
+                if len(self._sessions) >= self.max_sessions:
+                    for sid, old in sorted(self._sessions.items(), key=lambda kv: kv[1].last_used):
+                        if self._close(sid, old):
+                            break
+                    else:
+                        self.fallbacks += 1
+                        return None
+                if self._spares:
+                    entry = self._spares.pop()
+                else:
+                    entry = _SessionLandmarker(self._create_landmarker())
+                self._sessions[session_id] = entry
+            entry.last_used = now
+            return entry
+
+    def prewarm(self, count, frame_shape):
+        """
+        예비 랜드마커를 count개 미리 생성하고 빈 프레임으로 1회 실행
+        새 세션의 첫 요청이 그래프 생성 비용(수십 ms)을 부담하지 않도록 함
+        """
+        blank = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros(frame_shape + (3,), dtype=np.uint8))
+        for _ in range(count):
+            entry = _SessionLandmarker(self._create_landmarker())
+            entry.landmarker.detect_for_video(blank, 0)
+            entry.last_ts_ms = 0
+            with self._lock:
+                self._spares.append(entry)
+
+    def detect(self, session_id, mp_image, timestamp_ms=None):
+        """
+        세션 전용 랜드마커로 추적 기반 검출 수행
+        풀이 가득 차 세션 랜드마커를 배정할 수 없으면 None 반환 (호출 측에서 IMAGE 모드로 처리)
+        """
+        entry = self._get(session_id)
+        if entry is None:
+            return None
+        with entry.lock:
+            if timestamp_ms is None:
+                timestamp_ms = int(time.monotonic() * 1000)
+            # 같은 세션 내 타임스탬프는 반드시 증가해야 함
+            timestamp_ms = max(int(timestamp_ms), entry.last_ts_ms + 1)
+            entry.last_ts_ms = timestamp_ms
+            entry.frames += 1
+            return entry.landmarker.detect_for_video(mp_image, timestamp_ms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = len(self._sessions)
+        return {
+            "active_sessions": active,
+            "spares": len(self._spares),
+            "max_sessions": self.max_sessions,
+            "created": self.created,
+            "evicted": self.evicted,
+            "fallbacks": self.fallbacks,
+        }
+
+    def close(self):
+        with self._lock:
+            for entry in list(self._sessions.values()) + self._spares:
+                with entry.lock:
+                    entry.landmarker.close()
+            self._sessions.clear()
+            self._spares.clear()
+
+
 class FaceProcessor:
-    def __init__(self, model_path='face_landmarker.task'):
+    def __init__(self, model_path='face_landmarker.task', landmarker_pool=None, timer=None):
         # 1. MediaPipe Tasks 설정
         base_options = python.BaseOptions(model_asset_path=model_path)
         
@@ -164,88 +378,140 @@ class FaceProcessor:
         self.detector = vision.FaceLandmarker.create_from_options(options)
         self.pad_ratio = 0.3
 
-    def process_frame(self, frame):
+        # 세션 단위 VIDEO 모드 랜드마커 풀 (없으면 항상 IMAGE 모드)
+        self.landmarker_pool = landmarker_pool
+        # 단계별 처리 시간 기록기 (utils/stageTimer.StageTimer, 없으면 기록하지 않음)
+        self.timer = timer
+        # 흑백 프레임을 MediaPipe 입력(RGB)으로 펼칠 때 재사용하는 버퍼 (mp.Image는 입력을 복사하므로 재사용 가능)
+        self._rgb = None
+
+    def to_mp_image(self, frame):
+        """
+        MediaPipe 입력 이미지 생성
+        얼굴 검출/랜드마크 모델은 3채널 입력만 받으므로(GRAY8은 그래프 오류) 흑백은 여기서 한 번만 RGB로 펼침
+        """
+        if frame.ndim == 2:
+            shape = frame.shape + (3,)
+            if self._rgb is None or self._rgb.shape != shape:
+                self._rgb = np.empty(shape, dtype=np.uint8)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB, dst=self._rgb)
+        else:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+
+    def detect(self, mp_image, session_id=None, timestamp_ms=None):
+        """세션 ID가 있으면 세션 전용 랜드마커(추적), 없으면 단일 이미지 검출"""
+        if session_id is not None and self.landmarker_pool is not None:
+            results = self.landmarker_pool.detect(session_id, mp_image, timestamp_ms)
+            if results is not None:
+                return results
+        return self.detector.detect(mp_image)
+
+    def align_crop(self, frame, center, angle, crop_coords, out_size=None, gray=False):
+        """
+        얼굴 기울기(Roll) 보정 + 크롭을 하나의 아핀 행렬로 합쳐 얼굴 영역만 변환
+        - out_size 미지정: 크롭 크기 그대로 출력 (전체 회전 후 슬라이싱한 결과와 동일)
+        - out_size 지정: 비율을 유지해 out_size x out_size에 레터박스 (ultralytics LetterBox와 같은 배치, 여백 114)
+        - gray=True: 3채널 입력이면 출력 크기에서 흑백 변환 (흑백 입력은 그대로 1채널로 변환)
+        반환: (aligned_crop, 크롭 좌표계 행렬 M, (scale, pad_x, pad_y))
+          크롭 영역이 비어 있으면 (랜드마크가 프레임 밖) None -> 얼굴 미감지로 처리
+        """
+        start_x, start_y, end_x, end_y = crop_coords
+        crop_w, crop_h = end_x - start_x, end_y - start_y
+        if crop_w <= 0 or crop_h <= 0:
+            return None
+
+        # 회전 행렬에 크롭 원점 이동을 합성
+        M = cv2.getRotationMatrix2D(center, angle, 1.0)
+        M[0, 2] -= start_x
+        M[1, 2] -= start_y
+
+        if out_size is None:
+            aligned_crop = cv2.warpAffine(frame, M, (crop_w, crop_h), flags=cv2.INTER_CUBIC)
+            letterbox = (1.0, 0, 0)
+        else:
+            scale = min(out_size / crop_w, out_size / crop_h)
+            # 극단적으로 가는 크롭도 최소 1픽셀은 기록 (warpAffine 출력 크기 0 방지)
+            new_w, new_h = max(1, int(round(crop_w * scale))), max(1, int(round(crop_h * scale)))
+            pad_x = int(round((out_size - new_w) / 2 - 0.1))
+            pad_y = int(round((out_size - new_h) / 2 - 0.1))
+
+            M_out = M * scale
+            channels = frame.shape[2:] if frame.ndim == 3 else ()
+            aligned_crop = np.full((out_size, out_size) + channels, 114, dtype=frame.dtype)
+            # 여백을 제외한 안쪽 영역에만 직접 기록
+            cv2.warpAffine(frame, M_out, (new_w, new_h),
+                           dst=aligned_crop[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                           flags=cv2.INTER_CUBIC)
+            letterbox = (scale, pad_x, pad_y)
+
+        if gray and aligned_crop.ndim == 3:
+            aligned_crop = cv2.cvtColor(aligned_crop, cv2.COLOR_BGR2GRAY)
+
+        return aligned_crop, M, letterbox
+
+    def process_frame(self, frame, out_size=None, gray=False, session_id=None, timestamp_ms=None):
+        """
+        out_size: 검출기 입력 크기 (예: 320). 지정하면 정렬된 얼굴 크롭을 해당 크기로 레터박스해 반환
+        gray: True면 정렬된 크롭을 흑백으로 반환
+        session_id, timestamp_ms: 연속 프레임 스트림이면 세션 전용 VIDEO 모드 랜드마커로 추적
+        frame: BGR (H, W, 3) 또는 흑백 (H, W)
+          흑백이면 MediaPipe 입력만 RGB로 펼치고 정렬/크롭은 1채널 그대로 처리 (처리 바이트 1/3)
+        """
         # 시작 시간 측정
-        start_time = time.time()
-        
-        h, w, _ = frame.shape
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        start_time = time.perf_counter()
 
-        results = self.detector.detect(mp_image)
+        h, w = frame.shape[:2]
+        mp_image = self.to_mp_image(frame)
+
+        results = self.detect(mp_image, session_id, timestamp_ms)
+        if self.timer is not None:
+            start_time = self.timer.since("landmarks", start_time)
 
         if not results.face_landmarks:
             return None
 
         face_landmarks = results.face_landmarks[0]
+        # 랜드마크를 픽셀 좌표 배열로 한 번만 변환
+        pts = landmarks_to_array(face_landmarks, w, h)
 
         # A. 고개 떨굼 감지 로직
-        forehead = face_landmarks[10].y
-        nose = face_landmarks[1].y
-        chin = face_landmarks[152].y
-        
-        face_height = chin - forehead
-        nose_pos_ratio = (nose - forehead) / face_height if face_height != 0 else 0
-        head_drop = nose_pos_ratio > 0.65
+        head_drop = head_drop_ratio(pts) > 0.65
 
         # B. Bounding Box 및 Crop 좌표 계산
-        x_coords = [lm.x * w for lm in face_landmarks]
-        y_coords = [lm.y * h for lm in face_landmarks]
-        
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-
+        bbox = landmark_bbox(pts)
+        min_x, min_y, max_x, max_y = bbox
         bbox_coords = (int(min_x), int(min_y), int(max_x), int(max_y))
 
-        # 패딩 계산 (Crop용)
-        pw = (max_x - min_x) * self.pad_ratio
-        ph = (max_y - min_y) * self.pad_ratio
-
-        start_x = int(max(0, min_x - pw))
-        start_y = int(max(0, min_y - ph))
-        end_x = int(min(w, max_x + pw))
-        end_y = int(min(h, max_y + ph))
-        
-        # 크롭 좌표 튜플 생성
-        crop_coords = (start_x, start_y, end_x, end_y)
+        # 크롭 좌표 튜플 생성 (패딩 포함)
+        crop_coords = padded_crop_coords(bbox, self.pad_ratio, w, h)
 
         # C. 얼굴 기울기(Roll) 보정 및 정렬 (Face Alignment)
-        left_eye_x = face_landmarks[33].x * w
-        left_eye_y = face_landmarks[33].y * h
-        right_eye_x = face_landmarks[263].x * w
-        right_eye_y = face_landmarks[263].y * h
-
-        # 기울기 각도 계산
-        delta_x = right_eye_x - left_eye_x
-        delta_y = right_eye_y - left_eye_y
-        angle = np.degrees(np.arctan2(delta_y, delta_x))
+        angle = roll_angle(pts)
 
         # 회전 중심점 계산
         cx = (min_x + max_x) / 2
         cy = (min_y + max_y) / 2
 
-        # 아핀 변환 행렬 생성 및 원본 이미지 회전
-        M = cv2.getRotationMatrix2D((cx, cy), angle, 1.0)
-        rotated_frame = cv2.warpAffine(frame, M, (w, h), flags=cv2.INTER_CUBIC)
+        # 회전 + 크롭 (+ 검출기 입력 크기 레터박스)을 아핀 변환 1회로 처리
+        # 전체 프레임을 회전하지 않고 얼굴 영역만 출력 크기로 바로 기록
+        aligned = self.align_crop(frame, (cx, cy), angle, crop_coords, out_size, gray)
+        if aligned is None:
+            return None
+        aligned_crop, _, letterbox = aligned
 
-        # 정방향으로 회전된 프레임에서 안전하게 크롭 수행
-        aligned_crop = rotated_frame[start_y:end_y, start_x:end_x]
+        # 정렬 단계 시간 기록 (/metrics stages)
+        if self.timer is not None:
+            self.timer.since("align", start_time)
 
-        # 종료 시간 측정
-        end_time = time.time()
-        
-        # 처리 시간 출력(ms)
-        print('mediapipe processing time: '+ str(int((end_time - start_time) * 1000))+'ms')
-        
-        # 리턴 값 변경: 크롭 좌표(crop_coords)를 포함하여 리턴
-        return [head_drop, bbox_coords, crop_coords, aligned_crop]
+        # 리턴 값 변경: 크롭 좌표(crop_coords), 레터박스 정보(scale, pad_x, pad_y), 랜드마크 배열(pts)을 포함하여 리턴
+        return [head_drop, bbox_coords, crop_coords, aligned_crop, letterbox, pts]
 
     def preprocess_image(self, frame, label, image_path='dataset_mediapipe/images/', label_path='dataset_mediapipe/labels/', cnt=0):
         start_time = time.time()
 
-        h, w, _ = frame.shape
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        h, w = frame.shape[:2]
+        mp_image = self.to_mp_image(frame)
 
         results = self.detector.detect(mp_image)
 
@@ -253,41 +519,24 @@ class FaceProcessor:
             return -1
 
         face_landmarks = results.face_landmarks[0]
+        pts = landmarks_to_array(face_landmarks, w, h)
 
         # B. Bounding Box 및 Crop 좌표 계산
-        x_coords = [lm.x * w for lm in face_landmarks]
-        y_coords = [lm.y * h for lm in face_landmarks]
-        
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-
-        bbox_coords = (int(min_x), int(min_y), int(max_x), int(max_y))
-
-        pw = (max_x - min_x) * self.pad_ratio
-        ph = (max_y - min_y) * self.pad_ratio
-
-        start_x = int(max(0, min_x - pw))
-        start_y = int(max(0, min_y - ph))
-        end_x = int(min(w, max_x + pw))
-        end_y = int(min(h, max_y + ph))
+        bbox = landmark_bbox(pts)
+        min_x, min_y, max_x, max_y = bbox
+        start_x, start_y, end_x, end_y = padded_crop_coords(bbox, self.pad_ratio, w, h)
 
         # C. 얼굴 기울기(Roll) 보정 및 정렬 (Face Alignment)
-        left_eye_x = face_landmarks[33].x * w
-        left_eye_y = face_landmarks[33].y * h
-        right_eye_x = face_landmarks[263].x * w
-        right_eye_y = face_landmarks[263].y * h
-
-        delta_x = right_eye_x - left_eye_x
-        delta_y = right_eye_y - left_eye_y
-        angle = np.degrees(np.arctan2(delta_y, delta_x))
+        angle = roll_angle(pts)
 
         cx = (min_x + max_x) / 2
         cy = (min_y + max_y) / 2
 
-        M = cv2.getRotationMatrix2D((cx, cy), angle, 1.0)
-        rotated_frame = cv2.warpAffine(frame, M, (w, h), flags=cv2.INTER_CUBIC)
-
-        aligned_crop = rotated_frame[start_y:end_y, start_x:end_x]
+        # 얼굴 영역만 회전 + 크롭 (M은 크롭 원점 기준 행렬)
+        aligned = self.align_crop(frame, (cx, cy), angle, (start_x, start_y, end_x, end_y))
+        if aligned is None:
+            return -1
+        aligned_crop, M, _ = aligned
         crop_h, crop_w = aligned_crop.shape[:2]
 
         # D. YOLO 라벨 좌표 회전 및 크롭 동기화
@@ -314,23 +563,17 @@ class FaceProcessor:
                     [cx_abs + bw_abs/2, cy_abs + bh_abs/2]  # Bottom-Right
                 ])
 
-                # 3. 아핀 변환 행렬(M)을 적용하여 모서리 회전
+                # 3. 아핀 변환 행렬(M)을 적용하여 모서리 회전 (크롭 좌표계로의 평행 이동 포함)
                 ones = np.ones(shape=(len(corners), 1))
                 corners_ones = np.hstack([corners, ones])
                 rotated_corners = M.dot(corners_ones.T).T
 
-                # 4. 회전된 모서리들을 포함하는 새로운 축 정렬 바운딩 박스 계산
+                # 4~5. 회전된 모서리들을 포함하는 새로운 축 정렬 바운딩 박스 계산
                 new_min_x = np.min(rotated_corners[:, 0])
                 new_max_x = np.max(rotated_corners[:, 0])
                 new_min_y = np.min(rotated_corners[:, 1])
                 new_max_y = np.max(rotated_corners[:, 1])
 
-                # 5. 크롭 좌표계로 평행 이동
-                new_min_x -= start_x
-                new_max_x -= start_x
-                new_min_y -= start_y
-                new_max_y -= start_y
-
                 # 6. 크롭 이미지 영역을 벗어난 좌표 자르기 (Clipping)
                 new_min_x = np.clip(new_min_x, 0, crop_w)
                 new_max_x = np.clip(new_max_x, 0, crop_w)
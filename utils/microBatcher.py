@@ -0,0 +1,187 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    여러 요청에서 동시에 들어온 입력을 짧은 시간 창 안에서 모아 한 번에 추론
+    - max_batch개가 모이거나 첫 입력 후 max_wait_ms가 지나면 즉시 실행
+    - submit_many로 함께 넣은 입력은 나누지 않고 같은 배치에 실음 (max_batch보다 많아도 한 번에 실행)
+    - init_fn(): 배치 스레드 전용 모델 생성
+    - predict_fn(ctx, items) -> items와 같은 순서의 결과 리스트
+    - 초기화/배치 스레드가 실패하면 대기 중인 입력과 이후 제출되는 입력은 모두 그 예외로 즉시 실패
+      (호출자가 결과를 영원히 기다리지 않음, 기동 단계는 wait_ready로 실패 확인)
+    """
+    def __init__(self, init_fn, predict_fn, max_batch=8, max_wait_ms=5.0, name="batcher"):
+        self.init_fn = init_fn
+        self.predict_fn = predict_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error = None  # 배치 스레드를 멈추게 한 예외 (초기화 실패 등)
+
+        # 통계 값
+        self._batches = 0
+        self._items = 0
+        self._size_hist = Counter()
+        self._wait_total = 0.0     # 입력이 배치에 실리기까지 기다린 시간 합(초)
+        self._forward_total = 0.0  # 배치 추론 시간 합(초)
+
+    # ==============================
+    # 수명 주기
+    # ==============================
+    def start(self):
+        self._thread = threading.Thread(target=self._batch_loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout=5.0):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ==============================
+    # 입력 제출
+    # ==============================
+    def submit(self, item) -> Future:
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items) -> list:
+        """입력 여러 개를 한 묶음으로 제출 (같은 배치에 실려 한 번에 추론), 입력별 Future 리스트 반환"""
+        futures = [Future() for _ in items]
+        if not futures:
+            return futures
+        # 실패 기록과 대기열 비우기가 같은 잠금 안에서 일어나므로 실패 후 넣은 입력이 남지 않음
+        with self._lock:
+            if self._error is None:
+                self._queue.put((futures, list(items), time.perf_counter()))
+                return futures
+            error = self._error
+        for future in futures:
+            future.set_exception(error)
+        return futures
+
+    def predict(self, item, timeout=None):
+        """워커 스레드에서 호출: 배치 결과 중 자기 몫이 나올 때까지 대기"""
+        return self.submit(item).result(timeout)
+
+    def wait_ready(self, timeout=None) -> bool:
+        """배치 스레드 초기화가 끝날 때까지 대기, 성공했으면 True (실패 원인은 init_error)"""
+        self._ready.wait(timeout)
+        return self._ready.is_set() and self._error is None
+
+    @property
+    def init_error(self):
+        return self._error
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self._batches
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "pending": self._queue.qsize(),
+                "batches": batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / batches, 2) if batches else 0.0,
+                "batch_size_hist": dict(sorted(self._size_hist.items())),
+                "avg_wait_ms": round(self._wait_total / self._items * 1000, 2) if self._items else 0.0,
+                "avg_forward_ms": round(self._forward_total / batches * 1000, 2) if batches else 0.0,
+            }
+
+    # ==============================
+    # 배치 루프
+    # ==============================
+    def _collect(self, first):
+        batch = [first]
+        count = len(first[1])
+        deadline = time.perf_counter() + self.max_wait
+        while count < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                # 종료 신호는 현재 배치를 처리한 뒤 반영
+                self._queue.put(None)
+                break
+            batch.append(job)
+            count += len(job[1])
+        return batch
+
+    def _batch_loop(self):
+        try:
+            ctx = self.init_fn()
+        except BaseException as e:
+            print(f"[{self.name}] 배치 스레드 초기화 실패: {e}")
+            self._fail(e)
+            return
+        finally:
+            self._ready.set()
+
+        try:
+            self._serve(ctx)
+        except BaseException as e:
+            print(f"[{self.name}] 배치 스레드 중단: {e}")
+            self._fail(e)
+
+    def _fail(self, error):
+        """이후 제출을 즉시 실패시키고 대기 중인 입력도 모두 error로 실패 처리"""
+        with self._lock:
+            self._error = error
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    continue
+                for future in job[0]:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(error)
+
+    def _serve(self, ctx):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            # 묶음을 펼쳐 입력 단위로 (취소된 입력은 제외)
+            batch = [(future, item, submitted_at)
+                     for futures, items, submitted_at in self._collect(first)
+                     for future, item in zip(futures, items) if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started_at = time.perf_counter()
+            try:
+                results = self.predict_fn(ctx, [item for _, item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"predict_fn returned {len(results)} results for {len(batch)} inputs")
+            except BaseException as e:
+                for future, _, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished_at = time.perf_counter()
+
+            for (future, _, _), result in zip(batch, results):
+                future.set_result(result)
+
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._size_hist[len(batch)] += 1
+                self._wait_total += sum(started_at - submitted_at for _, _, submitted_at in batch)
+                self._forward_total += finished_at - started_at
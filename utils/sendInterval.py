@@ -0,0 +1,122 @@
+import threading
+import time
+
+# ==============================
+# 클라이언트 프레임 전송 간격 권장값
+# ==============================
+# 응답마다 next_interval_ms(다음 프레임을 보낼 때까지 기다릴 시간)를 함께 내려보냄
+# - 상태: 위험(하품/눈감김/고개떨굼) 중이거나 직후 hold_sec 동안은 촘촘하게 (risk_ms)
+#         위험 없이 calm_sec 이상 지난 세션은 느슨하게 (calm_ms), 그 외 기본 간격 (base_ms)
+# - 부하: 활성 세션 수 x 평균 처리 시간 / 워커 수를 목표 사용률로 나눈 값보다 짧게 보내지 않도록 늘리고,
+#         대기열이 쌓여 있으면 쌓인 비율만큼 추가로 늘림
+# - 위험 상태는 부하가 높아도 risk_cap_ms를 넘기지 않음 (경보 누락 방지, 대신 대기열 포화 시 503)
+
+
+class _SessionState:
+    def __init__(self, now):
+        self.first_seen = now
+        self.last_seen = now
+        self.last_risk_at = None
+
+
+class IntervalAdvisor:
+    """
+    세션별 위험 이력과 서버 부하로 다음 전송 간격(ms) 계산
+    session_id가 없는 요청은 이력 없이 현재 상태와 부하만 반영
+    """
+    def __init__(self, num_workers, queue_size, risk_ms=150, base_ms=300, calm_ms=600, max_ms=1500,
+                 risk_cap_ms=300, calm_sec=10.0, hold_sec=3.0, target_util=0.8, active_window=5.0):
+        self.num_workers = max(1, int(num_workers))
+        self.queue_size = max(1, int(queue_size))
+        self.risk_ms = risk_ms
+        self.base_ms = base_ms
+        self.calm_ms = calm_ms
+        self.max_ms = max_ms
+        self.risk_cap_ms = max(risk_cap_ms, risk_ms)
+        self.calm_sec = calm_sec
+        self.hold_sec = hold_sec
+        self.target_util = target_util
+        self.active_window = active_window
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+        # 통계 값 (권장 사유별 횟수, 마지막 부하 기준 간격)
+        self.reasons = {"risk": 0, "hold": 0, "base": 0, "calm": 0, "load": 0}
+        self.last_load_ms = 0.0
+        self._total_ms = 0
+        self._count = 0
+
+    def _touch(self, session_id, now, risk):
+        """세션 상태 갱신 후 (활성 세션 수, 상태) 반환, 오래 안 보인 세션은 정리"""
+        with self._lock:
+            state = None
+            if session_id is not None:
+                state = self._sessions.get(session_id)
+                if state is None:
+                    state = self._sessions[session_id] = _SessionState(now)
+                state.last_seen = now
+                if risk:
+                    state.last_risk_at = now
+            for sid, s in list(self._sessions.items()):
+                if now - s.last_seen > self.active_window:
+                    del self._sessions[sid]
+            return max(1, len(self._sessions)), state
+
+    def load_interval_ms(self, active_sessions, backlog, service_s) -> float:
+        """
+        모든 활성 세션이 이 간격으로 보낼 때 워커 사용률이 target_util이 되는 간격
+        backlog(대기 + 처리 중)가 워커 수를 넘으면 대기열 비율만큼 추가로 늘림
+        """
+        interval = active_sessions * service_s * 1000 / (self.num_workers * self.target_util)
+        queued = max(0, backlog - self.num_workers)
+        return interval * (1 + queued / self.queue_size)
+
+    def recommend(self, session_id, status, backlog, service_s) -> int:
+        """
+        status: [하품, 눈감김, 고개떨굼], backlog/service_s: InferencePool.load() 값
+        """
+        now = time.monotonic()
+        risk = any(status)
+        active, state = self._touch(session_id, now, risk)
+        load_ms = self.load_interval_ms(active, backlog, service_s)
+
+        if risk:
+            reason, interval = "risk", self.risk_ms
+        elif state is not None and state.last_risk_at is not None and now - state.last_risk_at < self.hold_sec:
+            reason, interval = "hold", self.risk_ms
+        elif state is not None and now - (state.last_risk_at or state.first_seen) >= self.calm_sec:
+            reason, interval = "calm", self.calm_ms
+        else:
+            reason, interval = "base", self.base_ms
+
+        if load_ms > interval:
+            interval = load_ms
+            reason = "load" if reason in ("base", "calm") else reason
+        cap = self.risk_cap_ms if reason in ("risk", "hold") else self.max_ms
+        interval = int(round(min(interval, cap) / 10) * 10)
+
+        with self._lock:
+            self.reasons[reason] += 1
+            self.last_load_ms = load_ms
+            self._total_ms += interval
+            self._count += 1
+        return interval
+
+    def at_risk(self, session_id) -> bool:
+        """최근 hold_sec 안에 위험 상태였던 세션인지 (추론 대기열 우선순위용)"""
+        if session_id is None:
+            return False
+        with self._lock:
+            state = self._sessions.get(session_id)
+            return (state is not None and state.last_risk_at is not None
+                    and time.monotonic() - state.last_risk_at < self.hold_sec)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "reasons": dict(self.reasons),
+                "avg_interval_ms": round(self._total_ms / self._count, 1) if self._count else 0.0,
+                "load_interval_ms": round(self.last_load_ms, 1),
+            }
@@ -0,0 +1,93 @@
+import os
+import threading
+
+# ==============================
+# 멀티 프로세스 서빙 런타임 유틸리티
+# ==============================
+# - CPU 스레드 예산: 라이브러리별 스레드 수를 하나의 값으로 맞춤
+# - 프로세스 메모리(RSS/PSS) 조회: /proc 기준 (Linux 전용, 그 외 OS는 빈 값)
+
+# 라이브러리들이 기동 시 한 번 읽는 스레드 수 환경 변수 (numpy BLAS, OpenMP)
+# 이 모듈은 numpy/cv2를 import 시점에 불러오지 않으므로 환경 변수를 먼저 설정할 수 있음
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def available_cpus() -> list:
+    """현재 프로세스가 쓸 수 있는 CPU 번호 (affinity 반영)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(num_workers, cpus=None) -> list:
+    """CPU 목록을 워커 수만큼 겹치지 않게 나눔 (코어가 부족하면 일부 워커가 같은 코어 공유)"""
+    cpus = cpus or available_cpus()
+    num_workers = max(1, int(num_workers))
+    if len(cpus) < num_workers:
+        return [[cpus[i % len(cpus)]] for i in range(num_workers)]
+    size = len(cpus) // num_workers
+    return [cpus[i * size:(i + 1) * size] for i in range(num_workers)]
+
+
+def apply_thread_budget(threads, set_env=True):
+    """
+    프로세스 하나가 쓸 스레드 수를 라이브러리별로 적용
+    - OpenCV: cv2.setNumThreads
+    - numpy BLAS / OpenMP: 환경 변수 (해당 라이브러리 import 전에 호출해야 반영)
+    ONNX Runtime / OpenVINO 세션 스레드는 세션 생성 시 옵션으로 전달
+    MediaPipe는 스레드 수 옵션이 없어 CPU affinity로만 제한됨
+    """
+    threads = max(1, int(threads))
+    if set_env:
+        for name in THREAD_ENV_VARS:
+            os.environ.setdefault(name, str(threads))
+    import cv2
+    cv2.setNumThreads(threads)
+    return threads
+
+
+def process_memory(pid="self") -> dict:
+    """
+    프로세스 메모리 사용량(MB)
+    rss: 실제 점유, pss: 공유 페이지를 공유 프로세스 수로 나눈 값 (노드 전체 합산에 사용)
+    shared: 다른 프로세스와 공유 중인 페이지 (fork 전에 import한 모듈 코드/데이터 등)
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return {}
+    def mb(*names):
+        return round(sum(fields.get(n, 0) for n in names) / 1024, 1)
+    return {
+        "rss_mb": mb("Rss"),
+        "pss_mb": mb("Pss"),
+        "shared_mb": mb("Shared_Clean", "Shared_Dirty"),
+        "private_mb": mb("Private_Clean", "Private_Dirty"),
+    }
+
+
+def process_stats() -> dict:
+    """현재 프로세스 정보 (/metrics용)"""
+    import cv2
+    threads = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+    except OSError:
+        pass
+    return {
+        "pid": os.getpid(),
+        "worker_index": os.environ.get("SERVE_WORKER_INDEX"),
+        "cpus": available_cpus(),
+        "os_threads": threads,
+        "python_threads": threading.active_count(),
+        "cv2_threads": cv2.getNumThreads(),
+        **process_memory(),
+    }
@@ -0,0 +1,93 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+# 검출기 백엔드별로 기동 단계에서 불러올 런타임 모듈
+BACKEND_MODULES = {
+    "onnxruntime": "onnxruntime",
+    "openvino": "openvino",
+    "ultralytics": "ultralytics",
+}
+
+
+class StartupTracker:
+    """
+    서버 기동 단계(무거운 모듈 import, 모델 로드, 워밍업)별 소요 시간과 준비 상태 기록
+    - state: starting -> ready / failed
+    - 단계별 시간은 로그로 출력하고 /readyz, /metrics에서 조회
+    여러 워커 스레드가 동시에 기록하므로 내부 잠금 사용
+    """
+    def __init__(self):
+        self.state = "starting"
+        self.error = None
+        self.ready_after_ms = None
+        self._t0 = time.perf_counter()
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    # ==============================
+    # 단계 기록
+    # ==============================
+    def record(self, name, value):
+        with self._lock:
+            self._phases[name] = value
+        print(f"[startup] {name}: {value}")
+
+    @contextmanager
+    def phase(self, name):
+        """with 블록 소요 시간(ms) 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, round((time.perf_counter() - start) * 1000, 1))
+
+    def import_module(self, name):
+        """모듈을 처음 필요한 시점에 불러오고 import 시간 기록"""
+        with self.phase(f"import:{name}"):
+            return importlib.import_module(name)
+
+    def warmup(self, name, fn, runs):
+        """
+        fn()을 runs번 실행해 첫 실행과 이후 평균 시간(ms)을 기록
+        첫 실행에 몰리는 그래프 컴파일/메모리 할당 비용을 요청 전에 소진
+        """
+        times = []
+        for _ in range(max(1, runs)):
+            start = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - start) * 1000)
+        steady = times[1:] or times
+        self.record(f"warmup:{name}", {
+            "runs": len(times),
+            "first_ms": round(times[0], 1),
+            "steady_ms": round(sum(steady) / len(steady), 1),
+        })
+
+    # ==============================
+    # 준비 상태
+    # ==============================
+    def mark_ready(self):
+        self.ready_after_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+        self.state = "ready"
+        print(f"[startup] ready in {self.ready_after_ms}ms")
+
+    def mark_failed(self, error):
+        self.error = str(error)
+        self.state = "failed"
+        print(f"[startup] failed: {self.error}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            phases = dict(self._phases)
+        return {
+            "state": self.state,
+            "error": self.error,
+            "ready_after_ms": self.ready_after_ms,
+            "phases": phases,
+        }
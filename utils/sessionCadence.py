@@ -0,0 +1,247 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# ==============================
+# 세션별 프레임 변화 감지 + 검출 주기 조절
+# ==============================
+# 운전자 얼굴은 연속 프레임 사이에 거의 변하지 않으므로 매 프레임 전체 분석을 하지 않음
+# 1단계 (MediaPipe 전): 분석 프레임 축소본(thumbnail)의 얼굴 영역에서 블록(16x16 픽셀 평균)별
+#                      밝기 차이가 모두 작으면 이전 결과를 그대로 재사용 (MediaPipe, YOLO 모두 생략)
+#                      센서 노이즈는 블록 평균으로 사라지고, 눈 감김처럼 국소적인 변화는 블록 최댓값에 남음
+# 2단계 (MediaPipe 후): 랜드마크 이동량과 EAR/MAR 변화가 작으면 YOLO는 k 프레임에 한 번만 실행하고
+#                      그 사이에는 이전 눈/입 판정을 재사용 (고개 떨굼은 매번 새로 계산)
+# 강제 갱신: 움직임이 크거나, 마지막 결과가 max_stale_ms보다 오래됐거나,
+#           이전 결과에 위험 상태(하품/눈감김/고개떨굼)가 있으면 항상 전체 분석
+# mode
+#   off  : 사용 안 함 (매 프레임 전체 분석)
+#   audit: 재사용/YOLO 생략 여부만 판단하고 매 프레임 전체 분석, 생략했을 프레임은 실제 결과와 비교해 기록
+#          (서빙 결과는 off와 같음, 세션 상태는 on과 같은 순서로 갱신해 on에서의 생략 비율과 일치율을 측정)
+#   on   : 판단대로 재사용/YOLO 생략
+# 임계값은 audit 모드의 일치율/놓친 경보 통계를 YOLO 기준으로 확인한 뒤에만 on 사용
+CADENCE_MODES = ("off", "audit", "on")
+
+THUMB_SCALE = 16  # 축소 비율 (640x853 분석 프레임 -> 40x53)
+
+
+class _CadenceState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.thumb = None        # 마지막 전체 분석 프레임의 축소본
+        self.roi = None          # 축소본 기준 얼굴 영역 (x1, y1, x2, y2)
+        self.status = None       # 마지막 [하품, 눈감김, 고개떨굼]
+        self.crop = None         # 마지막 얼굴 크롭 영역 (분석 프레임 좌표)
+        self.full_at = 0.0       # 마지막 MediaPipe 실행 시각
+        self.pts = None          # 마지막 랜드마크 (N, 2)
+        self.ear = None
+        self.mar = None
+        self.parts = None        # 마지막 YOLO 판정 (하품, 눈감김)
+        self.detect_at = 0.0     # 마지막 YOLO 실행 시각
+        self.since_detect = 0    # 마지막 YOLO 이후 프레임 수
+
+
+class FramePlan:
+    """
+    프레임 1장의 처리 계획 (begin -> [needs_detection] -> finish 순서로 사용)
+    reuse: 1단계 재사용 결과 (None이면 MediaPipe 실행 필요)
+    """
+    def __init__(self, state, thumb, now):
+        self.state = state
+        self.thumb = thumb
+        self.now = now
+        self.reuse = None
+        self.crop = None   # 1단계 재사용 시 이전 얼굴 크롭 영역
+        self.parts = None  # 2단계에서 재사용할 (하품, 눈감김), None이면 YOLO 실행
+
+
+class CadenceScheduler:
+    """
+    세션별 상태를 여러 추론 워커가 공유 (세션 상태마다 잠금)
+    idle_timeout초 이상 쓰이지 않은 세션 상태는 해제
+    """
+    def __init__(self, detect_every=3, max_stale_ms=1000.0, reuse_diff=6.0, motion=0.02,
+                 ear_delta=0.03, mar_delta=0.05, idle_timeout=60.0, mode="off"):
+        if mode not in CADENCE_MODES:
+            raise ValueError(f"unknown cadence mode: {mode} (choose from {CADENCE_MODES})")
+        self.mode = mode
+        self.detect_every = max(1, int(detect_every))
+        self.max_stale = max_stale_ms / 1000
+        self.reuse_diff = reuse_diff
+        self.motion = motion
+        self.ear_delta = ear_delta
+        self.mar_delta = mar_delta
+        self.idle_timeout = idle_timeout
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+        # 통계 값
+        self.frames = 0
+        self.reused = 0          # 1단계 재사용 (MediaPipe + YOLO 생략)
+        self.detect_skipped = 0  # 2단계 재사용 (YOLO만 생략)
+        self.detections = 0      # 눈/입 판정 갱신 (YOLO 또는 랜드마크 기하 판정)
+        self.forced = {"new": 0, "risk": 0, "stale": 0, "motion": 0, "no_face": 0}
+        self.audited = 0         # audit 모드에서 생략했을 프레임 (실제 결과와 비교)
+        self.audit_agree = 0
+        self.missed_alarms = 0   # 실제로는 위험 상태인데 재사용 결과는 정상 (놓친 경보)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" and self.detect_every > 1
+
+    @property
+    def audit_only(self) -> bool:
+        """생략 여부를 기록만 하고 매 프레임 전체 분석하는 모드"""
+        return self.mode == "audit"
+
+    def _get(self, session_id, now):
+        if now - self._last_sweep > self.idle_timeout / 4:
+            with self._lock:
+                self._last_sweep = now
+                for sid, state in list(self._sessions.items()):
+                    if now - state.last_used > self.idle_timeout:
+                        del self._sessions[sid]
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = _CadenceState()
+            state.last_used = now
+            return state
+
+    def _force(self, reason):
+        with self._lock:
+            self.forced[reason] += 1
+
+    # ==============================
+    # 1단계: MediaPipe 전 프레임 변화 감지
+    # ==============================
+    def begin(self, session_id, frame) -> FramePlan:
+        """분석 프레임 축소본을 이전 전체 분석 프레임과 비교해 결과 재사용 여부 결정"""
+        now = time.monotonic()
+        h, w = frame.shape[:2]
+        thumb = cv2.resize(frame, (max(1, w // THUMB_SCALE), max(1, h // THUMB_SCALE)),
+                           interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        state = self._get(session_id, now)
+        plan = FramePlan(state, thumb, now)
+        with self._lock:
+            self.frames += 1
+
+        with state.lock:
+            if state.status is None or state.thumb is None or state.thumb.shape != thumb.shape:
+                self._force("new")
+                return plan
+            if any(state.status):
+                self._force("risk")
+                return plan
+            if now - state.full_at > self.max_stale:
+                self._force("stale")
+                return plan
+            x1, y1, x2, y2 = state.roi
+            diff = cv2.absdiff(thumb[y1:y2, x1:x2], state.thumb[y1:y2, x1:x2])
+            if diff.size == 0 or int(diff.max()) > self.reuse_diff:
+                return plan  # 장면이 바뀜 -> MediaPipe 실행 (YOLO 여부는 2단계에서 결정)
+            plan.reuse = list(state.status)
+            plan.crop = state.crop
+        with self._lock:
+            self.reused += 1
+        return plan
+
+    # ==============================
+    # 2단계: 랜드마크 기반 YOLO 실행 여부
+    # ==============================
+    def needs_detection(self, plan, pts, bbox, ear, mar) -> bool:
+        """
+        랜드마크 이동량(얼굴 대각선 대비 평균 이동 거리)과 EAR/MAR 변화로 YOLO 실행 여부 결정
+        실행하지 않으면 plan.parts에 이전 (하품, 눈감김) 판정을 채움
+        """
+        state = plan.state
+        with state.lock:
+            if state.parts is None or state.pts is None or state.pts.shape != pts.shape:
+                return True
+            if plan.now - state.detect_at > self.max_stale:
+                self._force("stale")
+                return True
+            if any(state.parts) or state.since_detect + 1 >= self.detect_every:
+                return True
+            diag = float(np.hypot(bbox[2] - bbox[0], bbox[3] - bbox[1])) or 1.0
+            moved = float(np.linalg.norm(pts[:, :2] - state.pts[:, :2], axis=1).mean()) / diag
+            if (moved > self.motion or abs(ear - state.ear) > self.ear_delta
+                    or abs(mar - state.mar) > self.mar_delta):
+                self._force("motion")
+                return True
+            plan.parts = state.parts
+        with self._lock:
+            self.detect_skipped += 1
+        return False
+
+    def _record_audit(self, reused, actual):
+        """생략했을 프레임의 재사용 결과와 실제 결과 비교"""
+        reused, actual = [bool(v) for v in reused], [bool(v) for v in actual]
+        with self._lock:
+            self.audited += 1
+            self.audit_agree += reused == actual
+            self.missed_alarms += any(a and not r for r, a in zip(reused, actual))
+
+    def finish(self, plan, status, crop_coords=None, pts=None, ear=None, mar=None, detected=False):
+        """
+        전체 분석이 끝난 프레임의 결과 기록 (on 모드의 1단계 재사용 프레임은 호출하지 않음)
+        crop_coords가 None이면 얼굴 미감지 -> 세션 상태 초기화
+        audit 모드에서 생략했을 프레임은 실제 결과와 비교만 하고, 세션 상태는 on 모드처럼 갱신
+        """
+        if self.audit_only and plan.reuse is not None:
+            # 1단계 재사용 대상: on 모드라면 세션 상태를 건드리지 않음
+            self._record_audit(plan.reuse, status if crop_coords is not None else [False, False, False])
+            return
+        if self.audit_only and plan.parts is not None and crop_coords is not None:
+            # 2단계 YOLO 생략 대상: 눈/입은 직전 판정을 재사용한 것으로 기록
+            self._record_audit(plan.parts, status[:2])
+            status, detected = [plan.parts[0], plan.parts[1], status[2]], False
+        state = plan.state
+        with state.lock:
+            if crop_coords is None:
+                state.status = state.parts = state.pts = None
+                self._force("no_face")
+                return
+            x1, y1, x2, y2 = (int(v) // THUMB_SCALE for v in crop_coords)
+            state.thumb = plan.thumb
+            state.roi = (x1, y1, max(x2, x1 + 1), max(y2, y1 + 1))
+            state.crop = tuple(crop_coords)
+            state.status = list(status)
+            state.full_at = plan.now
+            state.pts, state.ear, state.mar = pts, ear, mar
+            if detected:
+                state.parts = (status[0], status[1])
+                state.detect_at = plan.now
+                state.since_detect = 0
+            else:
+                state.since_detect += 1
+        if detected:
+            with self._lock:
+                self.detections += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            frames = self.frames
+            return {
+                "mode": self.mode,
+                "enabled": self.enabled,
+                "detect_every": self.detect_every,
+                "sessions": len(self._sessions),
+                "frames": frames,
+                "reused": self.reused,
+                "detect_skipped": self.detect_skipped,
+                "detections": self.detections,
+                # 전체 분석(MediaPipe) 생략 비율, YOLO 생략 비율 (audit 모드에서는 on으로 바꿨을 때 생략했을 비율)
+                "reuse_ratio": round(self.reused / frames, 3) if frames else 0.0,
+                "detect_skip_ratio": round((self.reused + self.detect_skipped) / frames, 3) if frames else 0.0,
+                "forced": dict(self.forced),
+                "audited": self.audited,
+                "audit_agreement": round(self.audit_agree / self.audited, 3) if self.audited else None,
+                "missed_alarms": self.missed_alarms,
+            }
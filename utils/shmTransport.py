@@ -0,0 +1,249 @@
+import collections
+import json
+import socket
+import time
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from utils.frameIngest import RawUpload
+from utils.streamProtocol import ProtocolError
+
+# ==============================
+# 공유 메모리 로컬 수신 채널 (같은 장치의 카메라 프로세스 -> 분석 서버)
+# ==============================
+# HTTP multipart는 프레임마다 커널 버퍼 -> 파서 -> 임시 파일 -> bytes로 여러 번 복사됨
+# 차량 장치처럼 카메라 프로세스와 서버가 같은 장치에 있으면
+# 카메라 프로세스가 공유 메모리 링 버퍼 슬롯에 프레임을 직접 쓰고, Unix 도메인 소켓으로는 슬롯 번호와 규격만 전송
+# -> 서버는 슬롯을 NumPy view로 바로 읽음 (수신 복사 없음)
+#
+# 1) 클라이언트가 링 버퍼(SharedMemory, slots x slot_size 바이트)를 만들고 소켓 연결 후 hello 전송
+#    {"type": "hello", "shm": 공유 메모리 이름, "slots": N, "slot_size": S, "session_id": "..."}
+# 2) 서버가 링 버퍼를 열고 {"type": "ready", "session_id": ...} 응답
+# 3) 프레임마다 빈 슬롯에 센서 방향 평면을 쓰고
+#    {"type": "frame", "seq": ..., "slot": ..., "length": 바이트 수, "capture_ts_ms": ...,
+#     "width": ..., "height": ..., "row_stride"/"format"/"full_width"/"full_height"/"roi": /analyze_raw와 같음}
+# 4) 서버 응답은 /ws/stream과 같은 result / dropped / busy / error 메시지 + "slot"
+#    응답이 온 슬롯은 서버가 더 이상 읽지 않으므로 클라이언트가 재사용
+# 메시지는 줄 단위 JSON (UTF-8, '\n' 구분), 응답 순서는 seq 순서와 다를 수 있음
+# 링 버퍼는 클라이언트 소유 (연결을 끊으면 클라이언트가 해제)
+
+# 이 메시지 중 하나가 오면 해당 슬롯은 다시 쓸 수 있음
+RELEASE_TYPES = ("result", "dropped", "busy", "error")
+
+# 이 프로세스가 만든 공유 메모리 이름 (같은 프로세스 안에서 attach하면 추적 해제하지 않음)
+_created = set()
+
+
+def encode_message(msg: dict) -> bytes:
+    return json.dumps(msg, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_message(line: bytes) -> dict:
+    try:
+        msg = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ProtocolError(f"invalid message: {e}")
+    if not isinstance(msg, dict):
+        raise ProtocolError("message must be an object")
+    return msg
+
+
+class ShmRing:
+    """
+    공유 메모리 링 버퍼 (slots개의 고정 크기 슬롯)
+    create: 클라이언트가 새로 생성 (close 시 해제), attach: 서버가 이름으로 열기 (해제하지 않음)
+    """
+    def __init__(self, shm, slots, slot_size, owner):
+        self.shm = shm
+        self.slots = int(slots)
+        self.slot_size = int(slot_size)
+        self.owner = owner
+
+    @classmethod
+    def create(cls, slots, slot_size):
+        shm = shared_memory.SharedMemory(create=True, size=int(slots) * int(slot_size))
+        _created.add(shm.name)
+        return cls(shm, slots, slot_size, owner=True)
+
+    @classmethod
+    def attach(cls, name, slots, slot_size):
+        try:
+            slots, slot_size = int(slots), int(slot_size)
+        except (TypeError, ValueError):
+            raise ProtocolError("slots, slot_size must be integers")
+        if slots <= 0 or slot_size <= 0:
+            raise ProtocolError("invalid ring geometry")
+        try:
+            shm = shared_memory.SharedMemory(name=str(name))
+        except (FileNotFoundError, ValueError, OSError) as e:
+            raise ProtocolError(f"cannot open shared memory {name}: {e}")
+        # 서버 프로세스가 종료될 때 resource_tracker가 클라이언트 소유 메모리를 지우지 않도록 추적 해제
+        if shm.name not in _created:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        if shm.size < slots * slot_size:
+            shm.close()
+            raise ProtocolError(f"shared memory is smaller than {slots} x {slot_size} bytes")
+        return cls(shm, slots, slot_size, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def view(self, slot, length=None) -> memoryview:
+        """슬롯 앞쪽 length 바이트의 memoryview (복사 없음)"""
+        start = slot * self.slot_size
+        return self.shm.buf[start:start + (self.slot_size if length is None else length)]
+
+    def array(self, slot) -> np.ndarray:
+        """슬롯 전체를 덮는 쓰기용 uint8 배열 (복사 없음)"""
+        return np.ndarray((self.slot_size,), dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_size)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            _created.discard(self.shm.name)
+            self.shm.unlink()
+
+
+def parse_frame(msg: dict, ring: ShmRing):
+    """
+    frame 메시지 검증 -> (seq, slot, length, RawUpload, capture_ts_ms)
+    형식 오류는 ProtocolError (슬롯 view는 추론 워커에서 ring.view(slot, length)로 열어 작업이 끝나면 바로 해제)
+    """
+    try:
+        seq = int(msg["seq"])
+        slot = int(msg["slot"])
+        length = int(msg["length"])
+        capture_ts_ms = int(msg["capture_ts_ms"]) if msg.get("capture_ts_ms") else None
+    except (KeyError, TypeError, ValueError):
+        raise ProtocolError("seq, slot, length must be integers")
+    if not 0 <= slot < ring.slots:
+        raise ProtocolError(f"slot {slot} out of range")
+    if not 0 < length <= ring.slot_size:
+        raise ProtocolError(f"length {length} does not fit in a slot ({ring.slot_size} bytes)")
+    try:
+        upload = RawUpload(msg.get("format"), msg["width"], msg["height"], msg.get("row_stride"),
+                           msg.get("full_width"), msg.get("full_height"), msg.get("roi"))
+    except KeyError as e:
+        raise ProtocolError(f"missing {e.args[0]}")
+    except (TypeError, ValueError) as e:
+        raise ProtocolError(str(e))
+    return seq, slot, length, upload, capture_ts_ms
+
+
+class ShmFrameClient:
+    """
+    카메라 프로세스용 클라이언트 (스레드 1개에서 사용)
+        with ShmFrameClient("/tmp/xident.sock", slot_size=768 * 480) as client:
+            slot, buf = client.acquire()           # 빈 슬롯 (카메라 프레임을 여기에 바로 기록)
+            buf[:y.size] = y                        # 또는 client.send(y, ...)로 복사 + 제출
+            client.submit(slot, y.size, width=720, height=480, row_stride=768)
+            msg = client.recv()                     # {"type": "result", "status": [...], ...}
+    빈 슬롯이 없으면 acquire는 응답이 와서 슬롯이 풀릴 때까지 대기
+    """
+    def __init__(self, socket_path, slots=4, slot_size=1280 * 720, session_id=None, timeout=30.0):
+        self.socket_path = socket_path
+        self.session_id = session_id or uuid.uuid4().hex
+        self.timeout = timeout
+        self.ring = ShmRing.create(slots, slot_size)
+        self._free = collections.deque(range(slots))
+        self._used = set()
+        self._results = collections.deque()
+        self._seq = 0
+        self._sock = None
+        self._reader = None
+
+    # ==============================
+    # 연결
+    # ==============================
+    def connect(self):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(self.timeout)
+        self._sock.connect(self.socket_path)
+        self._reader = self._sock.makefile("rb")
+        self._sock.sendall(encode_message({
+            "type": "hello", "shm": self.ring.name, "slots": self.ring.slots,
+            "slot_size": self.ring.slot_size, "session_id": self.session_id,
+        }))
+        msg = self._read_line()
+        if msg.get("type") != "ready":
+            raise ConnectionError(f"handshake failed: {msg.get('error', msg)}")
+        self.session_id = msg.get("session_id", self.session_id)
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = None
+        self.ring.close()
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ==============================
+    # 프레임 전송
+    # ==============================
+    def acquire(self):
+        """(슬롯 번호, 쓰기용 uint8 배열), 빈 슬롯이 없으면 응답을 받아 슬롯이 풀릴 때까지 대기"""
+        while not self._free:
+            self._results.append(self._read_line())
+        slot = self._free.popleft()
+        self._used.add(slot)
+        return slot, self.ring.array(slot)
+
+    def submit(self, slot, length, width, height, row_stride=None, capture_ts_ms=None, **fields) -> int:
+        """
+        acquire로 받은 슬롯에 쓴 프레임 제출, seq 반환
+        fields: format, full_width, full_height, roi (/analyze_raw와 같은 의미)
+        """
+        self._seq += 1
+        msg = {"type": "frame", "seq": self._seq, "slot": slot, "length": int(length),
+               "width": int(width), "height": int(height), "row_stride": int(row_stride or width),
+               "capture_ts_ms": int(capture_ts_ms or time.time() * 1000), **fields}
+        self._sock.sendall(encode_message(msg))
+        return self._seq
+
+    def send(self, data, width, height, row_stride=None, capture_ts_ms=None, **fields) -> int:
+        """평면(bytes 또는 NumPy 배열)을 빈 슬롯에 복사해 제출, seq 반환"""
+        src = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+        if src.size > self.ring.slot_size:
+            raise ValueError(f"frame of {src.size} bytes does not fit in a slot ({self.ring.slot_size} bytes)")
+        slot, buf = self.acquire()
+        buf[:src.size] = src
+        return self.submit(slot, src.size, width, height, row_stride, capture_ts_ms, **fields)
+
+    def recv(self) -> dict:
+        """다음 서버 응답 (result / dropped / busy / error)"""
+        if self._results:
+            return self._results.popleft()
+        return self._read_line()
+
+    def analyze(self, data, width, height, row_stride=None, capture_ts_ms=None, **fields) -> dict:
+        """프레임 1장을 보내고 그 프레임의 응답까지 대기 (먼저 온 다른 응답은 recv로 계속 받을 수 있음)"""
+        seq = self.send(data, width, height, row_stride, capture_ts_ms, **fields)
+        for msg in self._results:
+            if msg.get("seq") == seq:
+                self._results.remove(msg)
+                return msg
+        while True:
+            msg = self._read_line()
+            if msg.get("seq") == seq:
+                return msg
+            self._results.append(msg)
+
+    def _read_line(self) -> dict:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        msg = decode_message(line)
+        if msg.get("type") in RELEASE_TYPES and msg.get("slot") in self._used:
+            self._used.discard(msg["slot"])
+            self._free.append(msg["slot"])
+        return msg
+
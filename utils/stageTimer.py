@@ -0,0 +1,53 @@
+import time
+
+# 요청 처리 단계 이름 (기록 순서 = /metrics 출력 순서)
+# decode: JPEG 디코딩, ingest: 회전/반전/리사이즈, cadence: 세션 프레임 변화 감지, landmarks: MediaPipe 랜드마크,
+# align: 얼굴 정렬 크롭, detect: YOLO (배치 대기 포함), postprocess: 박스 필터링 + 상태 판별
+STAGES = ("decode", "ingest", "cadence", "landmarks", "align", "detect", "postprocess")
+
+
+class StageTimer:
+    """
+    추론 워커 1개 전용 단계별 처리 시간 누적 (워커 스레드에서만 기록하므로 잠금 없음)
+    stats()는 합산 가능한 평탄한 카운터로 반환 -> InferencePool.sum_context_stats로 워커 합계
+    """
+    def __init__(self):
+        self._count = {}
+        self._total = {}
+
+    def add(self, name, seconds):
+        self._count[name] = self._count.get(name, 0) + 1
+        self._total[name] = self._total.get(name, 0.0) + seconds
+
+    def since(self, name, started_at):
+        """started_at(perf_counter)부터 지금까지를 name 단계로 기록하고 현재 시각 반환"""
+        now = time.perf_counter()
+        self.add(name, now - started_at)
+        return now
+
+    def reset(self):
+        self._count.clear()
+        self._total.clear()
+
+    def stats(self) -> dict:
+        out = {}
+        for name, count in list(self._count.items()):
+            out[f"{name}.count"] = count
+            out[f"{name}.total_ms"] = self._total.get(name, 0.0) * 1000
+        return out
+
+
+def summarize_stages(totals) -> dict:
+    """평탄한 합계 카운터 -> 단계별 {count, total_ms, avg_ms}"""
+    names = [n for n in STAGES if f"{n}.count" in totals]
+    names += sorted({k.rsplit(".", 1)[0] for k in totals} - set(names))
+    summary = {}
+    for name in names:
+        count = totals.get(f"{name}.count", 0)
+        total_ms = totals.get(f"{name}.total_ms", 0.0)
+        summary[name] = {
+            "count": count,
+            "total_ms": round(total_ms, 1),
+            "avg_ms": round(total_ms / count, 3) if count else 0.0,
+        }
+    return summary
@@ -0,0 +1,89 @@
+import struct
+import uuid
+
+# ==============================
+# /ws/stream 프로토콜 정의
+# ==============================
+# 1) 연결 직후 클라이언트가 텍스트(JSON)로 프레임 규격을 1회 전송
+#    {"width": 640, "height": 480, "row_stride": 640, "format": "nv21", "session_id": "..."}
+#    (규격이 바뀌면 언제든 같은 형식으로 다시 전송)
+# 2) 서버가 {"type": "ready", "session_id": ..., "header_size": 12} 응답
+# 3) 이후 프레임마다 바이너리 메시지 = 헤더(12바이트) + Y 평면 원본 바이트
+#    헤더: seq(uint32) + capture_ts_ms(uint64), little-endian
+# 4) 서버가 프레임마다 {"type": "result", "seq": ..., "status": [isYawn, isEyeClosed, isHeadDrop],
+#    "next_interval_ms": ..., "face_box": ...} 응답 (next_interval_ms: 다음 프레임 전송까지 권장 대기 시간,
+#    face_box: 센서 좌표 얼굴 영역 [x1, y1, x2, y2] 또는 null)
+#    분석이 밀려 버린 프레임은 {"type": "dropped", "seq": ..., "reason": "superseded" | "deadline"}
+#    (같은 세션의 대기 중 프레임은 최신 1장만 유지, 촬영 후 마감 시간 안에 시작하지 못한 프레임은 버림)
+#    분석 중 오류가 난 프레임은 {"type": "error", "seq": ..., "error": ...}
+#    응답 순서는 seq 순서와 다를 수 있음
+
+FRAME_HEADER = struct.Struct("<IQ")
+SUPPORTED_FORMATS = ("nv21", "yuv420", "gray")
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+class StreamGeometry:
+    def __init__(self, width, height, row_stride, format="nv21"):
+        self.width = width
+        self.height = height
+        self.row_stride = row_stride
+        self.format = format
+
+    @property
+    def y_plane_size(self):
+        return self.row_stride * self.height
+
+    def to_dict(self):
+        return {
+            "width": self.width,
+            "height": self.height,
+            "row_stride": self.row_stride,
+            "format": self.format,
+        }
+
+
+class StreamSession:
+    """
+    WebSocket 연결 1개 = 운전자 세션 1개
+    프레임 규격과 세션 단위 통계를 보관
+    """
+    def __init__(self, session_id=None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.geometry = None
+        self.frames = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.last_status = None
+
+
+def parse_geometry(msg: dict) -> StreamGeometry:
+    """규격 협상 메시지 검증"""
+    try:
+        width = int(msg["width"])
+        height = int(msg["height"])
+        row_stride = int(msg.get("row_stride", width))
+    except (KeyError, TypeError, ValueError):
+        raise ProtocolError("width, height, row_stride must be integers")
+
+    fmt = str(msg.get("format", "nv21")).lower()
+    if fmt not in SUPPORTED_FORMATS:
+        raise ProtocolError(f"unsupported format: {fmt}")
+    if width <= 0 or height <= 0 or row_stride < width:
+        raise ProtocolError("invalid frame geometry")
+
+    return StreamGeometry(width, height, row_stride, fmt)
+
+
+def unpack_frame(data: bytes):
+    """
+    바이너리 프레임 메시지 -> (seq, capture_ts_ms, Y 평면 memoryview)
+    Y 평면은 복사하지 않고 원본 메시지 버퍼를 그대로 참조
+    """
+    if len(data) < FRAME_HEADER.size:
+        raise ProtocolError("frame message shorter than header")
+    seq, capture_ts_ms = FRAME_HEADER.unpack_from(data)
+    return seq, capture_ts_ms, memoryview(data)[FRAME_HEADER.size:]
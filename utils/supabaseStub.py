@@ -0,0 +1,112 @@
+import argparse
+import collections
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==============================
+# Supabase(PostgREST) INSERT 대체 서버
+# ==============================
+# 실제 Supabase 프로젝트 대신 로컬에서 HistoryWriter, 부하 테스트를 검증하기 위한 서버
+# POST /rest/v1/<table> 로 들어온 행을 메모리에 보관
+# 실행: python -m utils.supabaseStub --port 54321 [--fail] [--latency-ms 200]
+# 서버 실행 시 SUPABASE_URL=http://127.0.0.1:54321 로 지정
+
+
+class StubState:
+    def __init__(self, latency_ms=0.0, fail=False):
+        self.latency_ms = latency_ms
+        self.fail = fail  # True면 503 응답 (장애 상황 재현)
+        self.fail_next = collections.deque()  # 다음 요청들에 차례로 돌려줄 오류 코드 (예: 400, 429)
+        self.tables = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def rows(self, table):
+        with self.lock:
+            return list(self.tables.get(table, []))
+
+
+def _make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) != 3 or parts[:2] != ["rest", "v1"]:
+                self.send_error(404)
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+
+            if state.latency_ms:
+                time.sleep(state.latency_ms / 1000)
+            with state.lock:
+                status = state.fail_next.popleft() if state.fail_next else None
+            if status is not None:
+                self.send_error(status, "stub injected error")
+                return
+            if state.fail:
+                self.send_error(503, "stub backend unavailable")
+                return
+
+            try:
+                rows = json.loads(body)
+            except json.JSONDecodeError:
+                self.send_error(400, "invalid json")
+                return
+            if isinstance(rows, dict):
+                rows = [rows]
+
+            with state.lock:
+                state.requests += 1
+                state.tables.setdefault(parts[2], []).extend(rows)
+
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            # 저장된 행 확인용
+            table = self.path.split("?")[0].strip("/").split("/")[-1]
+            body = json.dumps(state.rows(table)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(host="127.0.0.1", port=0, latency_ms=0.0, fail=False):
+    """
+    백그라운드 스레드에서 대체 서버 실행
+    반환: (server, state, base_url)
+    """
+    state = StubState(latency_ms=latency_ms, fail=fail)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    threading.Thread(target=server.serve_forever, name="supabase-stub", daemon=True).start()
+    base_url = f"http://{host}:{server.server_address[1]}"
+    return server, state, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 Supabase INSERT 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail", action="store_true")
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub(args.host, args.port, args.latency_ms, args.fail)
+    print(f"Supabase 대체 서버 실행 중: {base_url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"수신 요청 {state.requests}건, 테이블별 행 수: { {k: len(v) for k, v in state.tables.items()} }")
+    except KeyboardInterrupt:
+        server.shutdown()